@@ -0,0 +1,79 @@
+"""
+Measures the throughput of the bulk book import.
+
+Run from the project root against the test database:
+
+    python -m benchmarks.bench_book_import
+
+All imported rows are rolled back at the end.
+"""
+
+import asyncio
+import json
+import time
+
+from sqlalchemy import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from brokers.redis import create_redis_pool, get_redis_client
+from configs.settings import settings
+from models import BaseModel
+from repositories.book_import_repository import BookImportRepository
+from repositories.detail_cache_repository import DetailCacheRepository
+from schemas.book_schemas import BookImportFormat
+from usecases.book_import_usecases import BookImportUseCase
+
+ROWS = 100_000
+AUTHORS = 5_000
+GENRES = 50
+
+
+async def generate_lines():
+    for index in range(ROWS):
+        row = dict(
+            title_rus=f"Книга {index}",
+            quantity=3,
+            available_for_loan=3,
+            authors_name="Имя",
+            authors_surname=f"Автор {index % AUTHORS}",
+            authors_nationality="Беларусь",
+            genre_name=f"Жанр {index % GENRES}",
+        )
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+async def main() -> None:
+    engine = create_async_engine(settings.test_db_url, poolclass=NullPool)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(BaseModel.metadata.create_all)
+
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+        # The detail cache invalidations are only recorded, the import is rolled back before they apply
+        redis_pool = create_redis_pool()
+        usecase = BookImportUseCase(
+            BookImportRepository(session), DetailCacheRepository(get_redis_client(redis_pool), session)
+        )
+
+        started = time.perf_counter()
+        report = await usecase.import_books(
+            lines=generate_lines(), file_format=BookImportFormat.jsonl, username="benchmark"
+        )
+        elapsed = time.perf_counter() - started
+
+        await session.close()
+        await transaction.rollback()
+
+    await redis_pool.aclose()
+    await engine.dispose()
+
+    print(
+        f"imported {report.imported_books} books ({report.created_authors} authors, "
+        f"{report.created_genres} genres) in {elapsed:.1f} s: {report.imported_books / elapsed * 60:,.0f} books/min"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""
+Measures /book/search query latency on a catalog of 1M books.
+
+Run from the project root against the test database:
+
+    python -m benchmarks.bench_book_search
+
+The catalog is generated in SQL, so the search vectors are filled by the same triggers
+the application relies on. Like in a real catalog, most title words are rare: every one of
+the well-known words below occurs in about 700 titles, the rest of the titles are made of
+a long tail of words occurring in about 25 titles each. All seeded rows are rolled back
+at the end.
+"""
+
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import NullPool, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from configs.settings import settings
+from models import BaseModel
+from repositories.book_repository import BookRepository
+from schemas.book_schemas import BookSearchQueryParams
+
+BOOKS = 1_000_000
+AUTHORS = 50_000
+ROUNDS = 20
+WORDS = [
+    "война", "мир", "преступление", "наказание", "идиот", "бесы", "отцы", "дети", "мертвые", "души",
+    "тихий", "дон", "мастер", "маргарита", "белая", "гвардия", "герой", "нашего", "времени", "горе",
+    "ума", "вишневый", "сад", "чайка", "обломов", "обрыв", "воскресение", "капитанская", "дочка", "метель",
+]  # fmt: skip
+SEARCHES = ["капитанская дочка", "маргарита", "войны", "толстой", "Author 4242", "чайка or метель"]
+
+
+async def seed(session: AsyncSession) -> None:
+    words = "ARRAY[" + ", ".join(f"'{word}'" for word in WORDS) + "]"
+
+    await session.execute(
+        text(
+            "INSERT INTO authors (name, surname, nationality, created_at, updated_at, created_by) "
+            "SELECT 'Лев', CASE WHEN n % 1000 = 0 THEN 'Толстой' ELSE 'Author ' || n END, 'Россия', "
+            "now(), now(), 'benchmark' FROM generate_series(1, :authors) AS n"
+        ),
+        dict(authors=AUTHORS),
+    )
+    await session.execute(
+        text(
+            "INSERT INTO books (title_rus, quantity, available_for_loan, created_at, updated_at, created_by) "
+            "SELECT CASE WHEN n % 100 = 0 "
+            f"THEN initcap(({words})[1 + n / 100 % 30] || ' ' || ({words})[1 + n / 3000 % 30]) "
+            "ELSE 'Слово' || n % 40000 || ' слово' || n % 39989 END, "
+            "1, 1, now(), now(), 'benchmark' FROM generate_series(1, :books) AS n"
+        ),
+        dict(books=BOOKS),
+    )
+    await session.execute(
+        text(
+            "WITH first_author AS (SELECT min(id) AS id FROM authors WHERE created_by = 'benchmark') "
+            "INSERT INTO author_book_association (book_id, author_id) "
+            "SELECT books.id, first_author.id + books.id % :authors FROM books, first_author "
+            "WHERE books.created_by = 'benchmark'"
+        ),
+        dict(authors=AUTHORS),
+    )
+    # Refresh the statistics and merge the GIN pending list into the index as autovacuum would
+    await session.execute(text("ANALYZE"))
+    await session.execute(text("SELECT gin_clean_pending_list('ix_books_search_vector')"))
+
+
+async def main() -> None:
+    engine = create_async_engine(settings.test_db_url, poolclass=NullPool)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(BaseModel.metadata.create_all)
+
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+
+        started = time.perf_counter()
+        await seed(session)
+        print(f"seeded {BOOKS} books in {time.perf_counter() - started:.1f} s")
+
+        repository = BookRepository(session)
+
+        for search_text in SEARCHES:
+            timings = []
+
+            for _ in range(ROUNDS):
+                started = time.perf_counter()
+                page = await repository.search_books(request_payload=BookSearchQueryParams(q=search_text))
+                timings.append(time.perf_counter() - started)
+
+            print(
+                f"{search_text!r:<22} p50: {statistics.median(timings) * 1000:6.1f} ms"
+                f"   max: {max(timings) * 1000:6.1f} ms   first hit: {page.books[0].title_rus}"
+            )
+
+        await session.close()
+        await transaction.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
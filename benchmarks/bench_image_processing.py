@@ -0,0 +1,79 @@
+"""
+Measures how many uploaded photos per second are resized per core.
+
+Run from the project root, no MinIO is needed, the resized images are only counted:
+
+    python -m benchmarks.bench_image_processing
+
+The old inline path decoded the whole JPEG on the event loop and resized it with thumbnail
+into a single image. The image processing pool decodes in draft mode in worker processes
+and encodes the fallback image and every WebP rendition, the event loop only waits for them.
+"""
+
+import asyncio
+import os
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from configs.image_processing import IMAGE_MAX_SIZE, ImageProcessingExecutor
+from configs.settings import settings
+
+UPLOADS = 96
+PHOTO_SIZE = (4000, 3000)
+
+
+def make_photo() -> bytes:
+    # Noise compresses like a real photo, a plain color would make decoding unrealistically cheap
+    image = Image.effect_noise(PHOTO_SIZE, 64).convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def resize_inline(data: bytes) -> bytes:
+    image = Image.open(BytesIO(data))
+    image.thumbnail(IMAGE_MAX_SIZE)
+    buffer = BytesIO()
+    image.save(buffer, format=image.format)
+    return buffer.getvalue()
+
+
+def report(name: str, elapsed: float, cores: int) -> None:
+    print(
+        f"{name:<14} {UPLOADS / elapsed:7.1f} uploads/s   {UPLOADS / elapsed / cores:7.1f} uploads/s per core"
+    )
+
+
+async def main() -> None:
+    photo = make_photo()
+    cores = os.cpu_count() or 1
+    print(f"{len(photo) / 1024 / 1024:.1f} MB JPEG of {PHOTO_SIZE[0]}x{PHOTO_SIZE[1]}, {cores} cores")
+
+    started = time.perf_counter()
+    for _ in range(UPLOADS):
+        resize_inline(photo)
+    # The inline path runs on the event loop, so it never uses more than one core
+    report("inline", time.perf_counter() - started, 1)
+
+    executor = ImageProcessingExecutor(
+        max_workers=cores,
+        max_pixels=PHOTO_SIZE[0] * PHOTO_SIZE[1],
+        renditions=settings.IMAGE_RENDITIONS,
+        webp_quality=settings.IMAGE_WEBP_QUALITY,
+    )
+
+    try:
+        # Starting the workers is paid once per process, not per upload
+        await executor.render(photo)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[executor.render(photo) for _ in range(UPLOADS)])
+        report("process pool", time.perf_counter() - started, cores)
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
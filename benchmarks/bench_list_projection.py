@@ -0,0 +1,106 @@
+"""
+Compares the ORM list path with the column-projection list path at 10k rows.
+
+Run from the project root against the test database:
+
+    python -m benchmarks.bench_list_projection
+
+All seeded rows are rolled back at the end.
+"""
+
+import asyncio
+import time
+
+from sqlalchemy import NullPool, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from configs.settings import settings
+from models import Author, BaseModel, Book
+from repositories.author_repository import AuthorRepository
+from repositories.book_repository import BookRepository
+from schemas.author_schemas import AuthorListQueryParams, AuthorReadSchema
+from schemas.book_schemas import BookListQueryParams
+from schemas.common_circular_schemas import BookWithAuthorsReadSchema
+
+ROWS = 10_000
+ROUNDS = 5
+
+
+async def seed(session: AsyncSession) -> None:
+    for index in range(ROWS):
+        book = Book(title_rus=f"Книга {index}", quantity=1, available_for_loan=1)
+        book.authors.append(Author(name="Имя", surname=f"Автор {index}", nationality="Беларусь"))
+        session.add(book)
+
+    await session.flush()
+    session.expunge_all()
+
+    # Freshly seeded tables have no statistics yet, refresh them as autovacuum would
+    await session.execute(text("ANALYZE"))
+
+
+async def orm_books(session: AsyncSession) -> list:
+    result = await session.execute(select(Book).options(selectinload(Book.authors)).order_by(Book.id))
+    return [BookWithAuthorsReadSchema.model_validate(book) for book in result.scalars().all()]
+
+
+async def projected_books(session: AsyncSession) -> list:
+    request_payload = BookListQueryParams(limit=ROWS, sort_by="id")
+    return (await BookRepository(session).get_all_books(request_payload=request_payload)).books
+
+
+async def orm_authors(session: AsyncSession) -> list:
+    result = await session.execute(select(Author).order_by(Author.id))
+    return [AuthorReadSchema.model_validate(author) for author in result.scalars().all()]
+
+
+async def projected_authors(session: AsyncSession) -> list:
+    request_payload = AuthorListQueryParams(limit=ROWS, sort_by="id")
+    return (await AuthorRepository(session).get_all_authors(request_payload=request_payload)).authors
+
+
+async def measure(session: AsyncSession, list_function) -> float:
+    timings = []
+
+    for _ in range(ROUNDS):
+        session.expunge_all()
+        started = time.perf_counter()
+        items = await list_function(session)
+        timings.append(time.perf_counter() - started)
+
+    assert len(items) >= ROWS
+    return min(timings)
+
+
+async def main() -> None:
+    engine = create_async_engine(settings.test_db_url, poolclass=NullPool)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(BaseModel.metadata.create_all)
+
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+
+        await seed(session)
+
+        for name, orm_path, projected_path in [
+            ("books", orm_books, projected_books),
+            ("authors", orm_authors, projected_authors),
+        ]:
+            orm_time = await measure(session, orm_path)
+            projected_time = await measure(session, projected_path)
+            print(
+                f"{name:<8} orm: {orm_time * 1000:8.1f} ms   projection: {projected_time * 1000:8.1f} ms"
+                f"   speedup: {orm_time / projected_time:4.1f}x"
+            )
+
+        await session.close()
+        await transaction.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Measures the latency of unrelated requests while the process is flooded with logins.
+
+Run from the project root, no database is needed:
+
+    python -m benchmarks.bench_password_hashing
+
+A small application exposes /ping, which does no work, and /login, which verifies a bcrypt
+password either inline, as authenticate_user used to, or through the password hashing
+executor. The p99 of /ping should stay flat with the executor even while the logins queue
+up or get rejected with 503. On a single CPU the hashing thread still shares it with
+the event loop, so the p99 rises by a few tens of milliseconds instead of whole seconds.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from dependencies.auth_dependencies import pwd_context, verify_password
+from exception_handlers.auth_exc_handlers import register_auth_exception_handlers
+
+LOGINS = 64
+PINGS = 200
+PING_INTERVAL = 0.005
+
+# Every request of the benchmark would be logged otherwise
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+hashed_password = pwd_context.hash("benchmark_password")
+
+app = FastAPI()
+register_auth_exception_handlers(app)
+
+
+@app.get("/ping")
+async def ping():
+    return {"status": "ok"}
+
+
+@app.post("/login/inline")
+async def login_inline():
+    return {"verified": pwd_context.verify("benchmark_password", hashed_password)}
+
+
+@app.post("/login/executor")
+async def login_executor():
+    return {"verified": await verify_password("benchmark_password", hashed_password)}
+
+
+async def measure(name: str, login_path: str | None) -> None:
+    timings = []
+    login_statuses = []
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://benchmark") as client:
+
+        async def login() -> None:
+            response = await client.post(login_path)
+            login_statuses.append(response.status_code)
+
+        async def pings() -> None:
+            started = time.perf_counter()
+
+            for number in range(PINGS):
+                # Timed from when the ping was due, so the time it waited for a blocked loop counts too
+                due = started + number * PING_INTERVAL
+                await asyncio.sleep(max(due - time.perf_counter(), 0))
+                await client.get("/ping")
+                timings.append(time.perf_counter() - due)
+
+        logins = [login() for _ in range(LOGINS)] if login_path else []
+        await asyncio.gather(pings(), *logins)
+
+    rejected = login_statuses.count(503)
+    print(
+        f"{name:<18} ping p50: {statistics.median(timings) * 1000:7.2f} ms"
+        f"   p99: {statistics.quantiles(timings, n=100)[98] * 1000:7.2f} ms"
+        f"   logins: {len(login_statuses) - rejected} served, {rejected} rejected"
+    )
+
+
+async def main() -> None:
+    await measure("idle", None)
+    await measure("inline bcrypt", "/login/inline")
+    await measure("hashing executor", "/login/executor")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
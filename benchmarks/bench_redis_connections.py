@@ -0,0 +1,72 @@
+"""
+Compares a Redis client built per request with clients sharing the application pool.
+
+Run from the project root against the Redis of the settings:
+
+    python -m benchmarks.bench_redis_connections
+
+Every simulated request sends the EXISTS of /auth/refresh-token. A client built per request
+opens a new TCP connection each time and closes it afterwards, pooled clients reuse
+the connections of a single pool, as the lifespan handler of the application sets it up.
+"""
+
+import asyncio
+import statistics
+import time
+
+import redis.asyncio as aioredis
+
+from brokers.redis import create_redis_pool, get_redis_client
+from configs.settings import settings
+
+REQUESTS = 2_000
+CONCURRENCY = 20
+
+
+async def request_with_own_client() -> None:
+    redis = aioredis.from_url(
+        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}", encoding="utf-8", decode_responses=True
+    )
+
+    try:
+        await redis.exists("benchmark:token")
+    finally:
+        await redis.aclose()
+
+
+async def request_with_pooled_client(pool: aioredis.ConnectionPool) -> None:
+    await get_redis_client(pool).exists("benchmark:token")
+
+
+async def measure(name: str, request) -> None:
+    timings = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def timed_request() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await request()
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[timed_request() for _ in range(REQUESTS)])
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{name:<18} {REQUESTS / elapsed:8.0f} req/s   p50: {statistics.median(timings) * 1000:5.2f} ms"
+        f"   p99: {statistics.quantiles(timings, n=100)[98] * 1000:5.2f} ms"
+    )
+
+
+async def main() -> None:
+    pool = create_redis_pool()
+
+    try:
+        await measure("client per request", request_with_own_client)
+        await measure("shared pool", lambda: request_with_pooled_client(pool))
+    finally:
+        await pool.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,35 +1,134 @@
+import asyncio
+from typing import Iterable
+
 import aio_pika
+from aio_pika.abc import AbstractRobustChannel, AbstractRobustConnection
+from aio_pika.pool import Pool
 from fastapi import HTTPException, status
 
 from configs.logger import logger
 from configs.settings import settings
 
+# Queues the application publishes to with their arguments, declared once per connection.
+# A consumer declares its queue with the same arguments
+PUBLISHER_QUEUES = {
+    settings.RABBITMQ_RESET_PASSWORD_QUEUE: {"x-queue-type": "quorum"},
+    settings.RABBITMQ_REMINDER_QUEUE: {"x-queue-type": "quorum"},
+    settings.RABBITMQ_IMAGE_PROCESSING_QUEUE: {
+        "x-queue-type": "quorum",
+        "x-delivery-limit": settings.RABBITMQ_IMAGE_PROCESSING_DELIVERY_LIMIT,
+    },
+}
 
-async def connect_to_rabbitmq_channel():
-    try:
-        connection = await aio_pika.connect_robust(
-            host=settings.RABBITMQ_HOST,
-            port=settings.RABBITMQ_PORT,
-            login=settings.RABBITMQ_USER,
-            password=settings.RABBITMQ_PASSWORD,
-        )
-        return await connection.channel()
-    except Exception as e:
-        logger.error(f"Failed to connect RabbitMQ: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="An unexpected error occurred. Please try again later",
+
+class RabbitMQPublisher:
+    """
+    Publisher owned by the application lifespan: one robust connection and a bounded pool
+    of channels, so a burst of messages neither opens a connection per message nor grows
+    the number of channels without limit.
+
+    With RABBITMQ_PUBLISHER_CONFIRMS a publish returns only after the broker has confirmed it.
+    The connection is opened lazily if the broker was not reachable at startup.
+    """
+
+    def __init__(self):
+        self.connection: AbstractRobustConnection | None = None
+        self.channel_pool: Pool | None = None
+        self.in_flight = 0
+        self.published = 0
+        self.failed = 0
+        self._connect_lock = asyncio.Lock()
+
+    async def _open_channel(self) -> AbstractRobustChannel:
+        return await self.connection.channel(publisher_confirms=settings.RABBITMQ_PUBLISHER_CONFIRMS)
+
+    async def connect(self) -> None:
+        async with self._connect_lock:
+            if self.connection is not None:
+                return
+
+            connection = await aio_pika.connect_robust(
+                host=settings.RABBITMQ_HOST,
+                port=settings.RABBITMQ_PORT,
+                login=settings.RABBITMQ_USER,
+                password=settings.RABBITMQ_PASSWORD,
+            )
+            # The queues are durable, so they outlive reconnects and are declared only here
+            try:
+                async with connection.channel() as channel:
+                    for queue_name, arguments in PUBLISHER_QUEUES.items():
+                        await channel.declare_queue(queue_name, durable=True, arguments=arguments)
+            except Exception:
+                await connection.close()
+                raise
+
+            self.connection = connection
+            self.channel_pool = Pool(self._open_channel, max_size=settings.RABBITMQ_CHANNEL_POOL_SIZE)
+
+    async def start(self) -> None:
+        try:
+            await self.connect()
+        except Exception as exc:
+            # The application still starts, publishing retries the connection
+            logger.error(f"Failed to connect RabbitMQ: {str(exc)}")
+
+    async def close(self) -> None:
+        if self.channel_pool is not None:
+            await self.channel_pool.close()
+
+        if self.connection is not None:
+            await self.connection.close()
+
+        self.connection = None
+        self.channel_pool = None
+
+    async def publish_batch(self, messages: Iterable[str], queue_name: str) -> None:
+        """
+        Publishes the messages through one channel, waiting for their confirms together.
+        """
+        messages = list(messages)
+        await self.connect()
+        self.in_flight += len(messages)
+
+        try:
+            async with self.channel_pool.acquire() as channel:
+                if channel.is_closed:
+                    await channel.reopen()
+
+                await asyncio.gather(
+                    *[
+                        channel.default_exchange.publish(
+                            aio_pika.Message(body=message.encode()),
+                            routing_key=queue_name,
+                            timeout=settings.RABBITMQ_PUBLISH_TIMEOUT,
+                        )
+                        for message in messages
+                    ]
+                )
+        except Exception:
+            self.failed += len(messages)
+            raise
+        finally:
+            self.in_flight -= len(messages)
+
+        self.published += len(messages)
+
+    async def publish(self, message: str, queue_name: str) -> None:
+        await self.publish_batch(messages=[message], queue_name=queue_name)
+
+    def statistics(self) -> dict:
+        return dict(
+            connected=self.connection is not None and not self.connection.is_closed,
+            channel_pool_size=settings.RABBITMQ_CHANNEL_POOL_SIZE,
+            in_flight=self.in_flight,
+            published=self.published,
+            failed=self.failed,
         )
 
 
-async def send_message_to_rabbitmq(message, queue_name: str):
+async def send_message_to_rabbitmq(message, queue_name: str, publisher: RabbitMQPublisher):
     try:
-        async with await connect_to_rabbitmq_channel() as channel:
-            await channel.declare_queue(queue_name, durable=True, arguments={"x-queue-type": "quorum"})
-            await channel.default_exchange.publish(
-                aio_pika.Message(body=message.encode()),
-                routing_key=queue_name,
-            )
+        await publisher.publish(message=message, queue_name=queue_name)
     except Exception as e:
         logger.error(f"Failed to send a message: {str(e)}")
         raise HTTPException(
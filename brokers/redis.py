@@ -5,11 +5,24 @@ from configs.logger import logger
 from configs.settings import settings
 
 
-async def get_redis_client():
-    redis = aioredis.from_url(
-        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}", encoding="utf-8", decode_responses=True
+def create_redis_pool() -> aioredis.BlockingConnectionPool:
+    """
+    Creates the connection pool shared by all the requests of the process. A request waits
+    up to REDIS_POOL_TIMEOUT seconds for a free connection once all of them are in use.
+    """
+    return aioredis.BlockingConnectionPool.from_url(
+        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
+        encoding="utf-8",
+        decode_responses=True,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
     )
-    return redis
+
+
+def get_redis_client(pool: aioredis.ConnectionPool) -> aioredis.Redis:
+    # The client only borrows connections, closing it leaves the pool open
+    return aioredis.Redis(connection_pool=pool)
 
 
 async def add_refresh_token_to_blacklist(redis: aioredis.Redis, token: str, expiration: int):
@@ -25,3 +38,23 @@ async def add_refresh_token_to_blacklist(redis: aioredis.Redis, token: str, expi
 
 async def is_refresh_token_blacklisted(redis: aioredis.Redis, token: str):
     return await redis.exists(token)
+
+
+def recent_write_key(username: str) -> str:
+    return f"recent_write:{username}"
+
+
+async def mark_recent_write(redis: aioredis.Redis, username: str, expiration: int):
+    try:
+        return await redis.set(name=recent_write_key(username), value=1, ex=expiration)
+    except Exception as e:
+        # Losing the mark only means the user may read slightly stale data from the replica
+        logger.error(f"Failed to mark a recent write: {str(e)}")
+
+
+async def has_recent_write(redis: aioredis.Redis, username: str):
+    try:
+        return await redis.exists(recent_write_key(username))
+    except Exception as e:
+        logger.error(f"Failed to check a recent write: {str(e)}")
+        return True
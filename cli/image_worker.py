@@ -0,0 +1,138 @@
+"""
+Processes the covers and photos uploaded directly to the storage, published by the finalize endpoints.
+Runs until stopped, several workers can consume the queue together.
+
+    python -m cli.image_worker
+"""
+
+import asyncio
+
+import aio_pika
+import redis.asyncio as aioredis
+from aio_pika.abc import AbstractIncomingMessage
+from aiobotocore.client import AioBaseClient
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from brokers.rabbitmq import PUBLISHER_QUEUES
+from brokers.redis import create_redis_pool, get_redis_client
+from configs.database import async_engine, async_session_factory
+from configs.image_processing import image_processing_executor
+from configs.logger import logger
+from configs.settings import settings
+from dependencies.db_dependency import (
+    invalidate_caches,
+    queue_images_for_sweep,
+    unit_of_work,
+)
+from dependencies.minio_s3_dependency import create_minio_s3_client
+from exception_handlers.author_exc_handlers import AuthorDoesNotExist
+from exception_handlers.book_exc_handlers import BookDoesNotExist
+from repositories.author_repository import AuthorRepository
+from repositories.book_instance_repository import BookInstanceRepository
+from repositories.detail_cache_repository import DetailCacheRepository
+from repositories.minio_s3_repository import MinioS3Repository, queue_released_images
+from schemas.upload_schemas import ImageEntity, ImageProcessingJobSchema
+from usecases.author_usecases import AuthorUseCase
+from usecases.book_instance_usecases import BookInstanceUseCase
+from usecases.minio_s3_usecases import MinioS3UseCase
+
+
+async def process_image_job(
+    job: ImageProcessingJobSchema, session: AsyncSession, s3_client: AioBaseClient, redis: aioredis.Redis
+) -> None:
+    minio_s3_usecase = MinioS3UseCase(MinioS3Repository(s3_client))
+    detail_cache_repository = DetailCacheRepository(redis, session)
+
+    # The image is processed before the database is touched, no connection is held meanwhile
+    file_url = await minio_s3_usecase.upload_staged_file_and_get_presigned_url(
+        bucket_name=job.bucket_name, key=job.key, etag=job.etag
+    )
+
+    try:
+        async with unit_of_work(session):
+            if job.entity == ImageEntity.author:
+                usecase = AuthorUseCase(AuthorRepository(session), minio_s3_usecase, detail_cache_repository)
+                await usecase.set_author_photo(
+                    author_id=job.entity_id, file_url=file_url, username=job.username
+                )
+            else:
+                # Setting the cover looks up no books
+                usecase = BookInstanceUseCase(
+                    BookInstanceRepository(session), None, minio_s3_usecase, detail_cache_repository
+                )
+                await usecase.set_book_instance_cover(
+                    book_instance_id=job.entity_id, file_url=file_url, username=job.username
+                )
+
+    except (AuthorDoesNotExist, BookDoesNotExist):
+        # Deleted meanwhile, the stored image is left to the sweep
+        await queue_released_images(
+            redis=redis, released_images={job.bucket_name: {file_url.split("/")[-1]}}
+        )
+        raise
+
+    await invalidate_caches(session=session, redis=redis)
+    await queue_images_for_sweep(session=session, redis=redis)
+
+
+async def handle_message(message: AbstractIncomingMessage, s3_client: AioBaseClient, redis: aioredis.Redis):
+    try:
+        job = ImageProcessingJobSchema.model_validate_json(message.body)
+
+        async with async_session_factory() as session:
+            await process_image_job(job=job, session=session, s3_client=s3_client, redis=redis)
+
+    except (ValidationError, HTTPException, AuthorDoesNotExist, BookDoesNotExist) as exc:
+        # The job can never succeed, e.g. the image is invalid or was replaced after finalizing
+        logger.error(f"Dropped an image processing job: {str(exc)}")
+        await message.reject(requeue=False)
+        return
+    except Exception as exc:
+        # Retried until RABBITMQ_IMAGE_PROCESSING_DELIVERY_LIMIT deliveries
+        logger.error(f"Failed to process an image: {str(exc)}")
+        await message.nack(requeue=True)
+        return
+
+    await message.ack()
+
+
+async def run_image_worker() -> None:
+    redis_pool = create_redis_pool()
+    redis = get_redis_client(redis_pool)
+    connection = await aio_pika.connect_robust(
+        host=settings.RABBITMQ_HOST,
+        port=settings.RABBITMQ_PORT,
+        login=settings.RABBITMQ_USER,
+        password=settings.RABBITMQ_PASSWORD,
+    )
+
+    try:
+        async with connection, create_minio_s3_client() as s3_client:
+            channel = await connection.channel()
+            await channel.set_qos(prefetch_count=settings.IMAGE_WORKER_CONCURRENCY)
+            queue = await channel.declare_queue(
+                settings.RABBITMQ_IMAGE_PROCESSING_QUEUE,
+                durable=True,
+                arguments=PUBLISHER_QUEUES[settings.RABBITMQ_IMAGE_PROCESSING_QUEUE],
+            )
+
+            async def on_message(message: AbstractIncomingMessage) -> None:
+                await handle_message(message=message, s3_client=s3_client, redis=redis)
+
+            await queue.consume(on_message)
+            logger.info("Image worker is waiting for images")
+            await asyncio.Future()
+    finally:
+        image_processing_executor.shutdown()
+        await redis_pool.aclose()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    asyncio.run(run_image_worker())
+
+
+if __name__ == "__main__":
+    main()
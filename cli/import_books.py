@@ -0,0 +1,70 @@
+"""
+Imports books with their authors and genres from a CSV or JSON Lines file straight into the database.
+
+    python -m cli.import_books books.csv --username admin
+    python -m cli.import_books books.jsonl --format jsonl --username admin
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+from brokers.redis import create_redis_pool, get_redis_client
+from configs.database import async_engine, async_session_factory
+from dependencies.db_dependency import invalidate_caches, unit_of_work
+from repositories.book_import_repository import BookImportRepository
+from repositories.detail_cache_repository import DetailCacheRepository
+from schemas.book_schemas import BookImportFormat
+from usecases.book_import_usecases import BookImportUseCase
+
+
+async def iter_file_lines(path: Path) -> AsyncIterator[str]:
+    with path.open(encoding="utf-8-sig", newline="") as file:
+        for line in file:
+            yield line
+
+
+async def import_books(path: Path, file_format: BookImportFormat, username: str) -> None:
+    redis_pool = create_redis_pool()
+    redis = get_redis_client(redis_pool)
+
+    async with async_session_factory() as session:
+        async with unit_of_work(session):
+            usecase = BookImportUseCase(BookImportRepository(session), DetailCacheRepository(redis, session))
+            report = await usecase.import_books(
+                lines=iter_file_lines(path), file_format=file_format, username=username
+            )
+
+        await invalidate_caches(session=session, redis=redis)
+
+    await redis_pool.aclose()
+    await async_engine.dispose()
+
+    print(report.model_dump_json(indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import books from a CSV or JSON Lines file")
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format",
+        dest="file_format",
+        type=BookImportFormat,
+        choices=list(BookImportFormat),
+        default=None,
+        help="File format, guessed from the file extension by default",
+    )
+    parser.add_argument("--username", required=True, help="Stored as created_by of the imported rows")
+    args = parser.parse_args()
+
+    file_format = args.file_format
+    if file_format is None:
+        is_jsonl = args.path.suffix.lower() in (".jsonl", ".ndjson")
+        file_format = BookImportFormat.jsonl if is_jsonl else BookImportFormat.csv
+
+    asyncio.run(import_books(path=args.path, file_format=file_format, username=args.username))
+
+
+if __name__ == "__main__":
+    main()
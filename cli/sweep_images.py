@@ -0,0 +1,41 @@
+"""
+Deletes the released covers and photos nothing refers to anymore. Meant to be run periodically, e.g. hourly.
+
+    python -m cli.sweep_images
+"""
+
+import asyncio
+
+from brokers.redis import create_redis_pool, get_redis_client
+from configs.database import async_engine, async_session_factory
+from dependencies.minio_s3_dependency import create_minio_s3_client
+from repositories.author_repository import AuthorRepository
+from repositories.book_instance_repository import BookInstanceRepository
+from repositories.minio_s3_repository import MinioS3Repository
+from usecases.image_sweep_usecases import ImageSweepUseCase
+
+
+async def sweep_images() -> None:
+    redis_pool = create_redis_pool()
+
+    async with async_session_factory() as session, create_minio_s3_client() as minio_s3_client:
+        usecase = ImageSweepUseCase(
+            author_repository=AuthorRepository(session),
+            book_instance_repository=BookInstanceRepository(session),
+            minio_s3_repository=MinioS3Repository(minio_s3_client),
+            redis=get_redis_client(redis_pool),
+        )
+        deleted = await usecase.sweep()
+
+    await redis_pool.aclose()
+    await async_engine.dispose()
+
+    print(f"Deleted {deleted} released images")
+
+
+def main() -> None:
+    asyncio.run(sweep_images())
+
+
+if __name__ == "__main__":
+    main()
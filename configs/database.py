@@ -1,7 +1,143 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 
 from configs.settings import settings
 
-async_engine = create_async_engine(settings.db_url)
+# Time the checkout in progress spent opening a new connection. Every checkout runs in a greenlet
+# of its own, which has its own context, so concurrent checkouts never see each other's time.
+checkout_connect_time: ContextVar[float | None] = ContextVar("checkout_connect_time", default=None)
+
+POOL_COUNTERS = (
+    "checkouts",
+    "checkout_timeouts",
+    "wait_time_total",
+    "wait_time_max",
+    "connects",
+    "connect_time_total",
+    "connect_time_max",
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that counts checkouts and how long they waited for a free connection,
+    so a pool too small for the load shows up before requests start timing out.
+    Opening a new connection is timed separately, a slow database host is not mistaken
+    for a pool too small.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.connects = 0
+        self.connect_time_total = 0.0
+        self.connect_time_max = 0.0
+
+    def _do_get(self):
+        # QueuePool retries a checkout that lost a race for the overflow by calling _do_get again
+        if checkout_connect_time.get() is not None:
+            return super()._do_get()
+
+        token = checkout_connect_time.set(0.0)
+        started = time.perf_counter()
+
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            wait_time = time.perf_counter() - started - checkout_connect_time.get()
+            checkout_connect_time.reset(token)
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+        self.checkouts += 1
+        return connection
+
+    def _create_connection(self):
+        started = time.perf_counter()
+
+        try:
+            return super()._create_connection()
+        finally:
+            connect_time = time.perf_counter() - started
+            self.connects += 1
+            self.connect_time_total += connect_time
+            self.connect_time_max = max(self.connect_time_max, connect_time)
+
+            if checkout_connect_time.get() is not None:
+                checkout_connect_time.set(checkout_connect_time.get() + connect_time)
+
+    def recreate(self):
+        # The counters describe the whole life of the engine, not a single pool instance
+        pool = super().recreate()
+
+        for counter in POOL_COUNTERS:
+            setattr(pool, counter, getattr(self, counter))
+
+        return pool
+
+
+def engine_options() -> dict:
+    """Pool and connection options of the application engines, taken from the settings."""
+    return dict(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)},
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+
+def get_pool_statistics(engine: AsyncEngine) -> dict:
+    """
+    Returns the current occupancy of the engine pool, its checkout and connect counters.
+    """
+    pool = engine.pool
+
+    return dict(
+        pool_size=pool.size(),
+        max_overflow=pool._max_overflow,
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        # QueuePool counts the overflow from -pool_size until the pool is full
+        overflow=max(pool.overflow(), 0),
+        checkouts=pool.checkouts,
+        checkout_timeouts=pool.checkout_timeouts,
+        wait_time_total_ms=round(pool.wait_time_total * 1000, 3),
+        wait_time_max_ms=round(pool.wait_time_max * 1000, 3),
+        connects=pool.connects,
+        connect_time_total_ms=round(pool.connect_time_total * 1000, 3),
+        connect_time_max_ms=round(pool.connect_time_max * 1000, 3),
+    )
+
+
+async_engine = create_async_engine(settings.db_url, **engine_options())
 
 async_session_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Pure reads go to the replica when one is configured, otherwise to the primary as well
+if settings.replica_db_url:
+    replica_engine = create_async_engine(settings.replica_db_url, **engine_options())
+    replica_session_factory = async_sessionmaker(
+        bind=replica_engine, autoflush=False, expire_on_commit=False
+    )
+    # The engines whose pools the metrics report, by the label they are reported under
+    labelled_engines = {"primary": async_engine, "replica": replica_engine}
+else:
+    replica_engine = async_engine
+    replica_session_factory = async_session_factory
+    labelled_engines = {"primary": async_engine}
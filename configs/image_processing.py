@@ -0,0 +1,164 @@
+import asyncio
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PIL import Image
+
+from configs.settings import settings
+
+# The largest size of the fallback image, stored in the original format under the uploaded filename
+IMAGE_MAX_SIZE = (200, 300)
+IMAGE_FORMATS = ("JPEG", "PNG")
+# Images are stored under the SHA-256 of the fallback image and the extension of its format
+STORED_IMAGE_FILENAME = re.compile(r"[0-9a-f]{64}\.(jpg|png)")
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+def rendition_key(filename: str, rendition: str) -> str:
+    """The key of a WebP rendition, derived from the key of the fallback image."""
+    return f"{filename.rsplit('.', 1)[0]}-{rendition}.webp"
+
+
+def stored_image_filename(url: str | None) -> str | None:
+    """
+    The content-addressed key of an image stored in a bucket by this application at url,
+    None for a bare filename, an external URL or an image stored before keys were derived
+    from the content.
+    """
+    if not url or not url.startswith(f"{settings.MINIO_URL_TO_OPEN_FILE}/"):
+        return None
+
+    bucket_and_filename = url.removeprefix(f"{settings.MINIO_URL_TO_OPEN_FILE}/").split("/")
+
+    if len(bucket_and_filename) != 2 or not STORED_IMAGE_FILENAME.fullmatch(bucket_and_filename[1]):
+        return None
+
+    return bucket_and_filename[1]
+
+
+def rendition_urls(url: str | None) -> dict[str, str] | None:
+    """Maps the configured renditions to their URLs next to the fallback image stored at url."""
+    filename = stored_image_filename(url)
+
+    if filename is None:
+        return None
+
+    location = url.removesuffix(filename)
+    return {
+        rendition: f"{location}{rendition_key(filename, rendition)}"
+        for rendition in settings.IMAGE_RENDITIONS
+    }
+
+
+def encode_image(image: Image.Image, image_format: str, **params) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **params)
+    return buffer.getvalue()
+
+
+def render_image(
+    data: bytes,
+    renditions: dict[str, tuple[int, int]],
+    max_pixels: int,
+    webp_quality: int,
+    max_size: tuple[int, int] = IMAGE_MAX_SIZE,
+) -> tuple[bytes, dict[str, bytes]]:
+    """
+    Runs in a worker process. Decodes the image once and returns the fallback image,
+    shrunk to fit into max_size in the original format, and every rendition in WebP.
+
+    The pixel count is checked from the header, before the image is decoded. JPEGs are decoded
+    in draft mode, the decoder itself scales them down by up to 8 times to the largest size
+    needed, which is much cheaper than decoding the full image and resizing it afterwards.
+    """
+    try:
+        image = Image.open(BytesIO(data))
+    except Exception:
+        raise InvalidImageError("Invalid image file")
+
+    if image.format not in IMAGE_FORMATS:
+        raise InvalidImageError("File must be in JPEG or PNG format")
+
+    if image.width * image.height > max_pixels:
+        raise InvalidImageError(f"Image must not have more than {max_pixels} pixels")
+
+    image_format = image.format
+    sizes = [max_size, *renditions.values()]
+
+    if image_format == "JPEG":
+        image.draft(image.mode, (max(width for width, _ in sizes), max(height for _, height in sizes)))
+
+    try:
+        image.load()
+    except Exception:
+        raise InvalidImageError("Invalid image file")
+
+    fallback = image.copy()
+    fallback.thumbnail(max_size)
+
+    # WebP stores RGB and RGBA only, palette and CMYK images are converted once for all the renditions
+    has_alpha = "A" in image.getbands() or "transparency" in image.info
+    source = image.convert("RGBA" if has_alpha else "RGB")
+    webp_images = {}
+
+    # From the largest rendition to the smallest, each one is resized from the previous one
+    for rendition, size in sorted(renditions.items(), key=lambda item: item[1], reverse=True):
+        source = source.copy()
+        source.thumbnail(size)
+        webp_images[rendition] = encode_image(source, "WEBP", quality=webp_quality)
+
+    return encode_image(fallback, image_format), {
+        rendition: webp_images[rendition] for rendition in renditions
+    }
+
+
+class ImageProcessingExecutor:
+    """
+    Process pool rendering the uploaded images, so decoding a large photo neither blocks
+    the event loop nor holds the GIL of the application process.
+
+    The pool is started on the first upload, processes that serve no uploads never start it.
+    Workers are spawned rather than forked, a fork would copy the event loop and its threads.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None,
+        max_pixels: int,
+        renditions: dict[str, tuple[int, int]],
+        webp_quality: int,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pixels = max_pixels
+        self.renditions = renditions
+        self.webp_quality = webp_quality
+        self.executor: ProcessPoolExecutor | None = None
+
+    async def render(self, data: bytes) -> tuple[bytes, dict[str, bytes]]:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, render_image, data, self.renditions, self.max_pixels, self.webp_quality
+        )
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+image_processing_executor = ImageProcessingExecutor(
+    max_workers=settings.IMAGE_PROCESSING_WORKERS,
+    max_pixels=settings.IMAGE_MAX_PIXELS,
+    renditions=settings.IMAGE_RENDITIONS,
+    webp_quality=settings.IMAGE_WEBP_QUALITY,
+)
@@ -2,4 +2,9 @@ from botocore.config import Config
 
 from configs.settings import settings
 
-minio_config = Config(region_name=settings.MINIO_REGION, signature_version="v4")
+# The client is shared by all the requests of the process, so its connection pool is sized for them
+minio_config = Config(
+    region_name=settings.MINIO_REGION,
+    signature_version="v4",
+    max_pool_connections=settings.MINIO_MAX_POOL_CONNECTIONS,
+)
@@ -0,0 +1,47 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from configs.settings import settings
+from exception_handlers.auth_exc_handlers import PasswordHashingOverloaded
+
+Result = TypeVar("Result")
+
+
+class PasswordHashingExecutor:
+    """
+    Runs bcrypt on a few dedicated threads, so hashing a password does not block the event loop
+    and the other requests of the process. bcrypt releases the GIL, the threads hash in parallel.
+
+    At most max_workers + queue_size hashes are pending, the next one is rejected at once
+    with PasswordHashingOverloaded instead of waiting behind a login storm. By default one
+    CPU is left to the event loop, a busy hashing thread on every CPU would slow it down as well.
+    """
+
+    def __init__(self, max_workers: int | None, queue_size: int):
+        if max_workers is None:
+            max_workers = min(max((os.cpu_count() or 1) - 1, 1), 4)
+
+        self.max_workers = max_workers
+        self.max_pending = max_workers + queue_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hashing")
+        self.pending = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable[..., Result], *args) -> Result:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHashingOverloaded(message="Too many logins at the moment. Please try again later")
+
+        self.pending += 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+
+password_hashing_executor = PasswordHashingExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS, queue_size=settings.PASSWORD_HASHING_QUEUE_SIZE
+)
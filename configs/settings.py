@@ -9,6 +9,18 @@ class Settings(BaseSettings):
     DB_PORT: int
     DB_DATABASE: str
     DB_DRIVER: str
+    # postgresql_connection_pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # postgresql_read_replica (reads go to the primary when the host is not set)
+    DB_REPLICA_HOST: str | None = None
+    DB_REPLICA_PORT: int | None = None
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
     # pgadmin
     PGADMIN_DEFAULT_EMAIL: str
     PGADMIN_DEFAULT_PASSWORD: str
@@ -18,6 +30,8 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_MINUTES: int
     RESET_PASSWORD_TOKEN_EXPIRE_MINUTES: int
+    PASSWORD_HASHING_WORKERS: int | None = None
+    PASSWORD_HASHING_QUEUE_SIZE: int = 32
     # minio_s3
     MINIO_ROOT_USER: str
     MINIO_ROOT_PASSWORD: str
@@ -26,6 +40,22 @@ class Settings(BaseSettings):
     MINIO_URL: str
     MINIO_REGION: str
     MINIO_URL_TO_OPEN_FILE: str
+    MINIO_MAX_POOL_CONNECTIONS: int = 20
+    IMAGE_PROCESSING_WORKERS: int | None = None
+    IMAGE_MAX_PIXELS: int = 40_000_000
+    IMAGE_RENDITIONS: dict[str, tuple[int, int]] = {
+        "list": (100, 150),
+        "detail": (200, 300),
+        "retina": (400, 600),
+    }
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+    IMAGE_MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    IMAGE_UPLOAD_EXPIRE_SECONDS: int = 600
+    IMAGE_STAGED_UPLOAD_EXPIRE_DAYS: int = 1
+    IMAGE_RELEASE_GRACE_SECONDS: int = 3600
+    # Images the image worker processes at once
+    IMAGE_WORKER_CONCURRENCY: int = 4
     # rabbitmq
     RABBITMQ_HOST: str
     RABBITMQ_PORT: int
@@ -33,7 +63,13 @@ class Settings(BaseSettings):
     RABBITMQ_PASSWORD: str
     RABBITMQ_RESET_PASSWORD_QUEUE: str
     RABBITMQ_REMINDER_QUEUE: str
+    RABBITMQ_IMAGE_PROCESSING_QUEUE: str = "image-processing"
+    # A job failing this many times, e.g. on a database outage, is dropped
+    RABBITMQ_IMAGE_PROCESSING_DELIVERY_LIMIT: int = 5
     RESET_PASSWORD_LINK: str
+    RABBITMQ_CHANNEL_POOL_SIZE: int = 10
+    RABBITMQ_PUBLISHER_CONFIRMS: bool = True
+    RABBITMQ_PUBLISH_TIMEOUT: float = 5
     # Test_database
     TEST_DB_USERNAME: str
     TEST_DB_PASSWORD: str
@@ -42,11 +78,32 @@ class Settings(BaseSettings):
     # Redis
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    # detail_cache (book, author and genre detail responses)
+    DETAIL_CACHE_TTL_SECONDS: int = 300
+    # An invalidated detail is not cached again meanwhile, to outlast the replica lag and the slowest read
+    DETAIL_CACHE_FENCE_SECONDS: int = 10
+    # user_cache (authenticated users, blocking a user takes effect within the local TTL)
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_LOCAL_TTL_SECONDS: float = 5
+    USER_CACHE_MAX_SIZE: int = 1024
+    # An invalidated user is not cached again meanwhile, to outlast the replica lag and the slowest read
+    USER_CACHE_FENCE_SECONDS: int = 10
 
     @property
     def db_url(self):
         return f"{self.DB_DRIVER}://{self.DB_USERNAME}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_DATABASE}"
 
+    @property
+    def replica_db_url(self):
+        if not self.DB_REPLICA_HOST:
+            return None
+
+        replica_port = self.DB_REPLICA_PORT or self.DB_PORT
+        return f"{self.DB_DRIVER}://{self.DB_USERNAME}:{self.DB_PASSWORD}@{self.DB_REPLICA_HOST}:{replica_port}/{self.DB_DATABASE}"
+
     @property
     def test_db_url(self):
         return f"{self.DB_DRIVER}://{self.TEST_DB_USERNAME}:{self.TEST_DB_PASSWORD}@{self.TEST_DB_HOST}:{self.DB_PORT}/{self.TEST_DB_DATABASE}"
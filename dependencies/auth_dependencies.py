@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 
 import jwt
+import redis.asyncio as aioredis
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError
@@ -10,10 +11,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from configs.logger import logger
+from configs.password_hashing import password_hashing_executor
 from configs.settings import settings
-from dependencies.db_dependency import db_session
+from dependencies.db_dependency import SESSION_USERNAME_KEY, db_session
+from dependencies.redis_dependency import get_redis_connection
 from exception_handlers.auth_exc_handlers import PermissionDeniedError
 from exception_handlers.user_exc_handlers import UserDoesNotExist
+from repositories.user_cache_repository import UserCacheRepository
 from repositories.user_repository import UserRepository
 from schemas.auth_schemas import TokenData
 from schemas.user_schemas import UserReadSchema
@@ -30,12 +34,12 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str):
+    return await password_hashing_executor.run(pwd_context.verify, plain_password, hashed_password)
 
 
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
+async def get_password_hash(password: str):
+    return await password_hashing_executor.run(pwd_context.hash, password)
 
 
 async def get_user(username: str, db: AsyncSession = Depends(db_session)):
@@ -59,7 +63,7 @@ async def authenticate_user(username: str, password: str, db: AsyncSession = Dep
     if not user:
         return False
 
-    if not verify_password(plain_password=password, hashed_password=user.password):
+    if not await verify_password(plain_password=password, hashed_password=user.password):
         return False
 
     return user
@@ -81,7 +85,11 @@ def create_refresh_token(data: dict):
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(db_session)):
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(db_session),
+    redis: aioredis.Redis = Depends(get_redis_connection),
+):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate User's credentials",
@@ -97,16 +105,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
             raise credentials_exception
 
         token_data = TokenData(username=username)
+        user_id = payload.get("id")
 
     except PyJWTError as exc:
         logger.error(f"PyJWTError occurred: {str(exc)}")
         raise credentials_exception
 
-    user = await get_user(username=token_data.username, db=db)
+    user_cache_repository = UserCacheRepository(redis, db)
+    user = await user_cache_repository.get_user(user_id=int(user_id)) if user_id else None
 
-    if user is None:
-        logger.error("Could not validate User's credentials")
-        raise credentials_exception
+    # A renamed user is looked up by the old username of the token again, which fails as before
+    if user is None or user.username != token_data.username:
+        user = await get_user(username=token_data.username, db=db)
+
+        if user is None:
+            logger.error("Could not validate User's credentials")
+            raise credentials_exception
+
+        user = UserReadSchema.model_validate(user)
+        await user_cache_repository.set_user(user=user)
+
+    db.info[SESSION_USERNAME_KEY] = user.username
 
     return user
 
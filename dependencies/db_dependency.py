@@ -1,6 +1,100 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import redis.asyncio as aioredis
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from brokers.redis import get_redis_client, mark_recent_write
 from configs.database import async_session_factory
+from configs.settings import settings
+from repositories.detail_cache_repository import (
+    DETAIL_CACHE_INVALIDATIONS_KEY,
+    apply_detail_cache_invalidations,
+)
+from repositories.entity_loader import release_entity_loader
+from repositories.minio_s3_repository import RELEASED_IMAGES_KEY, queue_released_images
+from repositories.user_cache_repository import (
+    USER_CACHE_INVALIDATIONS_KEY,
+    apply_user_cache_invalidations,
+)
+
+# Username of the authenticated user the session works for, set by get_current_user
+SESSION_USERNAME_KEY = "username"
+
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
+
+CACHE_INVALIDATION_KEYS = (DETAIL_CACHE_INVALIDATIONS_KEY, USER_CACHE_INVALIDATIONS_KEY)
+
+# Everything the repositories defer until the session has committed
+AFTER_COMMIT_KEYS = (*CACHE_INVALIDATION_KEYS, RELEASED_IMAGES_KEY)
 
 
-async def db_session():
-    async with async_session_factory() as session:
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Commits everything the repositories flushed within the block at once,
+    or rolls it all back if the block raises. The identity map the entity loader
+    serves from is cleared at the end, so entities are never reused across blocks.
+    Cache invalidations and released images recorded within a rolled back block are discarded.
+    """
+    try:
         yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+
+        for key in AFTER_COMMIT_KEYS:
+            session.info.pop(key, None)
+
+        raise
+    finally:
+        session.expunge_all()
+        release_entity_loader(session)
+
+
+async def invalidate_caches(session: AsyncSession, redis: aioredis.Redis) -> None:
+    """
+    Applies the cache invalidations recorded within the committed unit of work. Cached entries
+    are dropped only now, so they cannot be filled again from uncommitted data.
+    """
+    invalidations = session.info.pop(DETAIL_CACHE_INVALIDATIONS_KEY, None)
+    user_ids = session.info.pop(USER_CACHE_INVALIDATIONS_KEY, None)
+
+    if invalidations:
+        await apply_detail_cache_invalidations(redis=redis, invalidations=invalidations)
+
+    if user_ids:
+        await apply_user_cache_invalidations(redis=redis, user_ids=user_ids)
+
+
+async def queue_images_for_sweep(session: AsyncSession, redis: aioredis.Redis) -> None:
+    """
+    Queues the images the committed unit of work stopped referring to. They are not deleted
+    in the request, a concurrent request may be about to commit a reference to the same image.
+    """
+    released_images = session.info.pop(RELEASED_IMAGES_KEY, None)
+
+    if released_images:
+        await queue_released_images(redis=redis, released_images=released_images)
+
+
+async def db_session(request: Request):
+    # Repositories only flush, the request is committed once after the endpoint returns
+    # and before the response is sent, so a failed commit still reaches the client
+    async with async_session_factory() as session, unit_of_work(session):
+        yield session
+
+    username = session.info.get(SESSION_USERNAME_KEY)
+    mark_write = username and request.method not in READ_ONLY_METHODS
+
+    if mark_write or any(key in session.info for key in AFTER_COMMIT_KEYS):
+        redis = get_redis_client(request.app.state.redis_pool)
+        await invalidate_caches(session=session, redis=redis)
+        await queue_images_for_sweep(session=session, redis=redis)
+
+        # The user's reads stick to the primary for a while, until the replica has caught up
+        if mark_write:
+            await mark_recent_write(
+                redis=redis, username=username, expiration=settings.DB_READ_YOUR_WRITES_SECONDS
+            )
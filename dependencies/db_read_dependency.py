@@ -0,0 +1,32 @@
+import redis.asyncio as aioredis
+from fastapi import Depends
+
+from brokers.redis import has_recent_write
+from configs.database import async_session_factory, replica_session_factory
+from dependencies.auth_dependencies import get_current_active_user
+from dependencies.redis_dependency import get_redis_connection
+from repositories.entity_loader import release_entity_loader
+from schemas.user_schemas import UserReadSchema
+
+
+async def db_read_session(
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    redis: aioredis.Redis = Depends(get_redis_connection),
+):
+    """
+    Session for pure reads. It is bound to the read replica, unless no replica is configured
+    or the user has written within the last DB_READ_YOUR_WRITES_SECONDS, so users always
+    see their own changes.
+    """
+    session_factory = replica_session_factory
+
+    if replica_session_factory is not async_session_factory and await has_recent_write(
+        redis=redis, username=current_user.username
+    ):
+        session_factory = async_session_factory
+
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            release_entity_loader(session)
@@ -1,31 +1,40 @@
 import aioboto3
 from aiobotocore.client import AioBaseClient
-from botocore.exceptions import BotoCoreError, ClientError
-from fastapi import Depends
+from fastapi import Depends, Request
 
 from configs.logger import logger
 from configs.minio_s3 import minio_config
 from configs.settings import settings
-from exception_handlers.minio_s3_exc_handlers import S3OperationException
 from repositories.minio_s3_repository import MinioS3Repository
 from usecases.minio_s3_usecases import MinioS3UseCase
 
 minio_aioboto3_session = aioboto3.session.Session()
 
 
-async def get_minio_s3_client() -> AioBaseClient:
-    try:
-        async with minio_aioboto3_session.client(
-            service_name="s3",
-            endpoint_url=settings.MINIO_URL,
-            aws_access_key_id=settings.MINIO_ROOT_USER,
-            aws_secret_access_key=settings.MINIO_ROOT_PASSWORD,
-            config=minio_config,
-        ) as minio_s3_client:
-            yield minio_s3_client
-    except (ClientError, BotoCoreError) as exc:
-        logger.error(f"Failed to get Minio S3 client: {str(exc)}")
-        raise S3OperationException(message=f"Failed to get Minio S3 client: {str(exc)}")
+def create_minio_s3_client():
+    """Returns the context of the S3 client shared by the whole process, entered by the lifespan."""
+    return minio_aioboto3_session.client(
+        service_name="s3",
+        endpoint_url=settings.MINIO_URL,
+        aws_access_key_id=settings.MINIO_ROOT_USER,
+        aws_secret_access_key=settings.MINIO_ROOT_PASSWORD,
+        config=minio_config,
+    )
+
+
+async def provision_minio_s3_buckets(s3_client: AioBaseClient) -> None:
+    minio_s3_usecase = MinioS3UseCase(MinioS3Repository(s3_client))
+
+    for bucket_name in (settings.MINIO_BUCKET_NAME_1, settings.MINIO_BUCKET_NAME_2):
+        try:
+            await minio_s3_usecase.provision_bucket(bucket_name=bucket_name)
+        except Exception as exc:
+            # The application still starts, the first upload to the bucket provisions it
+            logger.error(f"Failed to provision a bucket '{bucket_name}': {str(exc)}")
+
+
+async def get_minio_s3_client(request: Request) -> AioBaseClient:
+    return request.app.state.minio_s3_client
 
 
 async def get_minio_s3_usecase(s3_client: AioBaseClient = Depends(get_minio_s3_client)) -> MinioS3UseCase:
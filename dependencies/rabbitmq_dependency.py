@@ -0,0 +1,7 @@
+from fastapi import Request
+
+from brokers.rabbitmq import RabbitMQPublisher
+
+
+async def get_rabbitmq_publisher(request: Request) -> RabbitMQPublisher:
+    return request.app.state.rabbitmq_publisher
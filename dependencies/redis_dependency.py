@@ -1,9 +1,7 @@
+from fastapi import Request
+
 from brokers.redis import get_redis_client
 
 
-async def get_redis_connection():
-    redis = await get_redis_client()
-    try:
-        yield redis
-    finally:
-        await redis.close()
+async def get_redis_connection(request: Request):
+    return get_redis_client(request.app.state.redis_pool)
@@ -1,42 +1,95 @@
+import redis.asyncio as aioredis
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from brokers.rabbitmq import RabbitMQPublisher
+from configs.database import labelled_engines
 from dependencies.db_dependency import db_session
+from dependencies.db_read_dependency import db_read_session
 from dependencies.minio_s3_dependency import get_minio_s3_usecase
+from dependencies.rabbitmq_dependency import get_rabbitmq_publisher
+from dependencies.redis_dependency import get_redis_connection
 from repositories.author_repository import AuthorRepository
+from repositories.book_import_repository import BookImportRepository
 from repositories.book_instance_repository import BookInstanceRepository
 from repositories.book_repository import BookRepository
+from repositories.detail_cache_repository import DetailCacheRepository
 from repositories.genre_repository import GenreRepository
+from repositories.user_cache_repository import UserCacheRepository
 from repositories.user_repository import UserRepository
 from usecases.auth_usecases import AuthUseCase
 from usecases.author_usecases import AuthorUseCase
+from usecases.book_import_usecases import BookImportUseCase
 from usecases.book_instance_usecases import BookInstanceUseCase
 from usecases.book_usecases import BookUseCase
 from usecases.genre_usecases import GenreUseCase
+from usecases.metrics_usecases import MetricsUseCase
 from usecases.minio_s3_usecases import MinioS3UseCase
 from usecases.user_usecases import UserUseCase
 
 
-async def get_auth_usecase(db: AsyncSession = Depends(db_session)) -> AuthUseCase:
+async def get_auth_usecase(
+    db: AsyncSession = Depends(db_session),
+    rabbitmq_publisher: RabbitMQPublisher = Depends(get_rabbitmq_publisher),
+) -> AuthUseCase:
     user_repository = UserRepository(db)
-    return AuthUseCase(user_repository)
+    return AuthUseCase(user_repository, rabbitmq_publisher)
 
 
-async def get_user_usecase(db: AsyncSession = Depends(db_session)) -> UserUseCase:
+async def get_user_usecase(
+    db: AsyncSession = Depends(db_session), redis: aioredis.Redis = Depends(get_redis_connection)
+) -> UserUseCase:
     user_repository = UserRepository(db)
-    return UserUseCase(user_repository)
+    user_cache_repository = UserCacheRepository(redis, db)
+    return UserUseCase(user_repository, user_cache_repository)
+
+
+async def get_detail_cache_repository(
+    db: AsyncSession = Depends(db_session), redis: aioredis.Redis = Depends(get_redis_connection)
+) -> DetailCacheRepository:
+    return DetailCacheRepository(redis, db)
+
+
+async def get_detail_cache_read_repository(
+    db: AsyncSession = Depends(db_read_session), redis: aioredis.Redis = Depends(get_redis_connection)
+) -> DetailCacheRepository:
+    return DetailCacheRepository(redis, db)
 
 
 async def get_author_usecase(
-    db: AsyncSession = Depends(db_session), minio_s3_usecase: MinioS3UseCase = Depends(get_minio_s3_usecase)
+    db: AsyncSession = Depends(db_session),
+    minio_s3_usecase: MinioS3UseCase = Depends(get_minio_s3_usecase),
+    detail_cache_repository: DetailCacheRepository = Depends(get_detail_cache_repository),
+    rabbitmq_publisher: RabbitMQPublisher = Depends(get_rabbitmq_publisher),
 ) -> AuthorUseCase:
     author_repository = AuthorRepository(db)
-    return AuthorUseCase(author_repository, minio_s3_usecase)
+    return AuthorUseCase(author_repository, minio_s3_usecase, detail_cache_repository, rabbitmq_publisher)
+
+
+# The read usecases serve the catalog GET endpoints, their repositories use the read session
+async def get_author_read_usecase(
+    db: AsyncSession = Depends(db_read_session),
+    minio_s3_usecase: MinioS3UseCase = Depends(get_minio_s3_usecase),
+    detail_cache_repository: DetailCacheRepository = Depends(get_detail_cache_read_repository),
+) -> AuthorUseCase:
+    author_repository = AuthorRepository(db)
+    return AuthorUseCase(author_repository, minio_s3_usecase, detail_cache_repository)
+
+
+async def get_genre_usecase(
+    db: AsyncSession = Depends(db_session),
+    detail_cache_repository: DetailCacheRepository = Depends(get_detail_cache_repository),
+) -> GenreUseCase:
+    genre_repository = GenreRepository(db)
+    return GenreUseCase(genre_repository, detail_cache_repository)
 
 
-async def get_genre_usecase(db: AsyncSession = Depends(db_session)) -> GenreUseCase:
+async def get_genre_read_usecase(
+    db: AsyncSession = Depends(db_read_session),
+    detail_cache_repository: DetailCacheRepository = Depends(get_detail_cache_read_repository),
+) -> GenreUseCase:
     genre_repository = GenreRepository(db)
-    return GenreUseCase(genre_repository)
+    return GenreUseCase(genre_repository, detail_cache_repository)
 
 
 # TODO добавить потом book_instance_usecase
@@ -44,9 +97,28 @@ async def get_book_usecase(
     db: AsyncSession = Depends(db_session),
     author_usecase: AuthorUseCase = Depends(get_author_usecase),
     genre_usecase: GenreUseCase = Depends(get_genre_usecase),
+    detail_cache_repository: DetailCacheRepository = Depends(get_detail_cache_repository),
+) -> BookUseCase:
+    book_repository = BookRepository(db)
+    return BookUseCase(book_repository, author_usecase, genre_usecase, detail_cache_repository)
+
+
+async def get_book_read_usecase(
+    db: AsyncSession = Depends(db_read_session),
+    author_usecase: AuthorUseCase = Depends(get_author_read_usecase),
+    genre_usecase: GenreUseCase = Depends(get_genre_read_usecase),
+    detail_cache_repository: DetailCacheRepository = Depends(get_detail_cache_read_repository),
 ) -> BookUseCase:
     book_repository = BookRepository(db)
-    return BookUseCase(book_repository, author_usecase, genre_usecase)
+    return BookUseCase(book_repository, author_usecase, genre_usecase, detail_cache_repository)
+
+
+async def get_book_import_usecase(
+    db: AsyncSession = Depends(db_session),
+    detail_cache_repository: DetailCacheRepository = Depends(get_detail_cache_repository),
+) -> BookImportUseCase:
+    book_import_repository = BookImportRepository(db)
+    return BookImportUseCase(book_import_repository, detail_cache_repository)
 
 
 # TODO добавить потом order_usecase
@@ -54,6 +126,25 @@ async def get_book_instance_usecase(
     db: AsyncSession = Depends(db_session),
     book_usecase: BookUseCase = Depends(get_book_usecase),
     minio_s3_usecase: MinioS3UseCase = Depends(get_minio_s3_usecase),
+    detail_cache_repository: DetailCacheRepository = Depends(get_detail_cache_repository),
+    rabbitmq_publisher: RabbitMQPublisher = Depends(get_rabbitmq_publisher),
+) -> BookInstanceUseCase:
+    book_instance_repository = BookInstanceRepository(db)
+    return BookInstanceUseCase(
+        book_instance_repository, book_usecase, minio_s3_usecase, detail_cache_repository, rabbitmq_publisher
+    )
+
+
+async def get_book_instance_read_usecase(
+    db: AsyncSession = Depends(db_read_session),
+    book_usecase: BookUseCase = Depends(get_book_read_usecase),
+    minio_s3_usecase: MinioS3UseCase = Depends(get_minio_s3_usecase),
 ) -> BookInstanceUseCase:
     book_instance_repository = BookInstanceRepository(db)
     return BookInstanceUseCase(book_instance_repository, book_usecase, minio_s3_usecase)
+
+
+async def get_metrics_usecase(
+    rabbitmq_publisher: RabbitMQPublisher = Depends(get_rabbitmq_publisher),
+) -> MetricsUseCase:
+    return MetricsUseCase(labelled_engines, rabbitmq_publisher)
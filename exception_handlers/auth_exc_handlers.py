@@ -14,6 +14,12 @@ class TokenError(Exception):
         super().__init__(self.detail)
 
 
+class PasswordHashingOverloaded(Exception):
+    def __init__(self, message: str):
+        self.detail = message
+        super().__init__(self.detail)
+
+
 def register_auth_exception_handlers(app: FastAPI):
     @app.exception_handler(PermissionDeniedError)
     async def permission_denied_exception_handler(request: Request, exc: PermissionDeniedError):
@@ -28,3 +34,13 @@ def register_auth_exception_handlers(app: FastAPI):
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={"detail": exc.detail},
         )
+
+    @app.exception_handler(PasswordHashingOverloaded)
+    async def password_hashing_overloaded_exception_handler(
+        request: Request, exc: PasswordHashingOverloaded
+    ):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": exc.detail},
+            headers={"Retry-After": "1"},
+        )
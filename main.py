@@ -1,6 +1,15 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from brokers.rabbitmq import RabbitMQPublisher
+from brokers.redis import create_redis_pool
+from configs.image_processing import image_processing_executor
+from dependencies.minio_s3_dependency import (
+    create_minio_s3_client,
+    provision_minio_s3_buckets,
+)
 from exception_handlers.auth_exc_handlers import register_auth_exception_handlers
 from exception_handlers.author_exc_handlers import register_author_exception_handlers
 from exception_handlers.book_exc_handlers import register_book_exception_handlers
@@ -14,10 +23,30 @@ from routers import (
     book_instance_routes,
     book_routes,
     genre_routes,
+    metrics_routes,
     user_routes,
 )
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One Redis connection pool, one RabbitMQ connection and one S3 client
+    # serve all the requests of the process
+    app.state.redis_pool = create_redis_pool()
+    app.state.rabbitmq_publisher = RabbitMQPublisher()
+    await app.state.rabbitmq_publisher.start()
+
+    async with create_minio_s3_client() as minio_s3_client:
+        app.state.minio_s3_client = minio_s3_client
+        await provision_minio_s3_buckets(minio_s3_client)
+        yield
+
+    await app.state.rabbitmq_publisher.close()
+    await app.state.redis_pool.aclose()
+    image_processing_executor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Register all the exception handlers
 register_auth_exception_handlers(app)
@@ -36,6 +65,7 @@ app.include_router(author_routes.router)
 app.include_router(genre_routes.router)
 app.include_router(book_routes.router)
 app.include_router(book_instance_routes.router)
+app.include_router(metrics_routes.router)
 
 # Middleware
 app.add_middleware(
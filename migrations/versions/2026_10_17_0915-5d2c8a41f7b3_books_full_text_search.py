@@ -0,0 +1,146 @@
+"""books_full_text_search
+
+Revision ID: 5d2c8a41f7b3
+Revises: 11486e6fe4db
+Create Date: 2026-10-17 09:15:42.318604
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2c8a41f7b3"
+down_revision: Union[str, None] = "11486e6fe4db"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("books", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION book_search_vector(title_rus text, title_origin text, author_names text)
+        RETURNS tsvector LANGUAGE sql IMMUTABLE AS $$
+            SELECT setweight(to_tsvector('russian', coalesce(title_rus, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(title_rus, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(title_origin, '')), 'B')
+                || setweight(to_tsvector('simple', coalesce(author_names, '')), 'C')
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION book_author_names(target_book_id integer)
+        RETURNS text LANGUAGE sql STABLE AS $$
+            SELECT string_agg(authors.name || ' ' || authors.surname, ' ')
+            FROM author_book_association
+            JOIN authors ON authors.id = author_book_association.author_id
+            WHERE author_book_association.book_id = target_book_id
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION books_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            author_names text;
+        BEGIN
+            -- A book being inserted cannot be mapped to authors yet
+            IF TG_OP = 'UPDATE' THEN
+                author_names := book_author_names(NEW.id);
+            END IF;
+
+            NEW.search_vector := book_search_vector(NEW.title_rus, NEW.title_origin, author_names);
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION author_book_association_search_vector_trigger() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE books
+            SET search_vector = book_search_vector(books.title_rus, books.title_origin, names.author_names)
+            FROM (
+                SELECT changed.book_id, string_agg(authors.name || ' ' || authors.surname, ' ') AS author_names
+                FROM (SELECT DISTINCT book_id FROM changed_rows) AS changed
+                LEFT JOIN author_book_association ON author_book_association.book_id = changed.book_id
+                LEFT JOIN authors ON authors.id = author_book_association.author_id
+                GROUP BY changed.book_id
+            ) AS names
+            WHERE books.id = names.book_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION authors_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE books
+            SET search_vector = book_search_vector(title_rus, title_origin, book_author_names(id))
+            WHERE id IN (SELECT book_id FROM author_book_association WHERE author_id = NEW.id);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER books_search_vector_update
+        BEFORE INSERT OR UPDATE OF title_rus, title_origin ON books
+        FOR EACH ROW EXECUTE FUNCTION books_search_vector_trigger()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER author_book_association_search_vector_insert
+        AFTER INSERT ON author_book_association
+        REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION author_book_association_search_vector_trigger()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER author_book_association_search_vector_delete
+        AFTER DELETE ON author_book_association
+        REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION author_book_association_search_vector_trigger()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER authors_search_vector_update
+        AFTER UPDATE OF name, surname ON authors
+        FOR EACH ROW EXECUTE FUNCTION authors_search_vector_trigger()
+        """
+    )
+
+    op.execute(
+        "UPDATE books SET search_vector = book_search_vector(title_rus, title_origin, book_author_names(id))"
+    )
+    op.create_index(
+        "ix_books_search_vector", "books", ["search_vector"], unique=False, postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_books_search_vector", table_name="books", postgresql_using="gin")
+    op.execute("DROP TRIGGER authors_search_vector_update ON authors")
+    op.execute("DROP TRIGGER author_book_association_search_vector_delete ON author_book_association")
+    op.execute("DROP TRIGGER author_book_association_search_vector_insert ON author_book_association")
+    op.execute("DROP TRIGGER books_search_vector_update ON books")
+    op.execute("DROP FUNCTION authors_search_vector_trigger()")
+    op.execute("DROP FUNCTION author_book_association_search_vector_trigger()")
+    op.execute("DROP FUNCTION books_search_vector_trigger()")
+    op.execute("DROP FUNCTION book_author_names(integer)")
+    op.execute("DROP FUNCTION book_search_vector(text, text, text)")
+    op.drop_column("books", "search_vector")
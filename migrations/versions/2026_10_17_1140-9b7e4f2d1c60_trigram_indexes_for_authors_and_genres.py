@@ -0,0 +1,31 @@
+"""trigram_indexes_for_authors_and_genres
+
+Revision ID: 9b7e4f2d1c60
+Revises: 5d2c8a41f7b3
+Create Date: 2026-10-17 11:40:07.852113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b7e4f2d1c60"
+down_revision: Union[str, None] = "5d2c8a41f7b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_authors_full_name_trgm "
+        "ON authors USING gist ((surname || ' ' || name) gist_trgm_ops)"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_genres_name_trgm ON genres USING gist (name gist_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_genres_name_trgm", table_name="genres")
+    op.drop_index("ix_authors_full_name_trgm", table_name="authors")
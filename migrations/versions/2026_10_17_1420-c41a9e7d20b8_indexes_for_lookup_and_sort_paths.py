@@ -0,0 +1,64 @@
+"""indexes_for_lookup_and_sort_paths
+
+Revision ID: c41a9e7d20b8
+Revises: 9b7e4f2d1c60
+Create Date: 2026-10-17 14:20:31.604275
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41a9e7d20b8"
+down_revision: Union[str, None] = "9b7e4f2d1c60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns, partial index condition)
+INDEXES = [
+    ("ix_books_title_rus_id", "books", ["title_rus", "id"], None),
+    ("ix_authors_surname_name", "authors", ["surname", "name"], None),
+    ("ix_authors_surname_id", "authors", ["surname", "id"], None),
+    ("ix_authors_nationality_id", "authors", ["nationality", "id"], None),
+    ("ix_genres_name_id", "genres", ["name", "id"], None),
+    ("ix_users_name_id", "users", ["name", "id"], None),
+    ("ix_users_surname_id", "users", ["surname", "id"], None),
+    ("ix_book_instances_book_id", "book_instances", ["book_id"], None),
+    ("ix_book_instances_available_book_id", "book_instances", ["book_id"], "status = 'AVAILABLE'"),
+    ("ix_orders_reader_id", "orders", ["reader_id"], None),
+    ("ix_orders_status_planned_return_date", "orders", ["status", "planned_return_date"], None),
+    ("ix_orders_active_planned_return_date", "orders", ["planned_return_date"], "status = 'ACTIVE'"),
+    ("ix_author_book_association_author_id", "author_book_association", ["author_id"], None),
+    ("ix_genre_book_association_genre_id", "genre_book_association", ["genre_id"], None),
+    (
+        "ix_order_book_instance_association_book_instance_id",
+        "order_book_instance_association",
+        ["book_instance_id"],
+        None,
+    ),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not lock the tables against writes,
+    # but cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, condition in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(condition) if condition else None,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,46 @@
+"""indexes_for_image_references
+
+Revision ID: e83f1b6a5d27
+Revises: c41a9e7d20b8
+Create Date: 2026-10-17 16:30:12.418093
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e83f1b6a5d27"
+down_revision: Union[str, None] = "c41a9e7d20b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column)
+INDEXES = [
+    ("ix_authors_photo_s3_url", "authors", "photo_s3_url"),
+    ("ix_book_instances_cover_s3_url", "book_instances", "cover_s3_url"),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not lock the tables against writes,
+    # but cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(f"{column} IS NOT NULL"),
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
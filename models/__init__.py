@@ -1,7 +1,9 @@
 from models.author import Author
 from models.base import BaseModel
 from models.book import Book, BookInstance
+from models.book_search import BOOK_SEARCH_FUNCTIONS, BOOK_SEARCH_TRIGGERS
 from models.genre import Genre
 from models.order import Order
 from models.reader import Reader
+from models.trigram_indexes import TRIGRAM_INDEXES
 from models.user import User
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import BaseModel, author_book_association
@@ -12,6 +12,14 @@ if TYPE_CHECKING:
 
 class Author(BaseModel):
     __tablename__ = "authors"
+    __table_args__ = (
+        Index("ix_authors_surname_name", "surname", "name"),
+        # Keyset pagination sorted by surname or nationality
+        Index("ix_authors_surname_id", "surname", "id"),
+        Index("ix_authors_nationality_id", "nationality", "id"),
+        # Reference count of a photo before it is deleted from S3
+        Index("ix_authors_photo_s3_url", "photo_s3_url", postgresql_where=text("photo_s3_url IS NOT NULL")),
+    )
 
     name: Mapped[str] = mapped_column(nullable=False)
     surname: Mapped[str] = mapped_column(nullable=False)
@@ -23,7 +31,7 @@ class Author(BaseModel):
     updated_by: Mapped[Optional[str]] = mapped_column(default=None)
 
     books: Mapped[list["Book"]] = relationship(
-        "Book", secondary=author_book_association, back_populates="authors", lazy="joined"
+        "Book", secondary=author_book_association, back_populates="authors", lazy="raise"
     )
 
     def __str__(self):
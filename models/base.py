@@ -1,8 +1,12 @@
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
 class BaseModel(DeclarativeBase):
+    # Values generated by the database (ids, func.now() timestamps) are fetched with
+    # RETURNING in the same INSERT/UPDATE, so written objects never need a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
 
@@ -11,6 +15,8 @@ author_book_association = Table(
     BaseModel.metadata,
     Column("book_id", ForeignKey("books.id", ondelete="CASCADE"), primary_key=True),
     Column("author_id", ForeignKey("authors.id", ondelete="CASCADE"), primary_key=True),
+    # The primary key leads with book_id, the books of an author need their own index
+    Index("ix_author_book_association_author_id", "author_id"),
 )
 
 
@@ -19,6 +25,7 @@ genre_book_association = Table(
     BaseModel.metadata,
     Column("book_id", ForeignKey("books.id", ondelete="CASCADE"), primary_key=True),
     Column("genre_id", ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_genre_book_association_genre_id", "genre_id"),
 )
 
 
@@ -27,4 +34,5 @@ order_book_instance_association = Table(
     BaseModel.metadata,
     Column("order_id", ForeignKey("orders.id", ondelete="CASCADE"), primary_key=True),
     Column("book_instance_id", ForeignKey("book_instances.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_order_book_instance_association_book_instance_id", "book_instance_id"),
 )
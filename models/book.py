@@ -2,7 +2,8 @@ from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DECIMAL, DateTime, ForeignKey, func
+from sqlalchemy import DECIMAL, DateTime, ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import (
@@ -20,6 +21,11 @@ if TYPE_CHECKING:
 
 class Book(BaseModel):
     __tablename__ = "books"
+    __table_args__ = (
+        Index("ix_books_search_vector", "search_vector", postgresql_using="gin"),
+        # Lookups by title and the keyset pagination sorted by title
+        Index("ix_books_title_rus_id", "title_rus", "id"),
+    )
 
     title_rus: Mapped[str] = mapped_column(nullable=False)
     title_origin: Mapped[Optional[str]] = mapped_column(default=None)
@@ -29,15 +35,17 @@ class Book(BaseModel):
     created_by: Mapped[Optional[str]] = mapped_column(default=None)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
     updated_by: Mapped[Optional[str]] = mapped_column(default=None)
+    # Maintained by database triggers from the titles and the author names (see models.book_search)
+    search_vector: Mapped[Optional[str]] = mapped_column(TSVECTOR, deferred=True)
 
     authors: Mapped[list["Author"]] = relationship(
-        "Author", secondary=author_book_association, back_populates="books", lazy="joined"
+        "Author", secondary=author_book_association, back_populates="books", lazy="raise"
     )
     genres: Mapped[list["Genre"]] = relationship(
-        "Genre", secondary=genre_book_association, back_populates="books", lazy="joined"
+        "Genre", secondary=genre_book_association, back_populates="books", lazy="raise"
     )
     instances: Mapped[list["BookInstance"]] = relationship(
-        "BookInstance", back_populates="book", lazy="joined"
+        "BookInstance", back_populates="book", lazy="raise"
     )
 
     def __str__(self):
@@ -52,6 +60,18 @@ class BookStatusEnum(str, Enum):
 
 class BookInstance(BaseModel):
     __tablename__ = "book_instances"
+    __table_args__ = (
+        Index("ix_book_instances_book_id", "book_id"),
+        Index(
+            "ix_book_instances_available_book_id", "book_id", postgresql_where=text("status = 'AVAILABLE'")
+        ),
+        # Reference count of a cover before it is deleted from S3
+        Index(
+            "ix_book_instances_cover_s3_url",
+            "cover_s3_url",
+            postgresql_where=text("cover_s3_url IS NOT NULL"),
+        ),
+    )
 
     book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), nullable=False)
     imprint_year: Mapped[Optional[int]] = mapped_column(default=None)
@@ -65,9 +85,9 @@ class BookInstance(BaseModel):
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
     updated_by: Mapped[Optional[str]] = mapped_column(default=None)
 
-    book = relationship("Book", back_populates="instances", lazy="joined")
+    book = relationship("Book", back_populates="instances", lazy="raise")
     orders: Mapped[List["Order"]] = relationship(
-        "Order", secondary=order_book_instance_association, back_populates="book_instances", lazy="joined"
+        "Order", secondary=order_book_instance_association, back_populates="book_instances", lazy="raise"
     )
 
     def __str__(self):
@@ -0,0 +1,103 @@
+from sqlalchemy import DDL, event
+
+from models.base import BaseModel
+
+# The full-text document of a book: the Russian title is indexed both stemmed ('russian')
+# and as is ('simple'), the original title and the author names only as is, since they
+# are mostly foreign words and proper names that a Russian stemmer would mangle.
+# Weights let the ranking put title matches above author matches.
+BOOK_SEARCH_FUNCTIONS = [
+    """
+CREATE OR REPLACE FUNCTION book_search_vector(title_rus text, title_origin text, author_names text)
+RETURNS tsvector LANGUAGE sql IMMUTABLE AS $$
+    SELECT setweight(to_tsvector('russian', coalesce(title_rus, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(title_rus, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(title_origin, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(author_names, '')), 'C')
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION book_author_names(target_book_id integer)
+RETURNS text LANGUAGE sql STABLE AS $$
+    SELECT string_agg(authors.name || ' ' || authors.surname, ' ')
+    FROM author_book_association
+    JOIN authors ON authors.id = author_book_association.author_id
+    WHERE author_book_association.book_id = target_book_id
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION books_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    author_names text;
+BEGIN
+    -- A book being inserted cannot be mapped to authors yet
+    IF TG_OP = 'UPDATE' THEN
+        author_names := book_author_names(NEW.id);
+    END IF;
+
+    NEW.search_vector := book_search_vector(NEW.title_rus, NEW.title_origin, author_names);
+    RETURN NEW;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION author_book_association_search_vector_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE books
+    SET search_vector = book_search_vector(books.title_rus, books.title_origin, names.author_names)
+    FROM (
+        SELECT changed.book_id, string_agg(authors.name || ' ' || authors.surname, ' ') AS author_names
+        FROM (SELECT DISTINCT book_id FROM changed_rows) AS changed
+        LEFT JOIN author_book_association ON author_book_association.book_id = changed.book_id
+        LEFT JOIN authors ON authors.id = author_book_association.author_id
+        GROUP BY changed.book_id
+    ) AS names
+    WHERE books.id = names.book_id;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION authors_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE books
+    SET search_vector = book_search_vector(title_rus, title_origin, book_author_names(id))
+    WHERE id IN (SELECT book_id FROM author_book_association WHERE author_id = NEW.id);
+    RETURN NULL;
+END
+$$
+""",
+]
+
+# Mapping changes are handled once per statement with a single set-based UPDATE, so a bulk
+# import or a multi-author mapping recomputes every touched book a single time
+BOOK_SEARCH_TRIGGERS = [
+    """
+CREATE OR REPLACE TRIGGER books_search_vector_update
+BEFORE INSERT OR UPDATE OF title_rus, title_origin ON books
+FOR EACH ROW EXECUTE FUNCTION books_search_vector_trigger()
+""",
+    """
+CREATE OR REPLACE TRIGGER author_book_association_search_vector_insert
+AFTER INSERT ON author_book_association
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION author_book_association_search_vector_trigger()
+""",
+    """
+CREATE OR REPLACE TRIGGER author_book_association_search_vector_delete
+AFTER DELETE ON author_book_association
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION author_book_association_search_vector_trigger()
+""",
+    """
+CREATE OR REPLACE TRIGGER authors_search_vector_update
+AFTER UPDATE OF name, surname ON authors
+FOR EACH ROW EXECUTE FUNCTION authors_search_vector_trigger()
+""",
+]
+
+# Databases built with metadata.create_all (tests, benchmarks) get the same triggers
+# the migrations install. The migrations keep their own copy, a change here needs a new revision.
+for statement in BOOK_SEARCH_FUNCTIONS + BOOK_SEARCH_TRIGGERS:
+    event.listen(BaseModel.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
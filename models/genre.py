@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import BaseModel, genre_book_association
@@ -10,10 +11,12 @@ if TYPE_CHECKING:
 
 class Genre(BaseModel):
     __tablename__ = "genres"
+    # Lookups by name and the keyset pagination sorted by name
+    __table_args__ = (Index("ix_genres_name_id", "name", "id"),)
 
     name: Mapped[str] = mapped_column(nullable=False)
     books: Mapped[list["Book"]] = relationship(
-        "Book", secondary=genre_book_association, back_populates="genres", lazy="joined"
+        "Book", secondary=genre_book_association, back_populates="genres", lazy="raise"
     )
 
     def __str__(self):
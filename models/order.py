@@ -2,7 +2,7 @@ from datetime import date
 from enum import Enum
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DECIMAL, Date, ForeignKey, UniqueConstraint
+from sqlalchemy import DECIMAL, Date, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import BaseModel, order_book_instance_association
@@ -19,6 +19,16 @@ class OrderStatusEnum(str, Enum):
 
 class Order(BaseModel):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_reader_id", "reader_id"),
+        Index("ix_orders_status_planned_return_date", "status", "planned_return_date"),
+        # Only open loans are scanned for overdue returns, closed ones pile up forever
+        Index(
+            "ix_orders_active_planned_return_date",
+            "planned_return_date",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+    )
 
     reader_id: Mapped[int] = mapped_column(ForeignKey("readers.id"), nullable=False)
     order_date: Mapped[date] = mapped_column(Date, nullable=False, default=date.today)
@@ -35,9 +45,9 @@ class Order(BaseModel):
     closed_by: Mapped[Optional[str]] = mapped_column(default=None)
 
     book_instances: Mapped[List["BookInstance"]] = relationship(
-        "BookInstance", secondary=order_book_instance_association, back_populates="orders", lazy="joined"
+        "BookInstance", secondary=order_book_instance_association, back_populates="orders", lazy="raise"
     )
-    reader: Mapped["Reader"] = relationship("Reader", back_populates="orders", lazy="joined")
+    reader: Mapped["Reader"] = relationship("Reader", back_populates="orders", lazy="raise")
 
     def __str__(self):
         return f"Заказ №{self.id}_{self.reader.surname}_{self.order_date}"
@@ -0,0 +1,31 @@
+from sqlalchemy import DDL, event, text
+
+from models.base import BaseModel
+
+# GiST trigram indexes serve both the similarity filters (%, <%) and the nearest-first
+# ordering by distance (<->, <<->), so a top-k lookup reads only k index entries.
+# Authors are indexed by the same "surname name" expression the repository queries with.
+TRIGRAM_EXTENSION = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+
+TRIGRAM_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_authors_full_name_trgm "
+    "ON authors USING gist ((surname || ' ' || name) gist_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_genres_name_trgm ON genres USING gist (name gist_trgm_ops)",
+]
+
+
+def pg_trgm_available(ddl, target, bind, **kw) -> bool:
+    """Tells whether the pg_trgm extension can be installed in the database."""
+    result = bind.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"))
+    return result.scalar() is not None
+
+
+# Databases built with metadata.create_all (tests, benchmarks) get the indexes the migrations
+# install, as long as the server ships the extension. The migrations keep their own copy,
+# a change here needs a new revision.
+for statement in [TRIGRAM_EXTENSION, *TRIGRAM_INDEXES]:
+    event.listen(
+        BaseModel.metadata,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql", callable_=pg_trgm_available),
+    )
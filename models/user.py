@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, func
+from sqlalchemy import Boolean, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from models.base import BaseModel
@@ -9,6 +9,11 @@ from models.user_role_enum import UserRoleEnum
 
 class User(BaseModel):
     __tablename__ = "users"
+    # Keyset pagination sorted by name or surname, username and email are unique already
+    __table_args__ = (
+        Index("ix_users_name_id", "name", "id"),
+        Index("ix_users_surname_id", "surname", "id"),
+    )
 
     name: Mapped[str] = mapped_column(nullable=False)
     surname: Mapped[str] = mapped_column(nullable=False)
@@ -17,8 +22,8 @@ class User(BaseModel):
     email: Mapped[str] = mapped_column(unique=True, nullable=False)
     role: Mapped[UserRoleEnum] = mapped_column(default=UserRoleEnum.LIBRARIAN)
     is_blocked: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now, onupdate=func.now)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
 
     def __str__(self):
         return self.username
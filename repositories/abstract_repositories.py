@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 
+import redis.asyncio as aioredis
 from aiobotocore.client import AioBaseClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -54,13 +55,25 @@ class AbstractAuthorRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_author_by_id(self, author_id):
+    async def get_author_by_id(self, author_id, load_profile):
         pass
 
     @abstractmethod
     async def get_author_by_surname_and_name(self, surname, name):
         pass
 
+    @abstractmethod
+    async def get_similar_author(self, surname, name):
+        pass
+
+    @abstractmethod
+    async def suggest_authors(self, request_payload):
+        pass
+
+    @abstractmethod
+    async def get_existing_author_ids(self, author_ids):
+        pass
+
     @abstractmethod
     async def get_all_authors(self, request_payload):
         pass
@@ -73,6 +86,14 @@ class AbstractAuthorRepository(ABC):
     async def delete_author(self, author_to_delete):
         pass
 
+    @abstractmethod
+    async def count_photo_references(self, filename):
+        pass
+
+    @abstractmethod
+    def release_photo(self, photo_s3_url):
+        pass
+
 
 class AbstractGenreRepository(ABC):
     def __init__(self, db: AsyncSession):
@@ -83,13 +104,25 @@ class AbstractGenreRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_genre_by_id(self, genre_id):
+    async def get_genre_by_id(self, genre_id, load_profile):
         pass
 
     @abstractmethod
     async def get_genre_by_name(self, name):
         pass
 
+    @abstractmethod
+    async def get_similar_genre(self, name):
+        pass
+
+    @abstractmethod
+    async def suggest_genres(self, request_payload):
+        pass
+
+    @abstractmethod
+    async def get_existing_genre_ids(self, genre_ids):
+        pass
+
     @abstractmethod
     async def get_all_genres(self, request_payload):
         pass
@@ -108,11 +141,11 @@ class AbstractBookRepository(ABC):
         self.db = db
 
     @abstractmethod
-    async def create_new_book(self, new_book):
+    async def create_new_book(self, new_book, load_profile):
         pass
 
     @abstractmethod
-    async def get_book_by_id(self, book_id):
+    async def get_book_by_id(self, book_id, load_profile):
         pass
 
     @abstractmethod
@@ -128,7 +161,19 @@ class AbstractBookRepository(ABC):
         pass
 
     @abstractmethod
-    async def update_book(self, book_to_update):
+    async def search_books(self, request_payload):
+        pass
+
+    @abstractmethod
+    async def update_book(self, book_to_update, load_profile):
+        pass
+
+    @abstractmethod
+    async def map_book_to_authors(self, book_to_update, author_ids, load_profile):
+        pass
+
+    @abstractmethod
+    async def map_book_to_genres(self, book_to_update, genre_ids, load_profile):
         pass
 
     @abstractmethod
@@ -141,11 +186,11 @@ class AbstractBookInstanceRepository(ABC):
         self.db = db
 
     @abstractmethod
-    async def create_new_book_instance(self, book, new_book_instance):
+    async def create_new_book_instance(self, new_book_instance, load_profile):
         pass
 
     @abstractmethod
-    async def get_book_instance_by_id(self, book_instance_id):
+    async def get_book_instance_by_id(self, book_instance_id, load_profile):
         pass
 
     @abstractmethod
@@ -153,11 +198,36 @@ class AbstractBookInstanceRepository(ABC):
         pass
 
     @abstractmethod
-    async def update_book_instance(self, book, book_item_to_update):
+    async def update_book_instance(self, book_item_to_update, new_status, load_profile):
+        pass
+
+    @abstractmethod
+    async def delete_book_instance(self, book_item_to_delete):
+        pass
+
+    @abstractmethod
+    async def count_cover_references(self, filename):
+        pass
+
+    @abstractmethod
+    def release_cover(self, cover_s3_url):
         pass
 
+
+class AbstractBookImportRepository(ABC):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
     @abstractmethod
-    async def delete_book_instance(self, book, book_item_to_delete):
+    async def create_staging_table(self):
+        pass
+
+    @abstractmethod
+    async def copy_rows_to_staging(self, rows):
+        pass
+
+    @abstractmethod
+    async def import_staged_books(self, username):
         pass
 
 
@@ -173,10 +243,74 @@ class AbstractMinioS3Repository(ABC):
     async def create_bucket(self, bucket_name):
         pass
 
+    @abstractmethod
+    async def file_exists(self, bucket_name, filename):
+        pass
+
+    @abstractmethod
+    async def touch_file(self, bucket_name, filename, content_type):
+        pass
+
+    @abstractmethod
+    async def get_file_last_modified(self, bucket_name, filename):
+        pass
+
+    @abstractmethod
+    async def expire_staged_files(self, bucket_name):
+        pass
+
     @abstractmethod
     async def upload_file(self, bucket_name, file):
         pass
 
+    @abstractmethod
+    async def create_upload_form(self, bucket_name, key, content_type):
+        pass
+
+    @abstractmethod
+    async def check_staged_file(self, bucket_name, key):
+        pass
+
+    @abstractmethod
+    async def upload_staged_file(self, bucket_name, key, etag):
+        pass
+
     @abstractmethod
     async def delete_file(self, bucket_name, file_name):
         pass
+
+
+class AbstractDetailCacheRepository(ABC):
+    def __init__(self, redis: aioredis.Redis, db: AsyncSession):
+        self.redis = redis
+        self.db = db
+
+    @abstractmethod
+    async def get_detail(self, entity, entity_id, schema):
+        pass
+
+    @abstractmethod
+    async def set_detail(self, entity, entity_id, detail, dependencies):
+        pass
+
+    @abstractmethod
+    def invalidate(self, entity, entity_ids):
+        pass
+
+
+class AbstractUserCacheRepository(ABC):
+    def __init__(self, redis: aioredis.Redis, db: AsyncSession):
+        self.redis = redis
+        self.db = db
+
+    @abstractmethod
+    async def get_user(self, user_id):
+        pass
+
+    @abstractmethod
+    async def set_user(self, user):
+        pass
+
+    @abstractmethod
+    def invalidate(self, user_ids):
+        pass
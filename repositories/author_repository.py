@@ -1,28 +1,50 @@
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import selectinload
 
+from configs.settings import settings
 from exception_handlers.author_exc_handlers import AuthorDoesNotExist
 from models import Author
 from repositories.abstract_repositories import AbstractAuthorRepository
+from repositories.entity_loader import get_entity_loader
+from repositories.minio_s3_repository import RELEASED_IMAGES_KEY
+from repositories.pagination import paginate_query, split_page
+from repositories.projection import rows_to_schemas, schema_columns
+from repositories.similarity import (
+    author_full_name,
+    contains_similar_word,
+    is_similar,
+    similarity_distance,
+    word_similarity_distance,
+)
 from schemas.author_schemas import (
     AuthorDeleteSchema,
     AuthorListQueryParams,
-    AuthorOrderBy,
+    AuthorLoadProfile,
     AuthorReadSchema,
     AuthorsListSchema,
+    AuthorSuggestQueryParams,
 )
 
+AUTHOR_LOAD_OPTIONS = {
+    AuthorLoadProfile.card: [],
+    AuthorLoadProfile.with_books: [selectinload(Author.books)],
+}
+
 
 class AuthorRepository(AbstractAuthorRepository):
     async def create_new_author(self, new_author: Author) -> Author:
         self.db.add(new_author)
-        await self.db.commit()
-        await self.db.refresh(new_author)
+        await self.db.flush()
         return new_author
 
-    async def get_author_by_id(self, author_id: int) -> Author | None:
+    async def get_author_by_id(
+        self, author_id: int, load_profile: AuthorLoadProfile = AuthorLoadProfile.card
+    ) -> Author | None:
+        if not AUTHOR_LOAD_OPTIONS[load_profile]:
+            return await get_entity_loader(self.db).load(Author, author_id)
+
         result = await self.db.execute(
-            select(Author).options(joinedload(Author.books)).where(Author.id == author_id)
+            select(Author).options(*AUTHOR_LOAD_OPTIONS[load_profile]).where(Author.id == author_id)
         )
         author = result.unique().scalars().first()
 
@@ -40,38 +62,77 @@ class AuthorRepository(AbstractAuthorRepository):
 
         return author if author else None
 
-    async def get_all_authors(self, request_payload: AuthorListQueryParams) -> AuthorsListSchema:
-        query = select(Author)
-        sort_column = getattr(Author, request_payload.sort_by)
+    async def get_similar_author(self, surname: str, name: str) -> Author | None:
+        full_name = author_full_name()
+        searched_name = f"{surname} {name}"
+
+        result = await self.db.execute(
+            select(Author)
+            .where(is_similar(full_name, searched_name))
+            .order_by(similarity_distance(full_name, searched_name), Author.id)
+            .limit(1)
+        )
+
+        return result.scalars().first()
+
+    async def suggest_authors(self, request_payload: AuthorSuggestQueryParams) -> AuthorsListSchema:
+        full_name = author_full_name()
 
-        if request_payload.order_by == AuthorOrderBy.desc:
-            sort_column = sort_column.desc()
+        result = await self.db.execute(
+            select(*schema_columns(Author, AuthorReadSchema))
+            .where(contains_similar_word(full_name, request_payload.q))
+            .order_by(word_similarity_distance(full_name, request_payload.q), Author.id)
+            .limit(request_payload.limit)
+        )
 
-        query = query.order_by(sort_column)
+        return AuthorsListSchema(authors=rows_to_schemas(rows=result.all(), schema=AuthorReadSchema))
 
-        offset = (request_payload.page - 1) * request_payload.limit
-        query = query.offset(offset).limit(request_payload.limit)
+    async def get_existing_author_ids(self, author_ids: list[int]) -> set[int]:
+        result = await self.db.execute(select(Author.id).where(Author.id.in_(author_ids)))
+        return set(result.scalars().all())
+
+    async def get_all_authors(self, request_payload: AuthorListQueryParams) -> AuthorsListSchema:
+        query = select(*schema_columns(Author, AuthorReadSchema))
+        query = paginate_query(query=query, model=Author, request_payload=request_payload)
 
         result = await self.db.execute(query)
-        authors = result.unique().scalars().all()
+        authors, next_cursor = split_page(rows=result.all(), request_payload=request_payload)
 
         if not authors:
             raise AuthorDoesNotExist(message="No authors found")
 
-        authors = [AuthorReadSchema.model_validate(author) for author in authors]
+        authors = rows_to_schemas(rows=authors, schema=AuthorReadSchema)
 
-        return AuthorsListSchema(authors=authors)
+        return AuthorsListSchema(authors=authors, next_cursor=next_cursor)
 
     async def update_author(self, author_to_update: Author) -> Author:
-        await self.db.commit()
-        await self.db.refresh(author_to_update)
+        await self.db.flush()
 
         return author_to_update
 
     async def delete_author(self, author_to_delete: Author) -> AuthorDeleteSchema:
         await self.db.delete(author_to_delete)
-        await self.db.commit()
+        await self.db.flush()
 
         return AuthorDeleteSchema(
             message=f"Author '{author_to_delete.name} {author_to_delete.surname}' deleted successfully"
         )
+
+    async def count_photo_references(self, filename: str) -> int:
+        # Photos are stored by content, so the same object can be the photo of several authors,
+        # whatever location the URL of the photo was built with
+        result = await self.db.execute(
+            select(func.count())
+            .select_from(Author)
+            .where(
+                or_(
+                    Author.photo_s3_url == filename,
+                    Author.photo_s3_url.endswith(f"/{filename}", autoescape=True),
+                )
+            )
+        )
+        return result.scalar_one()
+
+    def release_photo(self, photo_s3_url: str) -> None:
+        released_images = self.db.info.setdefault(RELEASED_IMAGES_KEY, {})
+        released_images.setdefault(settings.MINIO_BUCKET_NAME_2, set()).add(photo_s3_url.rsplit("/", 1)[-1])
@@ -0,0 +1,242 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.schema import CreateTable, DropTable
+
+from models import Author, Book, Genre
+from models.base import author_book_association, genre_book_association
+from repositories.abstract_repositories import AbstractBookImportRepository
+
+# Session-local table the raw rows are copied into before being merged into the catalog.
+# It never outlives the transaction it was created in.
+book_import_staging = Table(
+    "book_import_staging",
+    MetaData(),
+    Column("row_number", Integer, nullable=False),
+    Column("title_rus", String, nullable=False),
+    Column("title_origin", String),
+    Column("quantity", Integer, nullable=False),
+    Column("available_for_loan", Integer, nullable=False),
+    Column("authors_name", String, nullable=False),
+    Column("authors_surname", String, nullable=False),
+    Column("authors_nationality", String, nullable=False),
+    Column("genre_name", String, nullable=False),
+    Column("author_id", Integer),
+    Column("genre_id", Integer),
+    Column("book_id", Integer),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+STAGING_COPY_COLUMNS = [
+    "row_number",
+    "title_rus",
+    "title_origin",
+    "quantity",
+    "available_for_loan",
+    "authors_name",
+    "authors_surname",
+    "authors_nationality",
+    "genre_name",
+]
+
+
+class BookImportRepository(AbstractBookImportRepository):
+    async def create_staging_table(self) -> None:
+        await self.db.execute(CreateTable(book_import_staging))
+
+    async def copy_rows_to_staging(self, rows: list[tuple]) -> None:
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+
+        await raw_connection.driver_connection.copy_records_to_table(
+            book_import_staging.name, records=rows, columns=STAGING_COPY_COLUMNS
+        )
+
+    async def _create_missing_authors(self, username: str) -> int:
+        staging = book_import_staging.c
+        new_authors = (
+            select(
+                staging.authors_name,
+                staging.authors_surname,
+                staging.authors_nationality,
+                func.now(),
+                func.now(),
+                literal(username),
+            )
+            .distinct(staging.authors_surname, staging.authors_name)
+            .where(
+                ~exists().where(
+                    Author.surname == staging.authors_surname, Author.name == staging.authors_name
+                )
+            )
+            .order_by(staging.authors_surname, staging.authors_name, staging.row_number)
+        )
+        result = await self.db.execute(
+            insert(Author.__table__).from_select(
+                ["name", "surname", "nationality", "created_at", "updated_at", "created_by"], new_authors
+            )
+        )
+        return result.rowcount
+
+    async def _create_missing_genres(self) -> int:
+        staging = book_import_staging.c
+        new_genres = (
+            select(staging.genre_name).distinct().where(~exists().where(Genre.name == staging.genre_name))
+        )
+        result = await self.db.execute(insert(Genre.__table__).from_select(["name"], new_genres))
+        return result.rowcount
+
+    async def _resolve_author_and_genre_ids(self) -> None:
+        staging = book_import_staging.c
+        authors = (
+            select(Author.surname, Author.name, func.min(Author.id).label("id"))
+            .group_by(Author.surname, Author.name)
+            .subquery()
+        )
+        genres = select(Genre.name, func.min(Genre.id).label("id")).group_by(Genre.name).subquery()
+
+        await self.db.execute(
+            update(book_import_staging)
+            .values(author_id=authors.c.id)
+            .where(authors.c.surname == staging.authors_surname, authors.c.name == staging.authors_name)
+        )
+        await self.db.execute(
+            update(book_import_staging)
+            .values(genre_id=genres.c.id)
+            .where(genres.c.name == staging.genre_name)
+        )
+
+    async def _reject_existing_books(self) -> dict[int, str]:
+        staging = book_import_staging.c
+        result = await self.db.execute(
+            delete(book_import_staging)
+            .where(
+                Book.title_rus == staging.title_rus,
+                author_book_association.c.book_id == Book.id,
+                Author.id == author_book_association.c.author_id,
+                Author.surname == staging.authors_surname,
+            )
+            .returning(staging.row_number, staging.title_rus, staging.authors_name, staging.authors_surname)
+        )
+        return {
+            row.row_number: f"The book '{row.title_rus}' of the author {row.authors_name} "
+            f"{row.authors_surname} already exists"
+            for row in result.all()
+        }
+
+    async def _reject_duplicate_rows(self) -> dict[int, str]:
+        staging = book_import_staging.c
+        earlier = book_import_staging.alias("earlier")
+        result = await self.db.execute(
+            delete(book_import_staging)
+            .where(
+                earlier.c.title_rus == staging.title_rus,
+                earlier.c.authors_surname == staging.authors_surname,
+                earlier.c.row_number < staging.row_number,
+            )
+            .returning(staging.row_number, earlier.c.row_number.label("earlier_row_number"))
+        )
+        return {
+            row.row_number: f"Duplicates the book in row {row.earlier_row_number}" for row in result.all()
+        }
+
+    async def _insert_books(self, username: str) -> int:
+        staging = book_import_staging.c
+
+        # Ids are taken from the books sequence up front, so the association rows
+        # can be written straight from the staging table afterwards
+        await self.db.execute(
+            update(book_import_staging).values(
+                book_id=func.nextval(func.pg_get_serial_sequence(Book.__tablename__, "id"))
+            )
+        )
+
+        new_books = select(
+            staging.book_id,
+            staging.title_rus,
+            staging.title_origin,
+            staging.quantity,
+            staging.available_for_loan,
+            func.now(),
+            func.now(),
+            literal(username),
+        ).order_by(staging.row_number)
+        result = await self.db.execute(
+            insert(Book.__table__).from_select(
+                [
+                    "id",
+                    "title_rus",
+                    "title_origin",
+                    "quantity",
+                    "available_for_loan",
+                    "created_at",
+                    "updated_at",
+                    "created_by",
+                ],
+                new_books,
+            )
+        )
+
+        await self.db.execute(
+            insert(author_book_association).from_select(
+                ["book_id", "author_id"], select(staging.book_id, staging.author_id)
+            )
+        )
+        await self.db.execute(
+            insert(genre_book_association).from_select(
+                ["book_id", "genre_id"], select(staging.book_id, staging.genre_id)
+            )
+        )
+
+        return result.rowcount
+
+    async def import_staged_books(self, username: str) -> dict:
+        """
+        Merges the staged rows into the catalog with set-based statements.
+
+            Returns:
+                dict: Counters of created rows, the rejected rows with their reasons and the ids
+                of the authors and genres the imported books were added to.
+        """
+        # The rejected rows are dropped first, so no author or genre is created for a book never inserted
+        rejected_rows = await self._reject_existing_books()
+        rejected_rows.update(await self._reject_duplicate_rows())
+
+        created_authors = await self._create_missing_authors(username=username)
+        created_genres = await self._create_missing_genres()
+        await self._resolve_author_and_genre_ids()
+
+        imported_books = await self._insert_books(username=username)
+
+        staging = book_import_staging.c
+        affected = (
+            await self.db.execute(
+                select(
+                    func.array_agg(staging.author_id.distinct()).label("author_ids"),
+                    func.array_agg(staging.genre_id.distinct()).label("genre_ids"),
+                )
+            )
+        ).one()
+
+        await self.db.execute(DropTable(book_import_staging))
+
+        return dict(
+            imported_books=imported_books,
+            created_authors=created_authors,
+            created_genres=created_genres,
+            rejected_rows=rejected_rows,
+            author_ids=affected.author_ids or [],
+            genre_ids=affected.genre_ids or [],
+        )
@@ -1,27 +1,124 @@
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from configs.settings import settings
 from models import Book, BookInstance
+from models.book import BookStatusEnum
 from repositories.abstract_repositories import AbstractBookInstanceRepository
-from schemas.book_schemas import BookInstanceDeleteSchema
+from repositories.book_repository import BOOK_LOAD_OPTIONS
+from repositories.entity_loader import get_entity_loader
+from repositories.minio_s3_repository import RELEASED_IMAGES_KEY
+from schemas.book_schemas import (
+    BookInstanceDeleteSchema,
+    BookInstanceLoadProfile,
+    BookLoadProfile,
+)
+
+BOOK_INSTANCE_LOAD_OPTIONS = {
+    BookInstanceLoadProfile.card: [],
+    BookInstanceLoadProfile.with_book: [joinedload(BookInstance.book).selectinload(Book.authors)],
+}
+
+# How a single instance in each status counts towards (Book.quantity, Book.available_for_loan)
+STATUS_COUNTERS = {
+    BookStatusEnum.AVAILABLE: (1, 1),
+    BookStatusEnum.LOANED: (1, 0),
+    BookStatusEnum.LOST: (0, 0),
+}
+NO_INSTANCE_COUNTERS = (0, 0)
 
 
 class BookInstanceRepository(AbstractBookInstanceRepository):
-    async def create_new_book_instance(self, book: Book, new_book_instance: BookInstance) -> BookInstance:
+    async def _reload_book_instance(
+        self, book_instance: BookInstance, load_profile: BookInstanceLoadProfile
+    ) -> BookInstance:
+        if not BOOK_INSTANCE_LOAD_OPTIONS[load_profile]:
+            return book_instance
+
+        result = await self.db.execute(
+            select(BookInstance)
+            .options(*BOOK_INSTANCE_LOAD_OPTIONS[load_profile])
+            .where(BookInstance.id == book_instance.id)
+            .execution_options(populate_existing=True)
+        )
+        return result.unique().scalars().one()
+
+    async def _shift_book_counters(
+        self, book_id: int, old_status: BookStatusEnum | None, new_status: BookStatusEnum | None
+    ):
+        """
+        Applies the change of an instance status to the counters of its book in one UPDATE,
+        so concurrent transitions never overwrite each other. None stands for "no instance",
+        i.e. the instance is being created or deleted.
+
+            Returns:
+                Row: The book title and counters after the update, or None if there is no such book.
+        """
+        old_quantity, old_available = STATUS_COUNTERS.get(old_status, NO_INSTANCE_COUNTERS)
+        new_quantity, new_available = STATUS_COUNTERS.get(new_status, NO_INSTANCE_COUNTERS)
+
+        result = await self.db.execute(
+            update(Book)
+            .where(Book.id == book_id)
+            .values(
+                quantity=Book.quantity + (new_quantity - old_quantity),
+                available_for_loan=Book.available_for_loan + (new_available - old_available),
+            )
+            .returning(Book.title_rus, Book.quantity, Book.available_for_loan)
+            .execution_options(synchronize_session=False)
+        )
+        counters = result.first()
+
+        # A book this request has already loaded is served from the identity map later on,
+        # so it is kept in step with the counters in the database
+        book = self.db.identity_map.get(self.db.identity_key(Book, book_id))
+
+        if counters and book is not None:
+            set_committed_value(book, "quantity", counters.quantity)
+            set_committed_value(book, "available_for_loan", counters.available_for_loan)
+
+        return counters
+
+    async def _change_status(self, book_instance_id: int, new_status: BookStatusEnum) -> BookStatusEnum:
+        """Sets the new status and returns the previous one, reading it under a row lock."""
+        previous = (
+            select(BookInstance.id, BookInstance.status)
+            .where(BookInstance.id == book_instance_id)
+            .with_for_update()
+            .subquery()
+        )
+        result = await self.db.execute(
+            update(BookInstance.__table__)
+            .where(BookInstance.id == previous.c.id)
+            .values(status=new_status)
+            .returning(previous.c.status)
+        )
+        return result.scalar_one()
+
+    async def create_new_book_instance(
+        self,
+        new_book_instance: BookInstance,
+        load_profile: BookInstanceLoadProfile = BookInstanceLoadProfile.card,
+    ) -> BookInstance:
         self.db.add(new_book_instance)
+        await self.db.flush()
 
-        book.quantity += 1
-        book.available_for_loan += 1
+        await self._shift_book_counters(
+            book_id=new_book_instance.book_id, old_status=None, new_status=new_book_instance.status
+        )
 
-        await self.db.commit()
-        await self.db.refresh(new_book_instance)
+        return await self._reload_book_instance(book_instance=new_book_instance, load_profile=load_profile)
 
-        return new_book_instance
+    async def get_book_instance_by_id(
+        self, book_instance_id: int, load_profile: BookInstanceLoadProfile = BookInstanceLoadProfile.card
+    ) -> BookInstance | None:
+        if not BOOK_INSTANCE_LOAD_OPTIONS[load_profile]:
+            return await get_entity_loader(self.db).load(BookInstance, book_instance_id)
 
-    async def get_book_instance_by_id(self, book_instance_id: int) -> BookInstance | None:
         result = await self.db.execute(
             select(BookInstance)
-            .options(joinedload(BookInstance.book))
+            .options(*BOOK_INSTANCE_LOAD_OPTIONS[load_profile])
             .where(BookInstance.id == book_instance_id)
         )
         book_instance = result.unique().scalars().first()
@@ -31,39 +128,67 @@ class BookInstanceRepository(AbstractBookInstanceRepository):
     async def get_all_instances_by_book_id(self, book_id: int) -> Book | None:
         result = await self.db.execute(
             select(Book)
-            .options(joinedload(Book.authors), joinedload(Book.genres), joinedload(Book.instances))
+            .options(*BOOK_LOAD_OPTIONS[BookLoadProfile.with_instances])
             .where(Book.id == book_id)
         )
         book_with_instances = result.unique().scalars().first()
 
         return book_with_instances if book_with_instances else None
 
-    async def update_book_instance(self, book: Book, book_item_to_update: BookInstance) -> BookInstance:
-        if book_item_to_update.status == "loaned":
-            book.available_for_loan -= 1
-
-        if book_item_to_update.status == "lost":
-            book.quantity -= 1
-            book.available_for_loan -= 1
+    async def update_book_instance(
+        self,
+        book_item_to_update: BookInstance,
+        new_status: BookStatusEnum | None = None,
+        load_profile: BookInstanceLoadProfile = BookInstanceLoadProfile.card,
+    ) -> BookInstance:
+        if new_status is not None:
+            old_status = await self._change_status(
+                book_instance_id=book_item_to_update.id, new_status=new_status
+            )
+            set_committed_value(book_item_to_update, "status", new_status)
 
-        await self.db.commit()
-        await self.db.refresh(book_item_to_update)
+            await self._shift_book_counters(
+                book_id=book_item_to_update.book_id, old_status=old_status, new_status=new_status
+            )
 
-        return book_item_to_update
+        await self.db.flush()
 
-    async def delete_book_instance(
-        self, book: Book, book_item_to_delete: BookInstance
-    ) -> BookInstanceDeleteSchema:
-        if book_item_to_delete.status == "available":
-            book.quantity -= 1
-            book.available_for_loan -= 1
+        return await self._reload_book_instance(book_instance=book_item_to_update, load_profile=load_profile)
 
-        if book_item_to_delete.status == "loaned":
-            book.quantity -= 1
+    async def delete_book_instance(self, book_item_to_delete: BookInstance) -> BookInstanceDeleteSchema:
+        result = await self.db.execute(
+            delete(BookInstance)
+            .where(BookInstance.id == book_item_to_delete.id)
+            .returning(BookInstance.book_id, BookInstance.status)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.one()
+        self.db.expunge(book_item_to_delete)
 
-        await self.db.delete(book_item_to_delete)
-        await self.db.commit()
+        book = await self._shift_book_counters(
+            book_id=deleted.book_id, old_status=deleted.status, new_status=None
+        )
+        await self.db.flush()
 
         return BookInstanceDeleteSchema(
             message=f"Book item of the book '{book.title_rus}' deleted successfully"
         )
+
+    async def count_cover_references(self, filename: str) -> int:
+        # Covers are stored by content, so the same object can be the cover of several instances,
+        # whatever location the URL of the cover was built with
+        result = await self.db.execute(
+            select(func.count())
+            .select_from(BookInstance)
+            .where(
+                or_(
+                    BookInstance.cover_s3_url == filename,
+                    BookInstance.cover_s3_url.endswith(f"/{filename}", autoescape=True),
+                )
+            )
+        )
+        return result.scalar_one()
+
+    def release_cover(self, cover_s3_url: str) -> None:
+        released_images = self.db.info.setdefault(RELEASED_IMAGES_KEY, {})
+        released_images.setdefault(settings.MINIO_BUCKET_NAME_1, set()).add(cover_s3_url.rsplit("/", 1)[-1])
@@ -1,24 +1,82 @@
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy import Float, func, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import selectinload
 
 from exception_handlers.book_exc_handlers import BookDoesNotExist
 from models import Author, Book
+from models.base import author_book_association, genre_book_association
 from repositories.abstract_repositories import AbstractBookRepository
-from schemas.book_schemas import BookDeleteSchema, BookListQueryParams, BookOrderBy
+from repositories.entity_loader import get_entity_loader
+from repositories.pagination import (
+    decode_cursor,
+    encode_cursor,
+    paginate_query,
+    split_page,
+)
+from repositories.projection import book_authors_column, rows_to_schemas, schema_columns
+from schemas.author_schemas import AuthorReadSchema
+from schemas.book_schemas import (
+    BookDeleteSchema,
+    BookListQueryParams,
+    BookLoadProfile,
+    BookSearchQueryParams,
+)
 from schemas.common_circular_schemas import BookListSchema, BookWithAuthorsReadSchema
 
+# Relationships to load for each profile. Models load nothing eagerly by default,
+# so every query has to state the graph its response actually serializes.
+# Collections are loaded with one batched IN query each instead of being joined
+# into the parent rows, so a page of books never multiplies into a cartesian product.
+BOOK_LOAD_OPTIONS = {
+    BookLoadProfile.card: [],
+    BookLoadProfile.with_authors: [selectinload(Book.authors)],
+    BookLoadProfile.with_authors_genres: [selectinload(Book.authors), selectinload(Book.genres)],
+    BookLoadProfile.with_instances: [
+        selectinload(Book.authors),
+        selectinload(Book.genres),
+        selectinload(Book.instances),
+    ],
+}
+
+
+# Search queries are parsed with both text search configurations the book documents are
+# indexed with (see models.book_search), so stemmed and exact word forms both match
+def _search_query(search_text: str):
+    stemmed_query = func.websearch_to_tsquery(literal_column("'russian'"), search_text)
+    exact_query = func.websearch_to_tsquery(literal_column("'simple'"), search_text)
+
+    return stemmed_query.op("||")(exact_query)
+
 
 class BookRepository(AbstractBookRepository):
-    async def create_new_book(self, new_book: Book) -> Book:
+    async def _reload_book(self, book: Book, load_profile: BookLoadProfile) -> Book:
+        if not BOOK_LOAD_OPTIONS[load_profile]:
+            return book
+
+        result = await self.db.execute(
+            select(Book)
+            .options(*BOOK_LOAD_OPTIONS[load_profile])
+            .where(Book.id == book.id)
+            .execution_options(populate_existing=True)
+        )
+        return result.unique().scalars().one()
+
+    async def create_new_book(
+        self, new_book: Book, load_profile: BookLoadProfile = BookLoadProfile.card
+    ) -> Book:
         self.db.add(new_book)
-        await self.db.commit()
-        await self.db.refresh(new_book)
+        await self.db.flush()
+
+        return await self._reload_book(book=new_book, load_profile=load_profile)
 
-        return new_book
+    async def get_book_by_id(
+        self, book_id: int, load_profile: BookLoadProfile = BookLoadProfile.card
+    ) -> Book | None:
+        if not BOOK_LOAD_OPTIONS[load_profile]:
+            return await get_entity_loader(self.db).load(Book, book_id)
 
-    async def get_book_by_id(self, book_id: int) -> Book | None:
         result = await self.db.execute(
-            select(Book).options(joinedload(Book.authors), joinedload(Book.genres)).where(Book.id == book_id)
+            select(Book).options(*BOOK_LOAD_OPTIONS[load_profile]).where(Book.id == book_id)
         )
         book = result.unique().scalars().first()
 
@@ -26,9 +84,11 @@ class BookRepository(AbstractBookRepository):
 
     async def get_books_by_title(self, book_title: str) -> BookListSchema:
         result = await self.db.execute(
-            select(Book).options(joinedload(Book.authors)).where(Book.title_rus == book_title)
+            select(Book)
+            .options(*BOOK_LOAD_OPTIONS[BookLoadProfile.with_authors])
+            .where(Book.title_rus == book_title)
         )
-        books = result.unique().scalars().all()
+        books = result.scalars().all()
 
         if not books:
             raise BookDoesNotExist(message="No books found")
@@ -41,40 +101,99 @@ class BookRepository(AbstractBookRepository):
         result = await self.db.execute(
             select(Book).where(Book.title_rus == title).join(Book.authors).where(Author.surname == author)
         )
-        book = result.unique().scalars().first()
+        book = result.scalars().first()
 
         return book if book else None
 
     async def get_all_books(self, request_payload: BookListQueryParams) -> BookListSchema:
-        query = select(Book).options(joinedload(Book.authors))
-        sort_column = getattr(Book, request_payload.sort_by)
+        query = select(
+            *schema_columns(Book, BookWithAuthorsReadSchema), book_authors_column(AuthorReadSchema)
+        )
+        query = paginate_query(query=query, model=Book, request_payload=request_payload)
+
+        result = await self.db.execute(query)
+        books, next_cursor = split_page(rows=result.all(), request_payload=request_payload)
 
-        if request_payload.order_by == BookOrderBy.desc:
-            sort_column = sort_column.desc()
+        if not books:
+            raise BookDoesNotExist(message="No books found")
+
+        books = rows_to_schemas(rows=books, schema=BookWithAuthorsReadSchema)
+
+        return BookListSchema(books=books, next_cursor=next_cursor)
 
-        query = query.order_by(sort_column)
+    async def search_books(self, request_payload: BookSearchQueryParams) -> BookListSchema:
+        search_query = _search_query(request_payload.q)
+        rank = func.ts_rank_cd(Book.search_vector, search_query, type_=Float).label("rank")
+        sort_key = tuple_(rank, Book.id)
 
-        offset = (request_payload.page - 1) * request_payload.limit
-        query = query.offset(offset).limit(request_payload.limit)
+        query = select(
+            *schema_columns(Book, BookWithAuthorsReadSchema), book_authors_column(AuthorReadSchema), rank
+        ).where(Book.search_vector.bool_op("@@")(search_query))
+
+        if request_payload.cursor:
+            rank_value, row_id = decode_cursor(
+                cursor=request_payload.cursor, sort_by="rank", order_by="desc", sort_column=rank
+            )
+            query = query.where(sort_key < (rank_value, row_id))
+
+        query = query.order_by(rank.desc(), Book.id.desc()).limit(request_payload.limit + 1)
 
         result = await self.db.execute(query)
-        books = result.unique().scalars().all()
+        books = result.all()
+        next_cursor = None
+
+        if len(books) > request_payload.limit:
+            books = books[: request_payload.limit]
+            next_cursor = encode_cursor(
+                sort_by="rank", order_by="desc", sort_value=books[-1].rank, row_id=books[-1].id
+            )
 
         if not books:
             raise BookDoesNotExist(message="No books found")
 
-        books = [BookWithAuthorsReadSchema.model_validate(book) for book in books]
+        books = rows_to_schemas(rows=books, schema=BookWithAuthorsReadSchema)
 
-        return BookListSchema(books=books)
+        return BookListSchema(books=books, next_cursor=next_cursor)
+
+    async def update_book(
+        self, book_to_update: Book, load_profile: BookLoadProfile = BookLoadProfile.card
+    ) -> Book:
+        await self.db.flush()
 
-    async def update_book(self, book_to_update: Book) -> Book:
-        await self.db.commit()
-        await self.db.refresh(book_to_update)
+        return await self._reload_book(book=book_to_update, load_profile=load_profile)
+
+    async def map_book_to_authors(
+        self,
+        book_to_update: Book,
+        author_ids: list[int],
+        load_profile: BookLoadProfile = BookLoadProfile.card,
+    ) -> Book:
+        await self.db.execute(
+            insert(author_book_association)
+            .values([dict(book_id=book_to_update.id, author_id=author_id) for author_id in author_ids])
+            .on_conflict_do_nothing()
+        )
+        await self.db.flush()
+
+        return await self._reload_book(book=book_to_update, load_profile=load_profile)
+
+    async def map_book_to_genres(
+        self,
+        book_to_update: Book,
+        genre_ids: list[int],
+        load_profile: BookLoadProfile = BookLoadProfile.card,
+    ) -> Book:
+        await self.db.execute(
+            insert(genre_book_association)
+            .values([dict(book_id=book_to_update.id, genre_id=genre_id) for genre_id in genre_ids])
+            .on_conflict_do_nothing()
+        )
+        await self.db.flush()
 
-        return book_to_update
+        return await self._reload_book(book=book_to_update, load_profile=load_profile)
 
     async def delete_book(self, book_to_delete: Book) -> BookDeleteSchema:
         await self.db.delete(book_to_delete)
-        await self.db.commit()
+        await self.db.flush()
 
         return BookDeleteSchema(message=f"Book '{book_to_delete.title_rus}' deleted successfully")
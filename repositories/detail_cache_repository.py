@@ -0,0 +1,167 @@
+from enum import Enum
+from typing import Iterable, Type, TypeVar
+
+import redis.asyncio as aioredis
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.logger import logger
+from configs.settings import settings
+from repositories.abstract_repositories import AbstractDetailCacheRepository
+
+Schema = TypeVar("Schema", bound=BaseModel)
+
+# Entities whose cache has to be dropped once the session commits, set by DetailCacheRepository.invalidate
+DETAIL_CACHE_INVALIDATIONS_KEY = "detail_cache_invalidations"
+
+
+class DetailCacheEntity(str, Enum):
+    book = "book"
+    author = "author"
+    genre = "genre"
+
+
+class DetailCacheStatistics:
+    """Hit and miss counters of the detail cache, kept for the life of the process."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidated_keys = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            errors=self.errors,
+            invalidated_keys=self.invalidated_keys,
+            hit_ratio=round(self.hits / lookups, 4) if lookups else 0.0,
+        )
+
+
+detail_cache_statistics = DetailCacheStatistics()
+
+
+def detail_key(entity: DetailCacheEntity, entity_id: int) -> str:
+    return f"detail:{entity.value}:{entity_id}"
+
+
+def fence_key(key: str) -> str:
+    # Set for a while after the detail is invalidated, a detail read meanwhile may come from
+    # a replica that has not caught up with the change yet and is not cached
+    return f"{key}:fence"
+
+
+def dependents_key(entity: DetailCacheEntity, entity_id: int) -> str:
+    # The set of the cached details that embed the entity, e.g. the books of an author
+    return f"detail_dependents:{entity.value}:{entity_id}"
+
+
+class DetailCacheRepository(AbstractDetailCacheRepository):
+    """
+    Read-through cache of the serialized detail responses of books, authors and genres.
+
+    A cached detail is also registered under every entity it embeds, so changing an author
+    drops the cached books of the author as well. Invalidations are applied only after
+    the session has committed (see apply_detail_cache_invalidations) and fence the detail
+    for DETAIL_CACHE_FENCE_SECONDS, a detail is not filled in while its fence exists.
+    """
+
+    def __init__(self, redis: aioredis.Redis, db: AsyncSession):
+        super().__init__(redis=redis, db=db)
+        self.ttl = settings.DETAIL_CACHE_TTL_SECONDS
+
+    async def get_detail(
+        self, entity: DetailCacheEntity, entity_id: int, schema: Type[Schema]
+    ) -> Schema | None:
+        try:
+            payload = await self.redis.get(detail_key(entity, entity_id))
+        except Exception as exc:
+            # The cache is an optimization only, the detail is read from the database instead
+            logger.error(f"Failed to read the detail cache: {str(exc)}")
+            detail_cache_statistics.errors += 1
+            payload = None
+
+        if payload is None:
+            detail_cache_statistics.misses += 1
+            return None
+
+        detail_cache_statistics.hits += 1
+        return schema.model_validate_json(payload)
+
+    async def set_detail(
+        self,
+        entity: DetailCacheEntity,
+        entity_id: int,
+        detail: BaseModel,
+        dependencies: dict[DetailCacheEntity, Iterable[int]],
+    ) -> None:
+        key = detail_key(entity, entity_id)
+
+        try:
+            if await self.redis.exists(fence_key(key)):
+                return
+        except Exception as exc:
+            logger.error(f"Failed to fill the detail cache: {str(exc)}")
+            detail_cache_statistics.errors += 1
+            return
+
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.set(key, detail.model_dump_json(), ex=self.ttl)
+
+        for dependency, dependency_ids in dependencies.items():
+            for dependency_id in dependency_ids:
+                # The set outlives the details it lists, so a detail is never left without its entry
+                pipeline.sadd(dependents_key(dependency, dependency_id), key)
+                pipeline.expire(dependents_key(dependency, dependency_id), self.ttl)
+
+        try:
+            await pipeline.execute()
+        except Exception as exc:
+            logger.error(f"Failed to fill the detail cache: {str(exc)}")
+            detail_cache_statistics.errors += 1
+
+    def invalidate(self, entity: DetailCacheEntity, entity_ids: Iterable[int]) -> None:
+        invalidations = self.db.info.setdefault(DETAIL_CACHE_INVALIDATIONS_KEY, {})
+        invalidations.setdefault(entity, set()).update(entity_ids)
+
+
+async def apply_detail_cache_invalidations(
+    redis: aioredis.Redis, invalidations: dict[DetailCacheEntity, set[int]]
+) -> None:
+    """
+    Drops the cached details of the entities and the cached details that embed them,
+    and fences them until the replica has caught up with the change.
+    """
+    targets = [
+        (entity, entity_id) for entity, entity_ids in invalidations.items() for entity_id in entity_ids
+    ]
+
+    if not targets:
+        return
+
+    try:
+        pipeline = redis.pipeline(transaction=False)
+
+        for entity, entity_id in targets:
+            pipeline.smembers(dependents_key(entity, entity_id))
+
+        dependent_keys = set().union(*await pipeline.execute())
+        detail_keys = dependent_keys | {detail_key(entity, entity_id) for entity, entity_id in targets}
+        keys = detail_keys | {dependents_key(entity, entity_id) for entity, entity_id in targets}
+
+        pipeline = redis.pipeline(transaction=False)
+
+        for key in detail_keys:
+            pipeline.set(fence_key(key), 1, ex=settings.DETAIL_CACHE_FENCE_SECONDS)
+
+        await pipeline.execute()
+        detail_cache_statistics.invalidated_keys += await redis.delete(*keys)
+
+    except Exception as exc:
+        # Stale details expire on their own after DETAIL_CACHE_TTL_SECONDS
+        logger.error(f"Failed to invalidate the detail cache: {str(exc)}")
+        detail_cache_statistics.errors += 1
@@ -0,0 +1,107 @@
+import asyncio
+from typing import Type, TypeVar
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.logger import logger
+from models.base import BaseModel
+
+Model = TypeVar("Model", bound=BaseModel)
+
+ENTITY_LOADER_KEY = "entity_loader"
+
+
+class EntityLoader:
+    """
+    Request-scoped loader of entities by primary key.
+
+    An entity the session has already loaded in full is returned from the identity map
+    without a query, and lookups of the same model started concurrently (e.g. with
+    asyncio.gather) are coalesced into a single IN query. saved_queries counts the
+    lookups that did not need a query of their own.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.saved_queries = 0
+        self._batches: dict[type, dict[int, asyncio.Future]] = {}
+        self._query_lock = asyncio.Lock()
+
+    def _get_loaded(self, model: Type[Model], entity_id: int) -> Model | None:
+        entity = self.db.identity_map.get(self.db.identity_key(model, entity_id))
+
+        # An expired attribute would need a lazy load, which async sessions cannot do implicitly
+        if entity is None or inspect(entity).expired_attributes:
+            return None
+
+        return entity
+
+    async def _load_batch(self, model: Type[Model], batch: dict[int, asyncio.Future]) -> None:
+        try:
+            async with self._query_lock:
+                result = await self.db.execute(select(model).where(model.id.in_(batch)))
+                entities = {entity.id: entity for entity in result.scalars().all()}
+        except Exception as exc:
+            for future in batch.values():
+                future.set_exception(exc)
+            return
+
+        for entity_id, future in batch.items():
+            future.set_result(entities.get(entity_id))
+
+    async def load(self, model: Type[Model], entity_id: int) -> Model | None:
+        """
+        Returns the entity with the given id, or None if there is no such entity.
+        """
+        entity = self._get_loaded(model, entity_id)
+
+        if entity is not None:
+            self.saved_queries += 1
+            return entity
+
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(model)
+
+        if batch is not None:
+            self.saved_queries += 1
+
+            if entity_id not in batch:
+                batch[entity_id] = loop.create_future()
+
+            return await asyncio.shield(batch[entity_id])
+
+        future = loop.create_future()
+        batch = self._batches[model] = {entity_id: future}
+
+        # Let the lookups started in the same event loop tick join the batch before it is sent
+        try:
+            await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            for pending in batch.values():
+                pending.cancel()
+            raise
+        finally:
+            del self._batches[model]
+
+        await self._load_batch(model, batch)
+        return future.result()
+
+
+def get_entity_loader(db: AsyncSession) -> EntityLoader:
+    """Returns the loader of the session, creating it on first use."""
+    if ENTITY_LOADER_KEY not in db.info:
+        db.info[ENTITY_LOADER_KEY] = EntityLoader(db)
+
+    return db.info[ENTITY_LOADER_KEY]
+
+
+def release_entity_loader(db: AsyncSession) -> None:
+    """
+    Drops the loader of the session and reports the queries it saved. Called by the teardown
+    of both the read-write and the read-only session, so no loader outlives its session.
+    """
+    entity_loader = db.info.pop(ENTITY_LOADER_KEY, None)
+
+    if entity_loader is not None:
+        logger.debug(f"Entity loader saved {entity_loader.saved_queries} queries")
@@ -1,27 +1,46 @@
 from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
 
 from exception_handlers.genre_exc_handlers import GenreDoesNotExist
-from models import Genre
+from models import Book, Genre
 from repositories.abstract_repositories import AbstractGenreRepository
+from repositories.entity_loader import get_entity_loader
+from repositories.pagination import paginate_query, split_page
+from repositories.projection import rows_to_schemas, schema_columns
+from repositories.similarity import (
+    contains_similar_word,
+    is_similar,
+    similarity_distance,
+    word_similarity_distance,
+)
 from schemas.genre_schemas import (
     GenreDeleteSchema,
-    GenreOrderBy,
+    GenreLoadProfile,
     GenreReadSchema,
     GenresListSchema,
+    GenreSuggestQueryParams,
 )
 
+GENRE_LOAD_OPTIONS = {
+    GenreLoadProfile.card: [],
+    GenreLoadProfile.with_books: [selectinload(Genre.books).selectinload(Book.authors)],
+}
+
 
 class GenreRepository(AbstractGenreRepository):
     async def create_new_genre(self, new_genre: Genre) -> Genre:
         self.db.add(new_genre)
-        await self.db.commit()
-        await self.db.refresh(new_genre)
+        await self.db.flush()
         return new_genre
 
-    async def get_genre_by_id(self, genre_id: int) -> Genre | None:
+    async def get_genre_by_id(
+        self, genre_id: int, load_profile: GenreLoadProfile = GenreLoadProfile.card
+    ) -> Genre | None:
+        if not GENRE_LOAD_OPTIONS[load_profile]:
+            return await get_entity_loader(self.db).load(Genre, genre_id)
+
         result = await self.db.execute(
-            select(Genre).options(joinedload(Genre.books)).where(Genre.id == genre_id)
+            select(Genre).options(*GENRE_LOAD_OPTIONS[load_profile]).where(Genre.id == genre_id)
         )
         genre = result.unique().scalars().first()
         return genre if genre else None
@@ -31,36 +50,49 @@ class GenreRepository(AbstractGenreRepository):
         genre = result.unique().scalars().first()
         return genre if genre else None
 
-    async def get_all_genres(self, request_payload) -> GenresListSchema:
-        query = select(Genre)
-        sort_column = getattr(Genre, request_payload.sort_by)
+    async def get_similar_genre(self, name: str) -> Genre | None:
+        result = await self.db.execute(
+            select(Genre)
+            .where(is_similar(Genre.name, name))
+            .order_by(similarity_distance(Genre.name, name), Genre.id)
+            .limit(1)
+        )
+        return result.scalars().first()
 
-        if request_payload.order_by == GenreOrderBy.desc:
-            sort_column = sort_column.desc()
+    async def suggest_genres(self, request_payload: GenreSuggestQueryParams) -> GenresListSchema:
+        result = await self.db.execute(
+            select(*schema_columns(Genre, GenreReadSchema))
+            .where(contains_similar_word(Genre.name, request_payload.q))
+            .order_by(word_similarity_distance(Genre.name, request_payload.q), Genre.id)
+            .limit(request_payload.limit)
+        )
+        return GenresListSchema(genres=rows_to_schemas(rows=result.all(), schema=GenreReadSchema))
 
-        query = query.order_by(sort_column)
+    async def get_existing_genre_ids(self, genre_ids: list[int]) -> set[int]:
+        result = await self.db.execute(select(Genre.id).where(Genre.id.in_(genre_ids)))
+        return set(result.scalars().all())
 
-        offset = (request_payload.page - 1) * request_payload.limit
-        query = query.offset(offset).limit(request_payload.limit)
+    async def get_all_genres(self, request_payload) -> GenresListSchema:
+        query = select(*schema_columns(Genre, GenreReadSchema))
+        query = paginate_query(query=query, model=Genre, request_payload=request_payload)
 
         result = await self.db.execute(query)
-        genres = result.unique().scalars().all()
+        genres, next_cursor = split_page(rows=result.all(), request_payload=request_payload)
 
         if not genres:
             raise GenreDoesNotExist(message="No genres found")
 
-        genres = [GenreReadSchema.model_validate(genre) for genre in genres]
+        genres = rows_to_schemas(rows=genres, schema=GenreReadSchema)
 
-        return GenresListSchema(genres=genres)
+        return GenresListSchema(genres=genres, next_cursor=next_cursor)
 
     async def update_genre(self, genre_to_update: Genre) -> Genre:
-        await self.db.commit()
-        await self.db.refresh(genre_to_update)
+        await self.db.flush()
 
         return genre_to_update
 
     async def delete_genre(self, genre_to_delete: Genre) -> GenreDeleteSchema:
         await self.db.delete(genre_to_delete)
-        await self.db.commit()
+        await self.db.flush()
 
         return GenreDeleteSchema(message=f"Genre '{genre_to_delete.name}' deleted successfully")
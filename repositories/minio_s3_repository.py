@@ -1,12 +1,54 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime
 from io import BytesIO
 
+import redis.asyncio as aioredis
+from botocore.exceptions import ClientError
 from fastapi import HTTPException, UploadFile
-from PIL import Image
 from starlette import status
 
+from configs.image_processing import (
+    InvalidImageError,
+    image_processing_executor,
+    rendition_key,
+)
+from configs.logger import logger
 from configs.settings import settings
 from repositories.abstract_repositories import AbstractMinioS3Repository
 
+IMAGE_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png"}
+# Direct uploads land under this prefix until they are finalized
+STAGING_PREFIX = "staging/"
+# Keys of the images the session stopped referring to, queued for the sweep once it commits,
+# set by AuthorRepository.release_photo and BookInstanceRepository.release_cover
+RELEASED_IMAGES_KEY = "released_images"
+
+
+def released_images_key(bucket_name: str) -> str:
+    # Sorted set of the released keys of the bucket, scored by the time they were released
+    return f"released_images:{bucket_name}"
+
+
+async def queue_released_images(redis: aioredis.Redis, released_images: dict[str, set[str]]) -> None:
+    """
+    Queues the images released by the committed unit of work for the sweep, which deletes
+    the ones nothing refers to anymore (see ImageSweepUseCase).
+    """
+    released_at = time.time()
+
+    try:
+        pipeline = redis.pipeline(transaction=False)
+
+        for bucket_name, filenames in released_images.items():
+            pipeline.zadd(released_images_key(bucket_name), dict.fromkeys(filenames, released_at))
+
+        await pipeline.execute()
+    except Exception as exc:
+        # The images are left in the bucket, unreferenced
+        logger.error(f"Failed to queue released images: {str(exc)}")
+
 
 class MinioS3Repository(AbstractMinioS3Repository):
     async def ensure_bucket_exists(self, bucket_name: str) -> None:
@@ -17,34 +59,181 @@ class MinioS3Repository(AbstractMinioS3Repository):
             Bucket=bucket_name, CreateBucketConfiguration={"LocationConstraint": settings.MINIO_REGION}
         )
 
-    async def upload_file(self, bucket_name: str, file: UploadFile) -> None:
+    async def file_exists(self, bucket_name: str, filename: str) -> bool:
+        try:
+            await self.s3_client.head_object(Bucket=bucket_name, Key=filename)
+            return True
+
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return False
+            raise
+
+    async def touch_file(self, bucket_name: str, filename: str, content_type: str) -> bool:
+        """
+        Copies the file onto itself, so its LastModified is now and the sweep keeps it
+        for another IMAGE_RELEASE_GRACE_SECONDS. Returns False if there is no such file.
+        """
+        try:
+            await self.s3_client.copy_object(
+                Bucket=bucket_name,
+                Key=filename,
+                CopySource={"Bucket": bucket_name, "Key": filename},
+                MetadataDirective="REPLACE",
+                ContentType=content_type,
+                CacheControl=settings.IMAGE_CACHE_CONTROL,
+            )
+            return True
+
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return False
+            raise
+
+    async def get_file_last_modified(self, bucket_name: str, filename: str) -> datetime | None:
+        try:
+            file = await self.s3_client.head_object(Bucket=bucket_name, Key=filename)
+            return file["LastModified"]
+
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return None
+            raise
+
+    async def expire_staged_files(self, bucket_name: str) -> None:
+        # Direct uploads that were never finalized are removed by MinIO itself
+        await self.s3_client.put_bucket_lifecycle_configuration(
+            Bucket=bucket_name,
+            LifecycleConfiguration={
+                "Rules": [
+                    {
+                        "ID": "expire-staged-uploads",
+                        "Status": "Enabled",
+                        "Filter": {"Prefix": STAGING_PREFIX},
+                        "Expiration": {"Days": settings.IMAGE_STAGED_UPLOAD_EXPIRE_DAYS},
+                    }
+                ]
+            },
+        )
+
+    async def upload_file(self, bucket_name: str, file: UploadFile) -> str:
         # Checking file's MIME-type
-        if file.content_type not in ["image/jpeg", "image/png"]:
+        if file.content_type not in IMAGE_EXTENSIONS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="File must be in JPEG or PNG format"
             )
 
+        return await self._store_image(
+            bucket_name=bucket_name, data=await file.read(), content_type=file.content_type
+        )
+
+    async def create_upload_form(self, bucket_name: str, key: str, content_type: str) -> dict[str, str]:
+        """
+        Returns the fields of a presigned POST form uploading a file under the staging key.
+        The policy of the form limits the size of the file and fixes its type, the Content-Type
+        field is returned among the fields.
+        """
+        presigned_post = await self.s3_client.generate_presigned_post(
+            Bucket=bucket_name,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                ["content-length-range", 1, settings.IMAGE_MAX_UPLOAD_BYTES],
+                {"Content-Type": content_type},
+            ],
+            ExpiresIn=settings.IMAGE_UPLOAD_EXPIRE_SECONDS,
+        )
+        return presigned_post["fields"]
+
+    async def check_staged_file(self, bucket_name: str, key: str) -> str:
+        """
+        Checks the type and the size of the file uploaded directly under the staging key
+        without downloading it. Returns the ETag of the checked file.
+        """
         try:
-            image = Image.open(file.file)
-        except Exception:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image file")
+            staged_file = await self.s3_client.head_object(Bucket=bucket_name, Key=key)
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Uploaded file not found")
+            raise
 
-        # Checking image format
-        if image.format not in ["JPEG", "PNG"]:
+        if staged_file.get("ContentType") not in IMAGE_EXTENSIONS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="File must be in JPEG or PNG format"
             )
 
-        # Checking and changing image size if needed
-        if image.width > 200 or image.height > 300:
-            image.thumbnail((200, 300))
+        if staged_file["ContentLength"] > settings.IMAGE_MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File must not be larger than {settings.IMAGE_MAX_UPLOAD_BYTES} bytes",
+            )
 
-        # Saving image into memory
-        buffer = BytesIO()
-        image.save(buffer, format=image.format)
-        buffer.seek(0)
+        return staged_file["ETag"]
 
-        await self.s3_client.upload_fileobj(buffer, bucket_name, file.filename)
+    async def upload_staged_file(self, bucket_name: str, key: str, etag: str) -> str:
+        """
+        Stores the image uploaded directly under the staging key like upload_file does
+        and removes the staged file. Only the file checked by check_staged_file is stored.
+        """
+        try:
+            staged_file = await self.s3_client.get_object(Bucket=bucket_name, Key=key, IfMatch=etag)
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Uploaded file not found")
+            if exc.response["Error"]["Code"] in ("412", "PreconditionFailed"):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Uploaded file changed while being finalized",
+                )
+            raise
+
+        async with staged_file["Body"] as body:
+            data = await body.read()
+
+        filename = await self._store_image(
+            bucket_name=bucket_name, data=data, content_type=staged_file["ContentType"]
+        )
+        await self.s3_client.delete_object(Bucket=bucket_name, Key=key)
+
+        return filename
+
+    async def _store_image(self, bucket_name: str, data: bytes, content_type: str) -> str:
+        # Checking image format and rendering the image in the image processing pool
+        try:
+            fallback, renditions = await image_processing_executor.render(data)
+        except InvalidImageError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+        # The key is derived from the content, so the same image is stored once whoever uploads it
+        # and an object under a key never changes. A stored image is touched, so the sweep does not
+        # delete it before the new reference to it commits
+        filename = f"{hashlib.sha256(fallback).hexdigest()}.{IMAGE_EXTENSIONS[content_type]}"
+
+        if await self.touch_file(bucket_name=bucket_name, filename=filename, content_type=content_type):
+            return filename
+
+        # The fallback is uploaded last, once it exists the renditions next to it exist as well
+        await asyncio.gather(
+            *[
+                self._put_image(bucket_name, rendition_key(filename, rendition), image, "image/webp")
+                for rendition, image in renditions.items()
+            ]
+        )
+        await self._put_image(bucket_name, filename, fallback, content_type)
+
+        return filename
+
+    async def _put_image(self, bucket_name: str, key: str, image: bytes, content_type: str) -> None:
+        await self.s3_client.upload_fileobj(
+            BytesIO(image),
+            bucket_name,
+            key,
+            ExtraArgs={"ContentType": content_type, "CacheControl": settings.IMAGE_CACHE_CONTROL},
+        )
 
     async def delete_file(self, bucket_name: str, filename: str) -> None:
-        await self.s3_client.delete_object(Bucket=bucket_name, Key=filename)
+        keys = [filename] + [rendition_key(filename, rendition) for rendition in settings.IMAGE_RENDITIONS]
+
+        await self.s3_client.delete_objects(
+            Bucket=bucket_name, Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
+        )
@@ -0,0 +1,132 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+from starlette import status
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Type {type(value)} is not JSON serializable")
+
+
+def encode_cursor(sort_by: str, order_by: str, sort_value: Any, row_id: int) -> str:
+    """
+    Builds an opaque cursor pointing right after the given row.
+
+        Params:
+            sort_by (str): The column the list is sorted by.
+            order_by (str): The sort direction ('asc' or 'desc').
+            sort_value (Any): The value of the sort column in the last returned row.
+            row_id (int): The id of the last returned row.
+
+        Returns:
+            str: URL-safe cursor string.
+    """
+    payload = {"sort_by": sort_by, "order_by": order_by, "value": sort_value, "id": row_id}
+    raw = json.dumps(payload, default=_json_default).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str, sort_by: str, order_by: str, sort_column) -> tuple[Any, int]:
+    """
+    Decodes a cursor issued by encode_cursor and checks it belongs to the same sorting.
+
+        Params:
+            cursor (str): The cursor received from the client.
+            sort_by (str): The column the list is sorted by in the current request.
+            order_by (str): The sort direction in the current request.
+            sort_column: The mapped column the list is sorted by.
+
+        Returns:
+            tuple: The sort column value and the id of the last row of the previous page.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        sort_value, row_id = payload["value"], int(payload["id"])
+        cursor_sort_by, cursor_order_by = payload["sort_by"], payload["order_by"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if cursor_sort_by != sort_by or cursor_order_by != order_by:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor was issued for a different sorting. Please start from the first page",
+        )
+
+    python_type = sort_column.type.python_type
+
+    if sort_value is not None and not isinstance(sort_value, python_type):
+        try:
+            if python_type is datetime:
+                sort_value = datetime.fromisoformat(sort_value)
+            else:
+                sort_value = python_type(sort_value)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    return sort_value, row_id
+
+
+def paginate_query(query: Select, model, request_payload) -> Select:
+    """
+    Applies sorting and either keyset (cursor) or page-number pagination to a list query.
+
+    In cursor mode the query seeks past the (sort column, id) pair stored in the cursor,
+    so the cost of a page does not grow with its position in the list. One extra row is
+    fetched to find out whether there is a next page.
+    """
+    sort_by = request_payload.sort_by.value
+    order_by = request_payload.order_by.value
+    sort_column = getattr(model, sort_by)
+    sort_key = tuple_(sort_column, model.id)
+
+    if request_payload.cursor:
+        sort_value, row_id = decode_cursor(
+            cursor=request_payload.cursor, sort_by=sort_by, order_by=order_by, sort_column=sort_column
+        )
+
+        if order_by == "desc":
+            query = query.where(sort_key < (sort_value, row_id))
+        else:
+            query = query.where(sort_key > (sort_value, row_id))
+    else:
+        query = query.offset((request_payload.page - 1) * request_payload.limit)
+
+    if order_by == "desc":
+        query = query.order_by(sort_column.desc(), model.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), model.id.asc())
+
+    return query.limit(request_payload.limit + 1)
+
+
+def split_page(rows: Sequence, request_payload) -> tuple[list, str | None]:
+    """
+    Cuts off the extra row fetched by paginate_query and builds the cursor of the next page.
+
+        Returns:
+            tuple: The rows of the current page and the next cursor (None on the last page).
+    """
+    rows = list(rows)
+
+    if len(rows) <= request_payload.limit:
+        return rows, None
+
+    rows = rows[: request_payload.limit]
+    last_row = rows[-1]
+    sort_by = request_payload.sort_by.value
+
+    next_cursor = encode_cursor(
+        sort_by=sort_by,
+        order_by=request_payload.order_by.value,
+        sort_value=getattr(last_row, sort_by),
+        row_id=last_row.id,
+    )
+
+    return rows, next_cursor
@@ -0,0 +1,46 @@
+from typing import Sequence, Type
+
+from pydantic import BaseModel as SchemaModel
+from sqlalchemy import Row, func, select, text
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
+
+from models import Author, Book
+from models.base import author_book_association
+
+
+def schema_columns(model, schema: Type[SchemaModel]) -> list:
+    """
+    Returns the mapped columns of a model that the given response schema needs.
+
+    Schema fields that are not table columns (e.g. relationships) are skipped.
+    """
+    table_columns = model.__table__.columns
+    return [getattr(model, field) for field in schema.model_fields if field in table_columns]
+
+
+def rows_to_schemas(rows: Sequence[Row], schema: Type[SchemaModel]) -> list:
+    """
+    Builds response schemas straight from Core rows, without hydrating ORM objects.
+    """
+    return [schema.model_validate(row._asdict()) for row in rows]
+
+
+def book_authors_column(author_schema: Type[SchemaModel]):
+    """
+    Correlated subquery aggregating the authors of each book into a JSON array,
+    so a projected book row carries its authors without a second query.
+    """
+    author_fields = []
+    for column in schema_columns(Author, author_schema):
+        author_fields.extend([column.key, column])
+
+    authors = func.json_agg(aggregate_order_by(func.json_build_object(*author_fields), Author.id))
+
+    return (
+        select(func.coalesce(authors, text("'[]'::json"), type_=JSON))
+        .select_from(author_book_association.join(Author, Author.id == author_book_association.c.author_id))
+        .where(author_book_association.c.book_id == Book.id)
+        .correlate(Book)
+        .scalar_subquery()
+        .label("authors")
+    )
@@ -0,0 +1,39 @@
+from sqlalchemy import and_, func, literal_column
+
+from models import Author
+
+# Minimal trigram similarity (0..1) for a name typed with a typo to be taken for an existing one.
+# Lower values start to confuse different people sharing a surname.
+SIMILAR_NAME_THRESHOLD = 0.5
+
+
+def author_full_name():
+    """
+    The "surname name" expression of an author, written exactly like the expression
+    the trigram index is built on, so the planner can serve the lookups from it.
+    It is parenthesized, since % binds tighter than || in PostgreSQL.
+    """
+    return (Author.surname + literal_column("' '") + Author.name).self_group()
+
+
+def is_similar(expression, value: str):
+    """
+    Matches names similar to the given one. The % operator narrows the rows down with
+    the index, the explicit threshold then drops the loosely similar ones.
+    """
+    return and_(expression.bool_op("%")(value), func.similarity(expression, value) >= SIMILAR_NAME_THRESHOLD)
+
+
+def similarity_distance(expression, value: str):
+    """Distance to order similar names by, nearest first, straight from the index."""
+    return expression.op("<->")(value)
+
+
+def contains_similar_word(expression, value: str):
+    """Matches names containing a word similar to the (possibly partially typed) value."""
+    return expression.bool_op("%>")(value)
+
+
+def word_similarity_distance(expression, value: str):
+    """Distance to order names by how well their best word matches the value."""
+    return expression.op("<->>")(value)
@@ -0,0 +1,156 @@
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+import redis.asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.logger import logger
+from configs.settings import settings
+from repositories.abstract_repositories import AbstractUserCacheRepository
+from schemas.user_schemas import UserReadSchema
+
+# Ids of the users whose cache has to be dropped once the session commits, set by UserCacheRepository.invalidate
+USER_CACHE_INVALIDATIONS_KEY = "user_cache_invalidations"
+
+# Caches the user unless the fence set by the invalidation is still there, in one step,
+# so a fence written between the check and the write cannot be missed
+SET_USER_UNLESS_FENCED_SCRIPT = """
+if redis.call("EXISTS", KEYS[2]) == 1 then
+    return 0
+end
+redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[2])
+return 1
+"""
+
+
+class LocalUserCache:
+    """
+    In-process LRU of the authenticated users. Entries expire after a few seconds,
+    so a change invalidated by another process reaches this one quickly as well.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._users: OrderedDict[int, tuple[float, UserReadSchema]] = OrderedDict()
+
+    def get(self, user_id: int) -> UserReadSchema | None:
+        entry = self._users.get(user_id)
+
+        if entry is None:
+            return None
+
+        expires_at, user = entry
+
+        if expires_at <= time.monotonic():
+            del self._users[user_id]
+            return None
+
+        self._users.move_to_end(user_id)
+        return user
+
+    def set(self, user: UserReadSchema) -> None:
+        self._users[user.id] = (time.monotonic() + self.ttl, user)
+        self._users.move_to_end(user.id)
+
+        while len(self._users) > self.max_size:
+            self._users.popitem(last=False)
+
+    def pop(self, user_id: int) -> None:
+        self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._users.clear()
+
+
+local_user_cache = LocalUserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS
+)
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def fence_key(user_id: int) -> str:
+    # Set for a while after the user is invalidated, a request that loaded the user
+    # before the change must not cache it again
+    return f"user:{user_id}:fence"
+
+
+class UserCacheRepository(AbstractUserCacheRepository):
+    """
+    Cache of the authenticated users by id, so get_current_user does not query the database
+    on every request. The process-local LRU is checked first, Redis shares the users between
+    the processes. Invalidations are applied only after the session has committed
+    (see apply_user_cache_invalidations) and fence the user for USER_CACHE_FENCE_SECONDS,
+    a user is not cached while its fence exists.
+    """
+
+    def __init__(self, redis: aioredis.Redis, db: AsyncSession):
+        super().__init__(redis=redis, db=db)
+        self.ttl = settings.USER_CACHE_TTL_SECONDS
+
+    async def get_user(self, user_id: int) -> UserReadSchema | None:
+        user = local_user_cache.get(user_id)
+
+        if user is not None:
+            return user
+
+        try:
+            payload = await self.redis.get(user_key(user_id))
+        except Exception as exc:
+            logger.error(f"Failed to read the user cache: {str(exc)}")
+            return None
+
+        if payload is None:
+            return None
+
+        user = UserReadSchema.model_validate_json(payload)
+        local_user_cache.set(user)
+        return user
+
+    async def set_user(self, user: UserReadSchema) -> None:
+        try:
+            is_set = await self.redis.eval(
+                SET_USER_UNLESS_FENCED_SCRIPT,
+                2,
+                user_key(user.id),
+                fence_key(user.id),
+                user.model_dump_json(),
+                self.ttl,
+            )
+        except Exception as exc:
+            logger.error(f"Failed to fill the user cache: {str(exc)}")
+            return
+
+        if is_set:
+            local_user_cache.set(user)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        self.db.info.setdefault(USER_CACHE_INVALIDATIONS_KEY, set()).update(user_ids)
+
+
+async def apply_user_cache_invalidations(redis: aioredis.Redis, user_ids: set[int]) -> None:
+    """
+    Drops the cached users in this process and in Redis and fences them. Other processes
+    drop their own copies once USER_CACHE_LOCAL_TTL_SECONDS have passed.
+    """
+    if not user_ids:
+        return
+
+    for user_id in user_ids:
+        local_user_cache.pop(user_id)
+
+    try:
+        pipeline = redis.pipeline(transaction=False)
+
+        for user_id in user_ids:
+            pipeline.set(fence_key(user_id), 1, ex=settings.USER_CACHE_FENCE_SECONDS)
+
+        pipeline.delete(*[user_key(user_id) for user_id in user_ids])
+        await pipeline.execute()
+    except Exception as exc:
+        # A blocked user keeps access until USER_CACHE_TTL_SECONDS have passed
+        logger.error(f"Failed to invalidate the user cache: {str(exc)}")
@@ -4,10 +4,12 @@ from sqlalchemy import select
 from exception_handlers.user_exc_handlers import UserDoesNotExist
 from models import User
 from repositories.abstract_repositories import AbstractUserRepository
+from repositories.entity_loader import get_entity_loader
+from repositories.pagination import paginate_query, split_page
+from repositories.projection import rows_to_schemas, schema_columns
 from schemas.user_schemas import (
     UserDeleteSchema,
     UserListQueryParams,
-    UserOrderBy,
     UserReadSchema,
     UsersListSchema,
 )
@@ -16,14 +18,11 @@ from schemas.user_schemas import (
 class UserRepository(AbstractUserRepository):
     async def create_user(self, new_user: User) -> User:
         self.db.add(new_user)
-        await self.db.commit()
-        await self.db.refresh(new_user)
+        await self.db.flush()
         return new_user
 
     async def get_user_by_id(self, user_id: int) -> User | None:
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalars().first()
-        return user if user else None
+        return await get_entity_loader(self.db).load(User, user_id)
 
     async def get_user_by_username(self, username: str) -> User | None:
         result = await self.db.execute(select(User).where(User.username == username))
@@ -36,47 +35,36 @@ class UserRepository(AbstractUserRepository):
         return user if user else None
 
     async def get_all_users(self, request_payload: UserListQueryParams) -> UsersListSchema:
-        query = select(User)
-        sort_column = getattr(User, request_payload.sort_by)
-
-        if request_payload.order_by == UserOrderBy.desc:
-            sort_column = sort_column.desc()
-
-        query = query.order_by(sort_column)
-
-        offset = (request_payload.page - 1) * request_payload.limit
-        query = query.offset(offset).limit(request_payload.limit)
+        query = select(*schema_columns(User, UserReadSchema))
+        query = paginate_query(query=query, model=User, request_payload=request_payload)
 
         result = await self.db.execute(query)
-        users = result.scalars().all()
+        users, next_cursor = split_page(rows=result.all(), request_payload=request_payload)
 
         if not users:
             raise UserDoesNotExist(message="No users found")
 
-        users = [UserReadSchema.model_validate(user) for user in users]
+        users = rows_to_schemas(rows=users, schema=UserReadSchema)
 
-        return UsersListSchema(users=users)
+        return UsersListSchema(users=users, next_cursor=next_cursor)
 
     async def update_user(self, user_to_update: User) -> User:
-        await self.db.commit()
-        await self.db.refresh(user_to_update)
+        await self.db.flush()
 
         return user_to_update
 
     async def update_user_by_admin(self, user_to_update: User) -> User:
-        await self.db.commit()
-        await self.db.refresh(user_to_update)
+        await self.db.flush()
 
         return user_to_update
 
     async def update_user_password(self, user_to_update: User):
-        await self.db.commit()
-        await self.db.refresh(user_to_update)
+        await self.db.flush()
 
         return {"message": "Your password was successfully changed"}
 
     async def delete_user(self, user_to_delete: User) -> UserDeleteSchema:
         await self.db.delete(user_to_delete)
-        await self.db.commit()
+        await self.db.flush()
 
         return UserDeleteSchema(message=f"User {user_to_delete.username} deleted successfully")
@@ -1,16 +1,27 @@
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, UploadFile, status
 
 from dependencies.auth_dependencies import get_current_active_user
-from dependencies.usecase_dependencies import get_author_usecase
+from dependencies.usecase_dependencies import (
+    get_author_read_usecase,
+    get_author_usecase,
+)
 from schemas.author_schemas import (
     AuthorCreateSchema,
     AuthorDeleteSchema,
     AuthorListQueryParams,
+    AuthorLoadProfile,
     AuthorReadSchema,
     AuthorsListSchema,
+    AuthorSuggestQueryParams,
     AuthorUpdateSchema,
 )
 from schemas.common_circular_schemas import AuthorWithBooksReadSchema
+from schemas.upload_schemas import (
+    ImageContentType,
+    ImageUploadAcceptedSchema,
+    ImageUploadFinalizeSchema,
+    ImageUploadFormSchema,
+)
 from schemas.user_schemas import UserReadSchema
 from usecases.author_usecases import AuthorUseCase
 
@@ -28,21 +39,34 @@ async def create_new_author(
     return await usecase.create_new_author(new_author=new_author, file=file, username=current_user.username)
 
 
+@router.get("/suggest", response_model=AuthorsListSchema)
+async def suggest_authors(
+    request_payload: AuthorSuggestQueryParams = Depends(),
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: AuthorUseCase = Depends(get_author_read_usecase),
+):
+    """
+    Allows the authenticated user with any role to get the authors whose surnames or names
+    are the most similar to the typed text, tolerating typos
+    """
+    return await usecase.suggest_authors(request_payload=request_payload)
+
+
 @router.get("/{author_id}", response_model=AuthorWithBooksReadSchema)
 async def get_author_by_id(
     author_id: int,
     current_user: UserReadSchema = Depends(get_current_active_user),
-    usecase: AuthorUseCase = Depends(get_author_usecase),
+    usecase: AuthorUseCase = Depends(get_author_read_usecase),
 ):
     """Allows the authenticated user with any role to get any author by id"""
-    return await usecase.get_author_by_id(author_id=author_id)
+    return await usecase.get_author_by_id(author_id=author_id, load_profile=AuthorLoadProfile.with_books)
 
 
 @router.get("/authors/all", response_model=AuthorsListSchema)
 async def get_all_authors(
     request_payload: AuthorListQueryParams = Depends(),
     current_user: UserReadSchema = Depends(get_current_active_user),
-    usecase: AuthorUseCase = Depends(get_author_usecase),
+    usecase: AuthorUseCase = Depends(get_author_read_usecase),
 ):
     """Allows the authenticated user with any role to get all the authors"""
     return await usecase.get_all_authors(request_payload=request_payload)
@@ -62,6 +86,37 @@ async def update_author(
     )
 
 
+@router.post("/photo/upload_form", response_model=ImageUploadFormSchema)
+async def create_photo_upload_form(
+    content_type: ImageContentType,
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: AuthorUseCase = Depends(get_author_usecase),
+):
+    """
+    Allows the authenticated user with any role to get a presigned form uploading
+    an author's photo directly to the storage, the photo is then set with /author/{author_id}/photo
+    """
+    return await usecase.create_photo_upload_form(content_type=content_type)
+
+
+@router.post(
+    "/{author_id}/photo", response_model=ImageUploadAcceptedSchema, status_code=status.HTTP_202_ACCEPTED
+)
+async def finalize_author_photo(
+    author_id: int,
+    upload: ImageUploadFinalizeSchema,
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: AuthorUseCase = Depends(get_author_usecase),
+):
+    """
+    Allows the authenticated user with any role to set the photo uploaded directly to the storage,
+    the author gets the processed photo once the image worker is done with it
+    """
+    return await usecase.finalize_author_photo(
+        author_id=author_id, upload=upload, username=current_user.username
+    )
+
+
 @router.delete("/{author_id}", response_model=AuthorDeleteSchema)
 async def delete_author(
     author_id: int,
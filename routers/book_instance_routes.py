@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, File, Path, UploadFile
+from fastapi import APIRouter, Depends, File, Path, UploadFile, status
 
 from dependencies.auth_dependencies import get_current_active_user
-from dependencies.usecase_dependencies import get_book_instance_usecase
+from dependencies.usecase_dependencies import (
+    get_book_instance_read_usecase,
+    get_book_instance_usecase,
+)
 from schemas.book_schemas import (
     BookInstanceCreateSchema,
     BookInstanceDeleteSchema,
+    BookInstanceLoadProfile,
     BookInstanceUpdateSchema,
 )
 from schemas.common_circular_schemas import (
     BookInstanceWithBookReadSchema,
     BookWithInstancesReadSchema,
 )
+from schemas.upload_schemas import (
+    ImageContentType,
+    ImageUploadAcceptedSchema,
+    ImageUploadFinalizeSchema,
+    ImageUploadFormSchema,
+)
 from schemas.user_schemas import UserReadSchema
 from usecases.book_instance_usecases import BookInstanceUseCase
 
@@ -35,17 +45,19 @@ async def create_new_book_instance(
 async def get_book_instance_by_id(
     book_instance_id: int,
     current_user: UserReadSchema = Depends(get_current_active_user),
-    usecase: BookInstanceUseCase = Depends(get_book_instance_usecase),
+    usecase: BookInstanceUseCase = Depends(get_book_instance_read_usecase),
 ):
     """Allows the authenticated user with any role to get any book instance by id"""
-    return await usecase.get_book_instance_by_id(book_instance_id=book_instance_id)
+    return await usecase.get_book_instance_by_id(
+        book_instance_id=book_instance_id, load_profile=BookInstanceLoadProfile.with_book
+    )
 
 
 @router.get("/all_by_book_id/{book_id}", response_model=BookWithInstancesReadSchema)
 async def get_all_instances_by_book_id(
     book_id: int,
     current_user: UserReadSchema = Depends(get_current_active_user),
-    usecase: BookInstanceUseCase = Depends(get_book_instance_usecase),
+    usecase: BookInstanceUseCase = Depends(get_book_instance_read_usecase),
 ):
     """Allows the authenticated user with any role to get a book by title with all its instances"""
     return await usecase.get_all_instances_by_book_id(book_id=book_id)
@@ -68,6 +80,39 @@ async def update_book_instance(
     )
 
 
+@router.post("/cover/upload_form", response_model=ImageUploadFormSchema)
+async def create_cover_upload_form(
+    content_type: ImageContentType,
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: BookInstanceUseCase = Depends(get_book_instance_usecase),
+):
+    """
+    Allows the authenticated user with any role to get a presigned form uploading
+    a book instance's cover directly to the storage, the cover is then set with /book_items/{book_instance_id}/cover
+    """
+    return await usecase.create_cover_upload_form(content_type=content_type)
+
+
+@router.post(
+    "/{book_instance_id}/cover",
+    response_model=ImageUploadAcceptedSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def finalize_book_instance_cover(
+    book_instance_id: int,
+    upload: ImageUploadFinalizeSchema,
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: BookInstanceUseCase = Depends(get_book_instance_usecase),
+):
+    """
+    Allows the authenticated user with any role to set the cover uploaded directly to the storage,
+    the book item gets the processed cover once the image worker is done with it
+    """
+    return await usecase.finalize_book_instance_cover(
+        book_instance_id=book_instance_id, upload=upload, username=current_user.username
+    )
+
+
 @router.delete("/{book_instance_id}", response_model=BookInstanceDeleteSchema)
 async def delete_book_instance(
     book_instance_id: int,
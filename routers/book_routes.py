@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, File, UploadFile
 
 from dependencies.auth_dependencies import get_current_active_user
-from dependencies.usecase_dependencies import get_book_usecase
+from dependencies.usecase_dependencies import (
+    get_book_import_usecase,
+    get_book_read_usecase,
+    get_book_usecase,
+)
 from schemas.book_schemas import (
     BookCreateSchema,
     BookDeleteSchema,
+    BookImportFormat,
+    BookImportReportSchema,
     BookListQueryParams,
+    BookLoadProfile,
     BookReadSchema,
+    BookSearchQueryParams,
     BookUpdateSchema,
     BookWithAuthorsGenresCreateSchema,
     MapBookToExistingAuthors,
@@ -18,6 +26,7 @@ from schemas.common_circular_schemas import (
     BookWithAuthorsReadSchema,
 )
 from schemas.user_schemas import UserReadSchema
+from usecases.book_import_usecases import BookImportUseCase, iter_upload_lines
 from usecases.book_usecases import BookUseCase
 
 router = APIRouter(prefix="/book", tags=["book"])
@@ -68,31 +77,62 @@ async def create_new_book_with_author_and_genre(
     current_user: UserReadSchema = Depends(get_current_active_user),
     usecase: BookUseCase = Depends(get_book_usecase),
     file: UploadFile | None = File(None),
+    match_fuzzily: bool = False,
 ):
     """
     Allows the authenticated user with any role to create a new book, to map it to existing authors and genres or
-    to create new author and genre for this book if no existing
+    to create new author and genre for this book if no existing. With match_fuzzily the author and the genre
+    are also matched to existing ones spelled slightly differently, e.g. with a typo
     """
     return await usecase.create_new_book_with_author_and_genre(
-        new_book=new_book, file=file, username=current_user.username
+        new_book=new_book, file=file, username=current_user.username, match_fuzzily=match_fuzzily
     )
 
 
+@router.post("/import", response_model=BookImportReportSchema)
+async def import_books(
+    file: UploadFile = File(),
+    file_format: BookImportFormat = BookImportFormat.csv,
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: BookImportUseCase = Depends(get_book_import_usecase),
+):
+    """
+    Allows the authenticated user with any role to import books with their authors and genres
+    from a CSV or JSON Lines file. Rows that cannot be imported are listed in the report
+    """
+    return await usecase.import_books(
+        lines=iter_upload_lines(file), file_format=file_format, username=current_user.username
+    )
+
+
+@router.get("/search", response_model=BookListSchema)
+async def search_books(
+    request_payload: BookSearchQueryParams = Depends(),
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: BookUseCase = Depends(get_book_read_usecase),
+):
+    """
+    Allows the authenticated user with any role to search books by words of the russian
+    and original titles and the author names. The best matches come first
+    """
+    return await usecase.search_books(request_payload=request_payload)
+
+
 @router.get("/{book_id}", response_model=BookWithAuthorsGenresReadSchema)
 async def get_book_by_id(
     book_id: int,
     current_user: UserReadSchema = Depends(get_current_active_user),
-    usecase: BookUseCase = Depends(get_book_usecase),
+    usecase: BookUseCase = Depends(get_book_read_usecase),
 ):
     """Allows the authenticated user with any role to get any book by id"""
-    return await usecase.get_book_by_id(book_id=book_id)
+    return await usecase.get_book_by_id(book_id=book_id, load_profile=BookLoadProfile.with_authors_genres)
 
 
 @router.get("/", response_model=BookListSchema)
 async def get_books_by_title(
     book_title: str,
     current_user: UserReadSchema = Depends(get_current_active_user),
-    usecase: BookUseCase = Depends(get_book_usecase),
+    usecase: BookUseCase = Depends(get_book_read_usecase),
 ):
     """Allows the authenticated user with any role to get books by title"""
     return await usecase.get_books_by_title(book_title=book_title)
@@ -102,7 +142,7 @@ async def get_books_by_title(
 async def get_all_books(
     request_payload: BookListQueryParams = Depends(),
     current_user: UserReadSchema = Depends(get_current_active_user),
-    usecase: BookUseCase = Depends(get_book_usecase),
+    usecase: BookUseCase = Depends(get_book_read_usecase),
 ):
     """Allows the authenticated user with any role to get all the books"""
     return await usecase.get_all_books(request_payload=request_payload)
@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends
 
 from dependencies.auth_dependencies import get_current_active_user
-from dependencies.usecase_dependencies import get_genre_usecase
+from dependencies.usecase_dependencies import get_genre_read_usecase, get_genre_usecase
 from schemas.common_circular_schemas import GenreWithBooksReadSchema
 from schemas.genre_schemas import (
     GenreCreateSchema,
     GenreDeleteSchema,
     GenreListQueryParams,
+    GenreLoadProfile,
     GenreReadSchema,
     GenresListSchema,
+    GenreSuggestQueryParams,
     GenreUpdateSchema,
 )
 from schemas.user_schemas import UserReadSchema
@@ -27,21 +29,34 @@ async def create_new_genre(
     return await usecase.create_new_genre(new_genre=new_genre)
 
 
+@router.get("/suggest", response_model=GenresListSchema)
+async def suggest_genres(
+    request_payload: GenreSuggestQueryParams = Depends(),
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: GenreUseCase = Depends(get_genre_read_usecase),
+):
+    """
+    Allows the authenticated user with any role to get the genres whose names are the most
+    similar to the typed text, tolerating typos
+    """
+    return await usecase.suggest_genres(request_payload=request_payload)
+
+
 @router.get("/{genre_id}", response_model=GenreWithBooksReadSchema)
 async def get_genre_by_id(
     genre_id: int,
     current_user: UserReadSchema = Depends(get_current_active_user),
-    usecase: GenreUseCase = Depends(get_genre_usecase),
+    usecase: GenreUseCase = Depends(get_genre_read_usecase),
 ):
     """Allows the authenticated user with any role to get any genre by id"""
-    return await usecase.get_genre_by_id(genre_id=genre_id)
+    return await usecase.get_genre_by_id(genre_id=genre_id, load_profile=GenreLoadProfile.with_books)
 
 
 @router.get("/genres/all", response_model=GenresListSchema)
 async def get_all_genres(
     request_payload: GenreListQueryParams = Depends(),
     current_user: UserReadSchema = Depends(get_current_active_user),
-    usecase: GenreUseCase = Depends(get_genre_usecase),
+    usecase: GenreUseCase = Depends(get_genre_read_usecase),
 ):
     """Allows the authenticated user with any role to get all the genres"""
     return await usecase.get_all_genres(request_payload=request_payload)
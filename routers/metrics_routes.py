@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends
+
+from dependencies.auth_dependencies import get_current_active_user
+from dependencies.usecase_dependencies import get_metrics_usecase
+from schemas.metrics_schemas import (
+    DatabasePoolStatsSchema,
+    DetailCacheStatsSchema,
+    RabbitMQPublisherStatsSchema,
+)
+from schemas.user_schemas import UserReadSchema
+from usecases.metrics_usecases import MetricsUseCase
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/db-pool", response_model=list[DatabasePoolStatsSchema])
+async def get_db_pool_stats(
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: MetricsUseCase = Depends(get_metrics_usecase),
+):
+    """Allows the authenticated user with 'ADMIN'-role to get the occupancy, checkout and connect counters
+    of the database connection pools, one per engine (primary and, if configured, replica)"""
+    return await usecase.get_db_pool_stats(current_user=current_user)
+
+
+@router.get("/detail-cache", response_model=DetailCacheStatsSchema)
+async def get_detail_cache_stats(
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: MetricsUseCase = Depends(get_metrics_usecase),
+):
+    """Allows the authenticated user with 'ADMIN'-role to get the hit and miss counters
+    of the book, author and genre detail cache"""
+    return await usecase.get_detail_cache_stats(current_user=current_user)
+
+
+@router.get("/rabbitmq", response_model=RabbitMQPublisherStatsSchema)
+async def get_rabbitmq_publisher_stats(
+    current_user: UserReadSchema = Depends(get_current_active_user),
+    usecase: MetricsUseCase = Depends(get_metrics_usecase),
+):
+    """Allows the authenticated user with 'ADMIN'-role to get the in-flight, published
+    and failed message counters of the RabbitMQ publisher"""
+    return await usecase.get_rabbitmq_publisher_stats(current_user=current_user)
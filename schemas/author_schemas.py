@@ -3,7 +3,9 @@ from enum import Enum
 from typing import List
 
 from fastapi import Form, Query
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, computed_field, field_validator
+
+from configs.image_processing import rendition_urls
 
 
 class AuthorBaseSchema(BaseModel):
@@ -51,9 +53,16 @@ class AuthorCreateSchema(BaseModel):
 class AuthorReadSchema(AuthorCreateSchema, AuthorBaseSchema):
     id: int
 
+    @computed_field
+    @property
+    def photo_renditions(self) -> dict[str, str] | None:
+        # WebP renditions of the photo by name, e.g. "list", "detail" and "retina"
+        return rendition_urls(self.photo_s3_url)
+
 
 class AuthorsListSchema(BaseModel):
     authors: List[AuthorReadSchema]
+    next_cursor: str | None = None
 
 
 class AuthorUpdateSchema(BaseModel):
@@ -103,8 +112,19 @@ class AuthorOrderBy(str, Enum):
     desc = "desc"
 
 
+class AuthorLoadProfile(str, Enum):
+    card = "card"
+    with_books = "with_books"
+
+
 class AuthorListQueryParams(BaseModel):
     page: int = Query(1, gt=0)
     limit: int = 30
+    cursor: str | None = None
     sort_by: AuthorSortBy = AuthorSortBy.surname
     order_by: AuthorOrderBy = AuthorOrderBy.asc
+
+
+class AuthorSuggestQueryParams(BaseModel):
+    q: str = Query(min_length=1, max_length=100)
+    limit: int = Query(10, gt=0, le=20)
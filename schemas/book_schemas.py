@@ -3,8 +3,9 @@ from enum import Enum
 from typing import List
 
 from fastapi import Form, Query
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, computed_field, field_validator
 
+from configs.image_processing import rendition_urls
 from models.book import BookStatusEnum
 
 
@@ -75,12 +76,12 @@ class BookWithAuthorsGenresCreateSchema(BookCreateSchema):
 
 class MapBookToExistingAuthors(BaseModel):
     book_id: int
-    author_ids: List[int]
+    author_ids: List[int] = Field(min_length=1)
 
 
 class MapBookToExistingGenres(BaseModel):
     book_id: int
-    genre_ids: List[int]
+    genre_ids: List[int] = Field(min_length=1)
 
 
 class BookInstanceCreateSchema(BaseModel):
@@ -125,6 +126,12 @@ class BookReadSchema(BookCreateSchema, BookBaseSchema):
 class BookInstanceReadSchema(BookInstanceCreateSchema, BookBaseSchema):
     id: int
 
+    @computed_field
+    @property
+    def cover_renditions(self) -> dict[str, str] | None:
+        # WebP renditions of the cover by name, e.g. "list", "detail" and "retina"
+        return rendition_urls(self.cover_s3_url)
+
 
 class BookUpdateSchema(BaseModel):
     title_rus: str | None = None
@@ -182,8 +189,45 @@ class BookOrderBy(str, Enum):
     desc = "desc"
 
 
+class BookLoadProfile(str, Enum):
+    card = "card"
+    with_authors = "with_authors"
+    with_authors_genres = "with_authors_genres"
+    with_instances = "with_instances"
+
+
+class BookInstanceLoadProfile(str, Enum):
+    card = "card"
+    with_book = "with_book"
+
+
 class BookListQueryParams(BaseModel):
     page: int = Query(1, gt=0)
     limit: int = 30
+    cursor: str | None = None
     sort_by: BookSortBy = BookSortBy.title_rus
     order_by: BookOrderBy = BookOrderBy.asc
+
+
+class BookSearchQueryParams(BaseModel):
+    q: str = Query(min_length=1, max_length=200)
+    limit: int = Query(30, gt=0, le=100)
+    cursor: str | None = None
+
+
+class BookImportFormat(str, Enum):
+    csv = "csv"
+    jsonl = "jsonl"
+
+
+class BookImportRowErrorSchema(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class BookImportReportSchema(BaseModel):
+    total_rows: int = 0
+    imported_books: int = 0
+    created_authors: int = 0
+    created_genres: int = 0
+    errors: List[BookImportRowErrorSchema] = []
@@ -21,6 +21,7 @@ class BookWithAuthorsReadSchema(BookCreateSchema, BookBaseSchema):
 
 class BookListSchema(BaseModel):
     books: List[BookWithAuthorsReadSchema]
+    next_cursor: str | None = None
 
 
 class BookWithAuthorsGenresReadSchema(BookWithAuthorsReadSchema):
@@ -17,6 +17,7 @@ class GenreReadSchema(GenreCreateSchema):
 
 class GenresListSchema(BaseModel):
     genres: List[GenreReadSchema]
+    next_cursor: str | None = None
 
 
 class GenreUpdateSchema(BaseModel):
@@ -37,8 +38,19 @@ class GenreOrderBy(str, Enum):
     desc = "desc"
 
 
+class GenreLoadProfile(str, Enum):
+    card = "card"
+    with_books = "with_books"
+
+
 class GenreListQueryParams(BaseModel):
     page: int = Query(1, gt=0)
     limit: int = 30
+    cursor: str | None = None
     sort_by: GenreSortBy = GenreSortBy.name
     order_by: GenreOrderBy = GenreOrderBy.asc
+
+
+class GenreSuggestQueryParams(BaseModel):
+    q: str = Query(min_length=1, max_length=100)
+    limit: int = Query(10, gt=0, le=20)
@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+
+
+class DatabasePoolStatsSchema(BaseModel):
+    # primary or replica
+    engine: str
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    checkout_timeouts: int
+    # Waiting for a free connection only, opening a new one is counted as connect time
+    wait_time_total_ms: float
+    wait_time_max_ms: float
+    connects: int
+    connect_time_total_ms: float
+    connect_time_max_ms: float
+
+
+class DetailCacheStatsSchema(BaseModel):
+    hits: int
+    misses: int
+    errors: int
+    invalidated_keys: int
+    hit_ratio: float
+
+
+class RabbitMQPublisherStatsSchema(BaseModel):
+    connected: bool
+    channel_pool_size: int
+    in_flight: int
+    published: int
+    failed: int
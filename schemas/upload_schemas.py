@@ -0,0 +1,43 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class ImageContentType(str, Enum):
+    jpeg = "image/jpeg"
+    png = "image/png"
+
+
+class ImageEntity(str, Enum):
+    author = "author"
+    book_instance = "book_instance"
+
+
+class ImageUploadFormSchema(BaseModel):
+    # The file is sent to url as multipart/form-data with the fields, Content-Type among them,
+    # and the file as the last field
+    url: str
+    fields: dict[str, str]
+    key: str
+    expires_in: int
+    max_size: int
+
+
+class ImageUploadFinalizeSchema(BaseModel):
+    key: str
+
+
+class ImageUploadAcceptedSchema(BaseModel):
+    # The image is processed in the background, the new URL appears on the author or book item once done
+    key: str
+    message: str
+
+
+class ImageProcessingJobSchema(BaseModel):
+    # Published by the finalize endpoints, processed by the image worker (cli.image_worker)
+    entity: ImageEntity
+    entity_id: int
+    bucket_name: str
+    key: str
+    etag: str
+    username: str
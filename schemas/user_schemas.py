@@ -37,6 +37,7 @@ class UserReadSchema(UserBaseSchema):
 
 class UsersListSchema(BaseModel):
     users: List[UserReadSchema]
+    next_cursor: str | None = None
 
 
 class UserUpdateSchema(BaseModel):
@@ -75,5 +76,6 @@ class UserOrderBy(str, Enum):
 class UserListQueryParams(BaseModel):
     page: int = Query(1, gt=0)
     limit: int = 30
+    cursor: str | None = None
     sort_by: UserSortBy = UserSortBy.username
     order_by: UserOrderBy = UserOrderBy.asc
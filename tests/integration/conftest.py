@@ -5,7 +5,7 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import NullPool
+from sqlalchemy import NullPool, event, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -13,10 +13,17 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from configs.minio_s3 import minio_config
+from brokers.rabbitmq import RabbitMQPublisher
 from configs.settings import settings
-from dependencies.db_dependency import db_session
-from dependencies.minio_s3_dependency import get_minio_s3_client, minio_aioboto3_session
+from dependencies.db_dependency import (
+    db_session,
+    invalidate_caches,
+    queue_images_for_sweep,
+    unit_of_work,
+)
+from dependencies.db_read_dependency import db_read_session
+from dependencies.minio_s3_dependency import create_minio_s3_client, get_minio_s3_client
+from dependencies.rabbitmq_dependency import get_rabbitmq_publisher
 from dependencies.redis_dependency import get_redis_connection
 from main import app
 from models import BaseModel
@@ -59,23 +66,40 @@ async def override_db_session(test_async_engine, prepare_database) -> AsyncGener
         yield session
 
 
+@pytest_asyncio.fixture(scope="session")
+async def pg_trgm_installed(test_async_engine, prepare_database) -> bool:
+    async with test_async_engine.connect() as connection:
+        result = await connection.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+        return result.scalar() is not None
+
+
+@pytest.fixture
+def executed_queries(test_async_engine):
+    queries = []
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append(dict(statement=statement, parameters=parameters, rowcount=cursor.rowcount))
+
+    event.listen(test_async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    yield queries
+    event.remove(test_async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
 @pytest_asyncio.fixture(scope="session")
 async def mock_redis():
     redis_mock = AsyncMock()
     redis_mock.set.return_value = True
     redis_mock.exists.return_value = 0
+    # Every detail lookup is a cache miss, so the endpoints are served from the database
+    redis_mock.get.return_value = None
+    redis_mock.delete.return_value = 0
+    redis_mock.pipeline = MagicMock(return_value=MagicMock(execute=AsyncMock(return_value=[])))
     yield redis_mock
 
 
 @pytest_asyncio.fixture(scope="session")
 async def override_minio_s3_client():
-    async with minio_aioboto3_session.client(
-        service_name="s3",
-        endpoint_url=settings.MINIO_URL,
-        aws_access_key_id=settings.MINIO_ROOT_USER,
-        aws_secret_access_key=settings.MINIO_ROOT_PASSWORD,
-        config=minio_config,
-    ) as minio_s3_client:
+    async with create_minio_s3_client() as minio_s3_client:
         yield minio_s3_client
 
 
@@ -96,17 +120,33 @@ async def async_client(
     override_db_session, mock_redis, override_minio_s3_client
 ) -> AsyncGenerator[AsyncClient, None]:
     async def _override_db_session():
-        yield override_db_session
+        async with unit_of_work(override_db_session):
+            yield override_db_session
+
+        await invalidate_caches(session=override_db_session, redis=mock_redis)
+        await queue_images_for_sweep(session=override_db_session, redis=mock_redis)
+
+    async def _override_db_read_session():
+        async with unit_of_work(override_db_session):
+            yield override_db_session
 
     async def _override_redis():
         yield mock_redis
 
     async def _override_minio_s3_client():
-        yield override_minio_s3_client
+        return override_minio_s3_client
+
+    # Never connected, the tests that publish patch send_message_to_rabbitmq
+    rabbitmq_publisher = RabbitMQPublisher()
+
+    async def _override_rabbitmq_publisher():
+        return rabbitmq_publisher
 
     app.dependency_overrides[db_session] = _override_db_session
+    app.dependency_overrides[db_read_session] = _override_db_read_session
     app.dependency_overrides[get_redis_connection] = _override_redis
     app.dependency_overrides[get_minio_s3_client] = _override_minio_s3_client
+    app.dependency_overrides[get_rabbitmq_publisher] = _override_rabbitmq_publisher
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://localhost:8004") as ac:
         yield ac
@@ -2,6 +2,10 @@ import pytest
 from httpx import AsyncClient
 from starlette import status
 
+from configs.settings import settings
+from models import Author
+from repositories.author_repository import AuthorRepository
+
 
 @pytest.mark.integration
 @pytest.mark.asyncio
@@ -75,6 +79,45 @@ async def test_update_author(async_client: AsyncClient, test_user, mock_file):
     assert response.json()["nationality"] == updated_data["nationality"]
 
 
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_finalize_author_photo_invalid_key(async_client: AsyncClient, test_user):
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+    author_id = 1
+
+    response = await async_client.post(
+        f"/author/{author_id}/photo", json={"key": "../authors/photo.jpg"}, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Invalid upload key"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_suggest_authors(async_client: AsyncClient, test_user, pg_trgm_installed):
+    if not pg_trgm_installed:
+        pytest.skip("pg_trgm extension is not available")
+
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = await async_client.get(
+        "/author/suggest", params={"q": "толстый", "limit": 5}, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["authors"][0]["surname"] == "Толстой"
+    assert len(response.json()["authors"]) <= 5
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_delete_author(async_client: AsyncClient, test_user):
@@ -93,3 +136,24 @@ async def test_delete_author(async_client: AsyncClient, test_user):
         response.json()["message"]
         == f"Author '{author_to_delete["name"]} {author_to_delete["surname"]}' deleted successfully"
     )
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_count_photo_references_by_key(override_db_session):
+    filename = "5d41402abc4b2a76b9719d911017c592.jpg"
+    # The same stored photo referred to through URLs built with different locations
+    photo_s3_urls = [
+        f"http://old-minio:9000/authors/{filename}",
+        f"{settings.MINIO_URL_TO_OPEN_FILE}/authors/{filename}",
+        f"http://old-minio:9000/authors/x{filename}",
+    ]
+    override_db_session.add_all(
+        [Author(name="Иван", surname="Петров", nationality="RU", photo_s3_url=url) for url in photo_s3_urls]
+    )
+    await override_db_session.flush()
+
+    try:
+        assert await AuthorRepository(override_db_session).count_photo_references(filename=filename) == 2
+    finally:
+        await override_db_session.rollback()
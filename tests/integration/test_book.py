@@ -1,7 +1,10 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
 from starlette import status
 
+from models import Genre
+
 
 @pytest.mark.integration
 @pytest.mark.asyncio
@@ -43,6 +46,29 @@ async def test_map_book_to_existing_authors(
     assert response.json()["updated_by"] == test_user["username"]
 
 
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_map_book_to_missing_authors(async_client: AsyncClient, test_user, test_book):
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    book = await async_client.get(f"/book/{test_book['id']}", headers=headers)
+    existing_author_id = book.json()["authors"][0]["id"]
+
+    mapping_request = {"book_id": test_book["id"], "author_ids": [existing_author_id, 9998, 9999]}
+
+    response = await async_client.post("/book/map_to_authors", json=mapping_request, headers=headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Authors with ids [9998, 9999] do not exist"
+
+    book_after = await async_client.get(f"/book/{test_book['id']}", headers=headers)
+    assert book_after.json()["authors"] == book.json()["authors"]
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_map_book_to_existing_genres(async_client: AsyncClient, test_user, test_book):
@@ -83,6 +109,27 @@ async def test_create_new_book_with_author_and_genre(
     assert response.json()["created_by"] == test_user["username"]
 
 
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_create_existing_book_rolls_back_new_genre(
+    async_client: AsyncClient, override_db_session, test_user, test_book_with_author_and_genre, mock_file
+):
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+    existing_book = {**test_book_with_author_and_genre, "genre_name": "Эпопея"}
+
+    response = await async_client.post("/book/new", data=existing_book, files=mock_file, headers=headers)
+
+    # The genre is flushed before the duplicate book is detected, the request rolls it back
+    genre = await override_db_session.scalar(select(Genre).where(Genre.name == "Эпопея"))
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert genre is None
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_get_book_by_id(async_client: AsyncClient, test_user):
@@ -131,6 +178,49 @@ async def test_get_all_books(async_client: AsyncClient, test_user, test_book_lis
     assert len(response.json()["books"]) == 2
 
 
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_search_books(
+    async_client: AsyncClient, test_user, test_book, test_book_with_author_and_genre
+):
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    # Another form of a title word, an author surname and an original title word
+    for search_text, book_id in [
+        ("войны", test_book_with_author_and_genre["id"]),
+        ("толстой", test_book_with_author_and_genre["id"]),
+        (test_book["title_origin"], test_book["id"]),
+    ]:
+        response = await async_client.get("/book/search", params={"q": search_text}, headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [book["id"] for book in response.json()["books"]] == [book_id]
+
+    first_page = await async_client.get(
+        "/book/search", params={"q": "книга or мир", "limit": 1}, headers=headers
+    )
+    second_page = await async_client.get(
+        "/book/search",
+        params={"q": "книга or мир", "limit": 1, "cursor": first_page.json()["next_cursor"]},
+        headers=headers,
+    )
+
+    assert second_page.status_code == status.HTTP_200_OK
+    assert second_page.json()["next_cursor"] is None
+    assert {first_page.json()["books"][0]["id"], second_page.json()["books"][0]["id"]} == {
+        test_book["id"],
+        test_book_with_author_and_genre["id"],
+    }
+
+    response = await async_client.get("/book/search", params={"q": "достоевский"}, headers=headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_update_book(async_client: AsyncClient, test_user):
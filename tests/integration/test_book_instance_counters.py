@@ -0,0 +1,93 @@
+import asyncio
+import random
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from configs.settings import settings
+from dependencies.db_dependency import unit_of_work
+from models import Book, BookInstance
+from models.book import BookStatusEnum
+from repositories.book_instance_repository import BookInstanceRepository
+
+INSTANCES = 20
+STATUS_CHANGES = 200
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_parallel_status_changes_keep_book_counters_consistent():
+    engine = create_async_engine(settings.test_db_url, pool_size=20, max_overflow=0)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async with session_factory() as session:
+        book = Book(title_rus="Книга для инвентаризации")
+        session.add(book)
+        await session.commit()
+
+    async def create_instance():
+        async with session_factory() as session, unit_of_work(session):
+            new_instance = BookInstance(book_id=book.id, value=30, price_per_day=1)
+            created = await BookInstanceRepository(session).create_new_book_instance(
+                new_book_instance=new_instance
+            )
+            return created.id
+
+    async def change_status(book_instance_id: int, new_status: BookStatusEnum):
+        async with session_factory() as session, unit_of_work(session):
+            repository = BookInstanceRepository(session)
+            book_instance = await repository.get_book_instance_by_id(book_instance_id=book_instance_id)
+            await repository.update_book_instance(book_item_to_update=book_instance, new_status=new_status)
+
+    async def delete_instance(book_instance_id: int):
+        async with session_factory() as session, unit_of_work(session):
+            repository = BookInstanceRepository(session)
+            book_instance = await repository.get_book_instance_by_id(book_instance_id=book_instance_id)
+            await repository.delete_book_instance(book_item_to_delete=book_instance)
+
+    async def fetch_state():
+        async with session_factory() as session:
+            counters = (
+                await session.execute(
+                    select(Book.quantity, Book.available_for_loan).where(Book.id == book.id)
+                )
+            ).one()
+            statuses = (
+                (await session.execute(select(BookInstance.status).where(BookInstance.book_id == book.id)))
+                .scalars()
+                .all()
+            )
+            return counters, statuses
+
+    try:
+        instance_ids = await asyncio.gather(*[create_instance() for _ in range(INSTANCES)])
+
+        (quantity, available_for_loan), _ = await fetch_state()
+        assert (quantity, available_for_loan) == (INSTANCES, INSTANCES)
+
+        randomizer = random.Random(42)
+        await asyncio.gather(
+            *[
+                change_status(randomizer.choice(instance_ids), randomizer.choice(list(BookStatusEnum)))
+                for _ in range(STATUS_CHANGES)
+            ]
+        )
+
+        (quantity, available_for_loan), statuses = await fetch_state()
+        assert quantity == sum(status != BookStatusEnum.LOST for status in statuses)
+        assert available_for_loan == sum(status == BookStatusEnum.AVAILABLE for status in statuses)
+
+        await asyncio.gather(*[delete_instance(book_instance_id) for book_instance_id in instance_ids])
+
+        (quantity, available_for_loan), statuses = await fetch_state()
+        assert statuses == []
+        assert (quantity, available_for_loan) == (0, 0)
+
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(BookInstance).where(BookInstance.book_id == book.id))
+            await session.execute(delete(Book).where(Book.id == book.id))
+            await session.commit()
+
+        await engine.dispose()
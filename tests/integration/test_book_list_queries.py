@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Author, Book, BookInstance, Order, Reader
+from repositories.book_repository import BookRepository
+from schemas.book_schemas import BookListQueryParams, BookOrderBy, BookSortBy
+
+
+async def seed_books_with_instances(session, instances_per_book: list[int]) -> None:
+    reader = Reader(
+        name="Иван",
+        fathers_name="Иванович",
+        surname="Читатель",
+        date_of_birth=date(1990, 1, 1),
+        email="reader@example.com",
+        address="Минск",
+    )
+    session.add(reader)
+
+    for index, instances_count in enumerate(instances_per_book):
+        book = Book(title_rus=f"Книга {index}", quantity=instances_count, available_for_loan=0)
+        book.authors.append(Author(name="Автор", surname=f"Автор {index}", nationality="Беларусь"))
+
+        for _ in range(instances_count):
+            instance = BookInstance(book=book, value=30, price_per_day=1)
+            order = Order(
+                reader=reader,
+                planned_return_date=date(2030, 1, 1),
+                fact_return_date=date(2030, 1, 1),
+                total_cost=0,
+            )
+            order.book_instances.append(instance)
+            session.add(order)
+
+        session.add(book)
+
+    await session.flush()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+@pytest.mark.parametrize("instances_per_book", [[0, 0, 0], [20, 35, 50]])
+async def test_get_all_books_query_count_is_fixed(test_async_engine, executed_queries, instances_per_book):
+    request_payload = BookListQueryParams(limit=3, sort_by=BookSortBy.id, order_by=BookOrderBy.desc)
+
+    # Everything runs inside one transaction that is rolled back, so other tests never see these books
+    async with test_async_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+
+        await seed_books_with_instances(session, instances_per_book)
+        executed_queries.clear()
+
+        result = await BookRepository(session).get_all_books(request_payload=request_payload)
+
+        await session.close()
+        await transaction.rollback()
+
+    assert len(result.books) == 3
+    assert all(len(book.authors) == 1 for book in result.books)
+    assert [book.authors[0].surname for book in result.books] == ["Автор 2", "Автор 1", "Автор 0"]
+
+    # Authors are aggregated into the book rows, so the whole page is a single query
+    assert len(executed_queries) == 1
+    # At most limit + 1 book rows, however many instances and orders exist
+    assert executed_queries[0]["rowcount"] <= request_payload.limit + 1
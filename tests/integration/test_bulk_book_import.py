@@ -0,0 +1,119 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Author, Book, Genre
+from models.base import author_book_association, genre_book_association
+from repositories.book_import_repository import BookImportRepository
+from repositories.detail_cache_repository import (
+    DETAIL_CACHE_INVALIDATIONS_KEY,
+    DetailCacheEntity,
+    DetailCacheRepository,
+)
+from schemas.book_schemas import BookImportFormat
+from usecases.book_import_usecases import BookImportUseCase
+
+CSV_LINES = [
+    "title_rus,title_origin,quantity,available_for_loan,authors_name,authors_surname,authors_nationality,genre_name\n",
+    "идиот,the idiot,2,2,фёдор,достоевский,Россия,тестовый роман\n",
+    "бесы,,1,1,Фёдор,Достоевский,Россия,Тестовый роман\n",
+    "Идиот,,1,1,Фёдор,Достоевский,Россия,Тестовый роман\n",
+    ",,1,1,Фёдор,Достоевский,Россия,Тестовый роман\n",
+    "Мёртвые души,,много,1,Николай,Гоголь,Россия,Поэма\n",
+    "Шинель,,1\n",
+    "Вий,,1,1,Николай,Гоголь,Россия,Тестовая повесть\n",
+]
+
+
+async def iter_lines(lines):
+    for line in lines:
+        yield line
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_import_books_from_csv(test_async_engine, mock_redis):
+    # Everything runs inside one transaction that is rolled back, so other tests never see these books
+    async with test_async_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+        usecase = BookImportUseCase(
+            BookImportRepository(session), DetailCacheRepository(mock_redis, session)
+        )
+
+        report = await usecase.import_books(
+            lines=iter_lines(CSV_LINES), file_format=BookImportFormat.csv, username="importer"
+        )
+        books = (await session.execute(select(Book.title_rus, Book.created_by).order_by(Book.id))).all()
+        authors_count = await session.scalar(select(func.count()).select_from(Author))
+        genres = (await session.execute(select(Genre.name))).scalars().all()
+        imported_author_ids = set(
+            (
+                await session.execute(
+                    select(author_book_association.c.author_id)
+                    .join(Book, Book.id == author_book_association.c.book_id)
+                    .where(Book.created_by == "importer")
+                )
+            ).scalars()
+        )
+        imported_genre_ids = set(
+            (
+                await session.execute(
+                    select(genre_book_association.c.genre_id)
+                    .join(Book, Book.id == genre_book_association.c.book_id)
+                    .where(Book.created_by == "importer")
+                )
+            ).scalars()
+        )
+        invalidations = session.info.pop(DETAIL_CACHE_INVALIDATIONS_KEY)
+
+        second_report = await usecase.import_books(
+            lines=iter_lines(CSV_LINES[:3]), file_format=BookImportFormat.csv, username="importer"
+        )
+        rejected_only_report = await usecase.import_books(
+            lines=iter_lines([CSV_LINES[0], "Идиот,,1,1,Пётр,Достоевский,Россия,Жанр отклонённой книги\n"]),
+            file_format=BookImportFormat.csv,
+            username="importer",
+        )
+        orphans_count = await session.scalar(
+            select(func.count())
+            .select_from(Author)
+            .where(Author.name == "Пётр", Author.surname == "Достоевский")
+        )
+        orphan_genres_count = await session.scalar(
+            select(func.count()).select_from(Genre).where(Genre.name == "Жанр отклонённой книги")
+        )
+
+        await session.close()
+        await transaction.rollback()
+
+    assert report.total_rows == 7
+    assert report.imported_books == 3
+    assert report.created_authors == 2
+    assert report.created_genres == 2
+    assert [error.row for error in report.errors] == [4, 5, 6, 7]
+    assert report.errors[0].errors == ["Duplicates the book in row 2"]
+    assert report.errors[1].errors[0].startswith("title_rus:")
+    assert report.errors[2].errors[0].startswith("quantity:")
+    assert report.errors[3].errors == ["Expected 8 columns, got 3"]
+
+    assert ("Идиот", "importer") in books
+    assert ("Бесы", "importer") in books
+    assert ("Вий", "importer") in books
+    assert authors_count >= 2
+    assert invalidations[DetailCacheEntity.author] == imported_author_ids
+    assert invalidations[DetailCacheEntity.genre] == imported_genre_ids
+    assert {"Тестовый роман", "Тестовая повесть"} <= set(genres)
+
+    assert second_report.imported_books == 0
+    assert second_report.created_authors == 0
+    assert [error.errors for error in second_report.errors] == [
+        ["The book 'Идиот' of the author Фёдор Достоевский already exists"],
+        ["The book 'Бесы' of the author Фёдор Достоевский already exists"],
+    ]
+
+    assert rejected_only_report.imported_books == 0
+    assert rejected_only_report.created_authors == 0
+    assert rejected_only_report.created_genres == 0
+    assert orphans_count == 0
+    assert orphan_genres_count == 0
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Genre
+from repositories.entity_loader import get_entity_loader
+from repositories.genre_repository import GenreRepository
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_entity_loader_reuses_and_batches_lookups(test_async_engine, executed_queries):
+    # Seeded rows are rolled back at the end, so other tests never see them
+    async with test_async_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+
+        genres = [Genre(name=f"Жанр загрузчика {index}") for index in range(3)]
+        session.add_all(genres)
+        await session.flush()
+        genre_ids = [genre.id for genre in genres]
+
+        loader = get_entity_loader(session)
+        executed_queries.clear()
+
+        # Loaded in this session already, so no query at all
+        genre = await GenreRepository(session).get_genre_by_id(genre_id=genre_ids[0])
+        assert genre is genres[0]
+        assert executed_queries == []
+
+        # Concurrent lookups, duplicates and a missing id included, share one IN query
+        session.expunge_all()
+        loaded = await asyncio.gather(
+            *[loader.load(Genre, genre_id) for genre_id in genre_ids + [genre_ids[0], 0]]
+        )
+
+        assert [genre.id if genre else None for genre in loaded] == genre_ids + [genre_ids[0], None]
+        assert loaded[0] is loaded[3]
+        assert len(executed_queries) == 1
+        assert loader.saved_queries == 5
+
+        await session.close()
+        await transaction.rollback()
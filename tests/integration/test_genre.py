@@ -54,6 +54,38 @@ async def test_get_all_genres(async_client: AsyncClient, test_user, test_genre_l
     assert len(response.json()["genres"]) == 3
 
 
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_get_all_genres_by_cursor(async_client: AsyncClient, test_user, test_genre_list_query_params):
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+    params = {**test_genre_list_query_params, "limit": 2}
+
+    first_page = await async_client.get("/genre/genres/all", params=params, headers=headers)
+
+    assert first_page.status_code == status.HTTP_200_OK
+    assert len(first_page.json()["genres"]) == 2
+    assert first_page.json()["next_cursor"] is not None
+
+    params["cursor"] = first_page.json()["next_cursor"]
+
+    second_page = await async_client.get("/genre/genres/all", params=params, headers=headers)
+
+    assert second_page.status_code == status.HTTP_200_OK
+    assert len(second_page.json()["genres"]) == 1
+    assert second_page.json()["next_cursor"] is None
+    assert second_page.json()["genres"][0]["name"] > first_page.json()["genres"][-1]["name"]
+
+    params["sort_by"] = "id"
+
+    response = await async_client.get("/genre/genres/all", params=params, headers=headers)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_update_genre(async_client: AsyncClient, test_user):
@@ -71,6 +103,27 @@ async def test_update_genre(async_client: AsyncClient, test_user):
     assert response.json()["name"] == updated_data["name"]
 
 
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_suggest_genres(async_client: AsyncClient, test_user, pg_trgm_installed):
+    if not pg_trgm_installed:
+        pytest.skip("pg_trgm extension is not available")
+
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = await async_client.get(
+        "/genre/suggest", params={"q": "фонтастика", "limit": 5}, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["genres"][0]["name"] == "Научная фантастика"
+    assert len(response.json()["genres"]) <= 5
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_delete_genre(async_client: AsyncClient, test_user):
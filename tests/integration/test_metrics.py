@@ -0,0 +1,128 @@
+import asyncio
+
+import asyncpg
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import make_url, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette import status
+
+from configs.database import engine_options, get_pool_statistics
+from configs.settings import settings
+from repositories.detail_cache_repository import detail_cache_statistics
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_get_db_pool_stats(async_client: AsyncClient, test_user):
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = await async_client.get("/metrics/db-pool", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["engine"] == "primary"
+    assert response.json()[0]["pool_size"] == settings.DB_POOL_SIZE
+    assert response.json()[0]["max_overflow"] == settings.DB_MAX_OVERFLOW
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_pool_statistics_count_waits_and_timeouts(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.3)
+    engine = create_async_engine(settings.test_db_url, **engine_options())
+
+    async def hold_connection(seconds: float) -> bool:
+        async with engine.connect() as connection:
+            result = await connection.execute(
+                text(
+                    "SELECT current_setting('statement_timeout')::interval = make_interval(secs => :timeout), "
+                    "pg_sleep(:seconds)"
+                ),
+                {"timeout": settings.DB_STATEMENT_TIMEOUT_MS / 1000, "seconds": seconds},
+            )
+            return result.first()[0]
+
+    try:
+        # The second and third checkouts wait for the single connection, the fourth gives up waiting
+        results = await asyncio.gather(
+            hold_connection(0.1),
+            hold_connection(0),
+            hold_connection(0.5),
+            hold_connection(0),
+            return_exceptions=True,
+        )
+        statistics = get_pool_statistics(engine)
+    finally:
+        await engine.dispose()
+
+    assert results[:3] == [True, True, True]
+    assert isinstance(results[3], PoolTimeoutError)
+    assert statistics["checkouts"] == 3
+    assert statistics["checkout_timeouts"] == 1
+    assert statistics["wait_time_max_ms"] >= 100
+    assert statistics["connects"] == 1
+    assert statistics["checked_out"] == 0
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_pool_statistics_tell_connect_time_from_waiting():
+    async def slow_connect():
+        await asyncio.sleep(0.2)
+        url = make_url(settings.test_db_url).set(drivername="postgresql")
+        return await asyncpg.connect(url.render_as_string(hide_password=False))
+
+    engine = create_async_engine(settings.test_db_url, async_creator=slow_connect, **engine_options())
+
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+        statistics = get_pool_statistics(engine)
+    finally:
+        await engine.dispose()
+
+    assert statistics["connects"] == 1
+    assert statistics["connect_time_max_ms"] >= 200
+    assert statistics["wait_time_max_ms"] < 100
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_get_detail_cache_stats(async_client: AsyncClient, test_user):
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+    misses = detail_cache_statistics.misses
+
+    # The mocked Redis misses every time, so the lookup is counted and served from the database
+    await async_client.get("/genre/1", headers=headers)
+    response = await async_client.get("/metrics/detail-cache", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["misses"] == misses + 1
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_get_rabbitmq_publisher_stats(async_client: AsyncClient, test_user):
+    form_data = {"username": test_user["username"], "password": test_user["password"]}
+    login_response = await async_client.post("/auth/login", data=form_data)
+    access_token = login_response.json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = await async_client.get("/metrics/rabbitmq", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["channel_pool_size"] == settings.RABBITMQ_CHANNEL_POOL_SIZE
+    assert response.json()["in_flight"] == 0
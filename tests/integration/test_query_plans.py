@@ -0,0 +1,227 @@
+import re
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Author, Book, BookInstance, Genre, Order, Reader
+from models.book import BookStatusEnum
+from repositories.author_repository import AuthorRepository
+from repositories.book_instance_repository import BookInstanceRepository
+from repositories.book_repository import BookRepository
+from repositories.genre_repository import GenreRepository
+from repositories.user_repository import UserRepository
+from schemas.author_schemas import (
+    AuthorListQueryParams,
+    AuthorLoadProfile,
+    AuthorSuggestQueryParams,
+)
+from schemas.book_schemas import (
+    BookInstanceLoadProfile,
+    BookListQueryParams,
+    BookLoadProfile,
+    BookSearchQueryParams,
+)
+from schemas.genre_schemas import (
+    GenreListQueryParams,
+    GenreLoadProfile,
+    GenreSuggestQueryParams,
+)
+from schemas.user_schemas import UserListQueryParams
+
+BOOKS = 200
+
+
+async def seed_catalog(session) -> tuple[Author, Genre, Book, BookInstance]:
+    reader = Reader(
+        name="Пётр",
+        fathers_name="Петрович",
+        surname="Планов",
+        date_of_birth=date(1990, 1, 1),
+        email="plans@example.com",
+        address="Минск",
+    )
+    genres = [Genre(name=f"Жанр плана {index}") for index in range(10)]
+    authors = [
+        Author(name="Автор", surname=f"Планов {index}", nationality="Беларусь") for index in range(20)
+    ]
+
+    for index in range(BOOKS):
+        book = Book(
+            title_rus=f"План {index}", title_origin=f"Plan {index}", quantity=1, available_for_loan=1
+        )
+        book.authors.append(authors[index % len(authors)])
+        book.genres.append(genres[index % len(genres)])
+        instance = BookInstance(book=book, value=30, price_per_day=1)
+
+        if index % 2:
+            order = Order(
+                reader=reader,
+                planned_return_date=date(2030, 1, 1),
+                fact_return_date=date(2030, 1, 1),
+                total_cost=0,
+            )
+            order.book_instances.append(instance)
+            session.add(order)
+
+        session.add(book)
+
+    await session.flush()
+    return authors[0], genres[0], book, instance
+
+
+async def run_repository_queries(session, author, genre, book, instance, pg_trgm_installed) -> None:
+    book_repository = BookRepository(session)
+    await book_repository.get_book_by_id(book_id=book.id, load_profile=BookLoadProfile.with_authors_genres)
+    await book_repository.get_books_by_title(book_title=book.title_rus)
+    await book_repository.get_book_by_title_and_author(title=book.title_rus, author=author.surname)
+    await book_repository.search_books(request_payload=BookSearchQueryParams(q="план"))
+
+    for sort_by in ["id", "title_rus"]:
+        page = await book_repository.get_all_books(
+            request_payload=BookListQueryParams(limit=5, sort_by=sort_by)
+        )
+        await book_repository.get_all_books(
+            request_payload=BookListQueryParams(limit=5, sort_by=sort_by, cursor=page.next_cursor)
+        )
+
+    author_repository = AuthorRepository(session)
+    await author_repository.get_author_by_id(author_id=author.id, load_profile=AuthorLoadProfile.with_books)
+    await author_repository.get_author_by_surname_and_name(surname=author.surname, name=author.name)
+    await author_repository.get_author_by_surname_and_name(surname=author.surname, name=None)
+    await author_repository.get_existing_author_ids(author_ids=[author.id])
+
+    for sort_by in ["id", "surname", "nationality"]:
+        page = await author_repository.get_all_authors(
+            request_payload=AuthorListQueryParams(limit=5, sort_by=sort_by)
+        )
+        await author_repository.get_all_authors(
+            request_payload=AuthorListQueryParams(limit=5, sort_by=sort_by, cursor=page.next_cursor)
+        )
+
+    genre_repository = GenreRepository(session)
+    await genre_repository.get_genre_by_id(genre_id=genre.id, load_profile=GenreLoadProfile.with_books)
+    await genre_repository.get_genre_by_name(name=genre.name)
+    await genre_repository.get_existing_genre_ids(genre_ids=[genre.id])
+
+    for sort_by in ["id", "name"]:
+        page = await genre_repository.get_all_genres(
+            request_payload=GenreListQueryParams(limit=5, sort_by=sort_by)
+        )
+        await genre_repository.get_all_genres(
+            request_payload=GenreListQueryParams(limit=5, sort_by=sort_by, cursor=page.next_cursor)
+        )
+
+    if pg_trgm_installed:
+        await author_repository.get_similar_author(surname=author.surname, name=author.name)
+        await author_repository.suggest_authors(request_payload=AuthorSuggestQueryParams(q="планов"))
+        await genre_repository.get_similar_genre(name=genre.name)
+        await genre_repository.suggest_genres(request_payload=GenreSuggestQueryParams(q="жанр"))
+
+    user_repository = UserRepository(session)
+    await user_repository.get_user_by_id(user_id=1)
+    await user_repository.get_user_by_username(username="test_user")
+    await user_repository.get_user_by_email(email="test@example.com")
+
+    for sort_by in ["id", "name", "surname", "username", "email"]:
+        page = await user_repository.get_all_users(
+            request_payload=UserListQueryParams(limit=1, sort_by=sort_by)
+        )
+        await user_repository.get_all_users(
+            request_payload=UserListQueryParams(limit=1, sort_by=sort_by, cursor=page.next_cursor)
+        )
+
+    book_instance_repository = BookInstanceRepository(session)
+    await book_instance_repository.get_book_instance_by_id(
+        book_instance_id=instance.id, load_profile=BookInstanceLoadProfile.with_book
+    )
+    await book_instance_repository.get_all_instances_by_book_id(book_id=book.id)
+    await book_instance_repository.update_book_instance(
+        book_item_to_update=instance, new_status=BookStatusEnum.LOANED
+    )
+    await book_instance_repository.delete_book_instance(book_item_to_delete=instance)
+
+
+def full_scans(plan: dict, indexes: dict[str, str], leading_columns: dict[str, set[str]]) -> list[str]:
+    """
+    Collects the relations a plan reads in full: sequential scans, and index scans whose
+    condition no index of the table can seek on (e.g. the second column of a composite key).
+    Index scans without a condition only walk the index in sort order under a LIMIT.
+    """
+    scans = []
+
+    if plan["Node Type"] == "Seq Scan":
+        scans.append(plan["Relation Name"])
+    elif "Index Cond" in plan and plan["Index Name"] in indexes:
+        table = indexes[plan["Index Name"]]
+
+        if not any(re.search(rf"\b{column}\b", plan["Index Cond"]) for column in leading_columns[table]):
+            scans.append(table)
+
+    for subplan in plan.get("Plans", []):
+        scans.extend(full_scans(subplan, indexes, leading_columns))
+
+    return scans
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_repository_queries_do_not_scan_tables_in_full(
+    test_async_engine, executed_queries, pg_trgm_installed
+):
+    # Seeded rows are rolled back at the end, so other tests never see them
+    async with test_async_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+
+        author, genre, book, instance = await seed_catalog(session)
+        await session.execute(text("ANALYZE"))
+
+        # On a small test catalog a sequential scan is often the cheapest plan even when an index exists.
+        # Disabling it makes the planner pick an index whenever one can serve the query,
+        # so a remaining full scan means the index is missing.
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        executed_queries.clear()
+
+        await run_repository_queries(session, author, genre, book, instance, pg_trgm_installed)
+
+        statements = [
+            query
+            for query in executed_queries
+            if query["statement"].lstrip().split(None, 1)[0].upper()
+            in ("SELECT", "UPDATE", "DELETE", "WITH")
+        ]
+        # Expression indexes have no leading column, their conditions are not checked
+        result = await connection.execute(
+            text(
+                "SELECT index_class.relname, table_class.relname, leading_column.attname FROM pg_index "
+                "JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid "
+                "JOIN pg_class AS table_class ON table_class.oid = pg_index.indrelid "
+                "JOIN pg_attribute AS leading_column ON leading_column.attrelid = pg_index.indrelid "
+                "AND leading_column.attnum = pg_index.indkey[0]"
+            )
+        )
+        indexes = {}
+        leading_columns = {}
+
+        for index_name, table, column in result.all():
+            indexes[index_name] = table
+            leading_columns.setdefault(table, set()).add(column)
+
+        scans = {}
+
+        for query in statements:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {query['statement']}", query["parameters"]
+            )
+            plan = result.scalar()[0]["Plan"]
+
+            for relation in full_scans(plan, indexes, leading_columns):
+                scans.setdefault(relation, query["statement"])
+
+        await session.close()
+        await transaction.rollback()
+
+    assert len(statements) > 40
+    assert scans == {}
@@ -4,7 +4,7 @@ import pytest
 from fastapi.security import OAuth2PasswordRequestForm
 
 from configs.settings import settings
-from dependencies.auth_dependencies import get_password_hash
+from dependencies.auth_dependencies import pwd_context
 from models.user_role_enum import UserRoleEnum
 
 
@@ -32,7 +32,7 @@ def unit_test_user_in_db():
         name="TestName",
         surname="TestSurname",
         username="test_user",
-        password=get_password_hash("test_password"),
+        password=pwd_context.hash("test_password"),
         email="test@example.com",
         role=UserRoleEnum.ADMIN.value,
         is_blocked=False,
@@ -65,7 +65,7 @@ def unit_test_user_2_in_db():
         name="TestName2",
         surname="TestSurname2",
         username="test_user2",
-        password=get_password_hash("test_password2"),
+        password=pwd_context.hash("test_password2"),
         email="test2@example.com",
         role=UserRoleEnum.LIBRARIAN.value,
         is_blocked=False,
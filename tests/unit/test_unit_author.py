@@ -1,9 +1,10 @@
 from datetime import datetime
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from sqlalchemy.exc import SQLAlchemyError
 
+from configs.settings import settings
 from exception_handlers.author_exc_handlers import (
     AuthorAlreadyExists,
     AuthorDoesNotExist,
@@ -17,6 +18,11 @@ from schemas.author_schemas import (
     AuthorsListSchema,
     AuthorUpdateSchema,
 )
+from schemas.upload_schemas import (
+    ImageEntity,
+    ImageProcessingJobSchema,
+    ImageUploadFinalizeSchema,
+)
 from usecases.author_usecases import AuthorUseCase
 
 
@@ -105,6 +111,26 @@ async def test_get_author_by_id_does_not_exist(unit_mock_minio_usecase):
     mock_author_repo.get_author_by_id.assert_awaited_once()
 
 
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_check_authors_exist_reports_missing_ids(unit_mock_minio_usecase):
+    author_ids = [1, 2, 3, 4]
+
+    mock_author_repo = AsyncMock()
+    mock_author_repo.get_existing_author_ids.return_value = {1, 3}
+
+    author_use_case = AuthorUseCase(
+        author_repository=mock_author_repo, minio_s3_usecase=unit_mock_minio_usecase
+    )
+
+    with pytest.raises(AuthorDoesNotExist) as exc_info:
+        await author_use_case.check_authors_exist(author_ids=author_ids)
+
+    assert exc_info.value.detail == "Authors with ids [2, 4] do not exist"
+
+    mock_author_repo.get_existing_author_ids.assert_awaited_once_with(author_ids=author_ids)
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_get_author_by_surname_and_name(unit_test_author_in_db, unit_mock_minio_usecase):
@@ -289,3 +315,86 @@ async def test_delete_author_db_error(unit_test_author_in_db, unit_mock_minio_us
 
     mock_author_repo.get_author_by_id.assert_awaited_once()
     mock_author_repo.delete_author.assert_awaited_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_delete_author_releases_photo(unit_test_author_in_db, unit_mock_minio_usecase):
+    author = Author(**unit_test_author_in_db)
+
+    mock_author_repo = AsyncMock()
+    mock_author_repo.release_photo = MagicMock()
+    mock_author_repo.get_author_by_id.return_value = author
+
+    author_use_case = AuthorUseCase(
+        author_repository=mock_author_repo, minio_s3_usecase=unit_mock_minio_usecase
+    )
+
+    await author_use_case.delete_author(author_id=author.id)
+
+    # The photo is deleted only after the session has committed, if no other author refers to it
+    mock_author_repo.release_photo.assert_called_once_with(photo_s3_url=author.photo_s3_url)
+    unit_mock_minio_usecase.delete_file.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_finalize_author_photo_enqueues_processing(
+    unit_test_user, unit_test_author_in_db, unit_mock_minio_usecase, monkeypatch
+):
+    author = Author(**unit_test_author_in_db)
+    key = "staging/0123456789abcdef0123456789abcdef"
+    mock_send_message = AsyncMock()
+    monkeypatch.setattr("usecases.author_usecases.send_message_to_rabbitmq", mock_send_message)
+
+    mock_author_repo = AsyncMock()
+    mock_author_repo.get_author_by_id.return_value = author
+    unit_mock_minio_usecase.check_staged_file.return_value = '"etag"'
+
+    author_use_case = AuthorUseCase(
+        author_repository=mock_author_repo, minio_s3_usecase=unit_mock_minio_usecase
+    )
+
+    result = await author_use_case.finalize_author_photo(
+        author_id=author.id, upload=ImageUploadFinalizeSchema(key=key), username=unit_test_user["username"]
+    )
+
+    assert result.key == key
+    # The API only checks the staged photo, the image worker downloads and processes it
+    unit_mock_minio_usecase.upload_staged_file_and_get_presigned_url.assert_not_awaited()
+    job = ImageProcessingJobSchema.model_validate_json(mock_send_message.await_args.kwargs["message"])
+    assert job == ImageProcessingJobSchema(
+        entity=ImageEntity.author,
+        entity_id=author.id,
+        bucket_name=settings.MINIO_BUCKET_NAME_2,
+        key=key,
+        etag='"etag"',
+        username=unit_test_user["username"],
+    )
+    assert mock_send_message.await_args.kwargs["queue_name"] == settings.RABBITMQ_IMAGE_PROCESSING_QUEUE
+    mock_author_repo.update_author.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_set_author_photo(unit_test_user, unit_test_author_in_db, unit_mock_minio_usecase):
+    author = Author(**unit_test_author_in_db)
+    file_url = "http://localhost:9000/authors/5d41402abc4b2a76.jpg"
+
+    mock_author_repo = AsyncMock()
+    mock_author_repo.get_author_by_id.return_value = author
+    mock_author_repo.update_author.return_value = author
+    mock_author_repo.release_photo = MagicMock()
+    old_photo_s3_url = author.photo_s3_url
+
+    author_use_case = AuthorUseCase(
+        author_repository=mock_author_repo, minio_s3_usecase=unit_mock_minio_usecase
+    )
+
+    result = await author_use_case.set_author_photo(
+        author_id=author.id, file_url=file_url, username=unit_test_user["username"]
+    )
+
+    assert result.photo_s3_url == file_url
+    mock_author_repo.release_photo.assert_called_once_with(photo_s3_url=old_photo_s3_url)
+    mock_author_repo.update_author.assert_awaited_once()
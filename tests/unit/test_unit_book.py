@@ -1,16 +1,18 @@
 from datetime import datetime
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock, call
 
 import pytest
 from sqlalchemy.exc import SQLAlchemyError
 
 from exception_handlers.book_exc_handlers import BookDoesNotExist
 from models import Author, Book, Genre
+from repositories.detail_cache_repository import DetailCacheEntity
 from schemas.author_schemas import AuthorReadSchema
 from schemas.book_schemas import (
     BookCreateSchema,
     BookDeleteSchema,
     BookListQueryParams,
+    BookLoadProfile,
     BookReadSchema,
     BookUpdateSchema,
     BookWithAuthorsGenresCreateSchema,
@@ -78,10 +80,9 @@ async def test_map_book_to_existing_authors(unit_test_user, unit_test_book_in_db
 
     mock_book_repo = AsyncMock()
     mock_book_repo.get_book_by_id.return_value = Book(**unit_test_book_in_db)
-    mock_book_repo.update_book.return_value = updated_book
+    mock_book_repo.map_book_to_authors.return_value = updated_book
 
     author_use_case = AsyncMock()
-    author_use_case.get_author_by_id.return_value = Author(**unit_test_author_in_db)
     genre_use_case = AsyncMock()
     book_use_case = BookUseCase(
         book_repository=mock_book_repo, author_usecase=author_use_case, genre_usecase=genre_use_case
@@ -96,8 +97,35 @@ async def test_map_book_to_existing_authors(unit_test_user, unit_test_book_in_db
     assert len(result.authors) == 1
 
     mock_book_repo.get_book_by_id.assert_awaited_once()
-    author_use_case.get_author_by_id.assert_awaited_once()
-    mock_book_repo.update_book.assert_awaited_once()
+    author_use_case.check_authors_exist.assert_awaited_once_with(author_ids=author_ids)
+    mock_book_repo.map_book_to_authors.assert_awaited_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_map_book_to_existing_authors_invalidates_detail_cache(unit_test_user, unit_test_book_in_db):
+    mock_book_repo = AsyncMock()
+    mock_book_repo.get_book_by_id.return_value = Book(**unit_test_book_in_db)
+    mock_detail_cache_repo = MagicMock()
+
+    book_use_case = BookUseCase(
+        book_repository=mock_book_repo,
+        author_usecase=AsyncMock(),
+        genre_usecase=AsyncMock(),
+        detail_cache_repository=mock_detail_cache_repo,
+    )
+
+    await book_use_case.map_book_to_existing_authors(
+        book_id=1, author_ids=[2, 3, 2], username=unit_test_user["username"]
+    )
+
+    # The book and the book lists of the newly mapped authors are both stale
+    mock_detail_cache_repo.invalidate.assert_has_calls(
+        [
+            call(entity=DetailCacheEntity.book, entity_ids=[1]),
+            call(entity=DetailCacheEntity.author, entity_ids=[2, 3]),
+        ]
+    )
 
 
 @pytest.mark.unit
@@ -110,10 +138,9 @@ async def test_map_book_to_existing_authors_db_error(
 
     mock_book_repo = AsyncMock()
     mock_book_repo.get_book_by_id.return_value = Book(**unit_test_book_in_db)
-    mock_book_repo.update_book.side_effect = SQLAlchemyError("DB Error")
+    mock_book_repo.map_book_to_authors.side_effect = SQLAlchemyError("DB Error")
 
     author_use_case = AsyncMock()
-    author_use_case.get_author_by_id.return_value = Author(**unit_test_author_in_db)
     genre_use_case = AsyncMock()
     book_use_case = BookUseCase(
         book_repository=mock_book_repo, author_usecase=author_use_case, genre_usecase=genre_use_case
@@ -125,8 +152,8 @@ async def test_map_book_to_existing_authors_db_error(
         )
 
     mock_book_repo.get_book_by_id.assert_awaited_once()
-    author_use_case.get_author_by_id.assert_awaited_once()
-    mock_book_repo.update_book.assert_awaited_once()
+    author_use_case.check_authors_exist.assert_awaited_once_with(author_ids=author_ids)
+    mock_book_repo.map_book_to_authors.assert_awaited_once()
 
 
 @pytest.mark.unit
@@ -143,11 +170,10 @@ async def test_map_book_to_existing_genres(unit_test_user, unit_test_book_in_db,
 
     mock_book_repo = AsyncMock()
     mock_book_repo.get_book_by_id.return_value = Book(**unit_test_book_in_db)
-    mock_book_repo.update_book.return_value = updated_book
+    mock_book_repo.map_book_to_genres.return_value = updated_book
 
     author_use_case = AsyncMock()
     genre_use_case = AsyncMock()
-    genre_use_case.get_genre_by_id.return_value = Genre(id=1, name="Роман")
     book_use_case = BookUseCase(
         book_repository=mock_book_repo, author_usecase=author_use_case, genre_usecase=genre_use_case
     )
@@ -161,8 +187,8 @@ async def test_map_book_to_existing_genres(unit_test_user, unit_test_book_in_db,
     assert len(result.genres) == 1
 
     mock_book_repo.get_book_by_id.assert_awaited_once()
-    genre_use_case.get_genre_by_id.assert_awaited_once()
-    mock_book_repo.update_book.assert_awaited_once()
+    genre_use_case.check_genres_exist.assert_awaited_once_with(genre_ids=genre_ids)
+    mock_book_repo.map_book_to_genres.assert_awaited_once()
 
 
 @pytest.mark.unit
@@ -175,11 +201,10 @@ async def test_map_book_to_existing_genres_db_error(
 
     mock_book_repo = AsyncMock()
     mock_book_repo.get_book_by_id.return_value = Book(**unit_test_book_in_db)
-    mock_book_repo.update_book.side_effect = SQLAlchemyError("DB Error")
+    mock_book_repo.map_book_to_genres.side_effect = SQLAlchemyError("DB Error")
 
     author_use_case = AsyncMock()
     genre_use_case = AsyncMock()
-    genre_use_case.get_genre_by_id.return_value = Genre(id=1, name="Роман")
     book_use_case = BookUseCase(
         book_repository=mock_book_repo, author_usecase=author_use_case, genre_usecase=genre_use_case
     )
@@ -190,8 +215,8 @@ async def test_map_book_to_existing_genres_db_error(
         )
 
     mock_book_repo.get_book_by_id.assert_awaited_once()
-    genre_use_case.get_genre_by_id.assert_awaited_once()
-    mock_book_repo.update_book.assert_awaited_once()
+    genre_use_case.check_genres_exist.assert_awaited_once_with(genre_ids=genre_ids)
+    mock_book_repo.map_book_to_genres.assert_awaited_once()
 
 
 @pytest.mark.unit
@@ -241,6 +266,50 @@ async def test_create_new_book_with_author_and_genre(
     mock_book_repo.create_new_book.assert_awaited_once()
 
 
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_create_new_book_with_author_and_genre_match_fuzzily(
+    unit_test_author_in_db,
+    unit_test_book_in_db,
+    unit_test_book_with_author_and_genre,
+    unit_mock_file,
+):
+    new_book = BookWithAuthorsGenresCreateSchema(**unit_test_book_with_author_and_genre)
+    similar_author = Author(**unit_test_author_in_db)
+    similar_genre = Genre(id=1, name="Роман")
+
+    mock_book_repo = AsyncMock()
+    mock_book_repo.get_book_by_title_and_author.return_value = None
+    mock_book_repo.create_new_book.return_value = Book(
+        **unit_test_book_in_db, authors=[similar_author], genres=[similar_genre]
+    )
+
+    author_use_case = AsyncMock()
+    author_use_case.get_similar_author.return_value = similar_author
+    genre_use_case = AsyncMock()
+    genre_use_case.get_similar_genre.return_value = similar_genre
+    book_use_case = BookUseCase(
+        book_repository=mock_book_repo, author_usecase=author_use_case, genre_usecase=genre_use_case
+    )
+
+    result = await book_use_case.create_new_book_with_author_and_genre(
+        new_book=new_book, file=unit_mock_file, username="librarian", match_fuzzily=True
+    )
+
+    assert result.authors[0].id == similar_author.id
+    assert result.genres[0].id == similar_genre.id
+
+    author_use_case.get_similar_author.assert_awaited_once()
+    author_use_case.get_author_by_surname_and_name.assert_not_awaited()
+    author_use_case.create_new_author.assert_not_awaited()
+    genre_use_case.get_similar_genre.assert_awaited_once()
+    genre_use_case.get_genre_by_name.assert_not_awaited()
+    genre_use_case.create_new_genre.assert_not_awaited()
+    mock_book_repo.get_book_by_title_and_author.assert_awaited_once_with(
+        title=new_book.title_rus, author=similar_author.surname
+    )
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_create_new_book_with_author_and_genre_db_error(
@@ -290,6 +359,27 @@ async def test_get_book_by_id(unit_test_book_in_db):
     mock_book_repo.get_book_by_id.assert_awaited_once()
 
 
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_book_by_id_with_load_profile(unit_test_book_in_db):
+    book_id = 1
+
+    mock_book_repo = AsyncMock()
+    mock_book_repo.get_book_by_id.return_value = Book(**unit_test_book_in_db, authors=[], genres=[])
+
+    author_use_case = AsyncMock()
+    genre_use_case = AsyncMock()
+    book_use_case = BookUseCase(
+        book_repository=mock_book_repo, author_usecase=author_use_case, genre_usecase=genre_use_case
+    )
+
+    await book_use_case.get_book_by_id(book_id=book_id, load_profile=BookLoadProfile.with_authors_genres)
+
+    mock_book_repo.get_book_by_id.assert_awaited_once_with(
+        book_id=book_id, load_profile=BookLoadProfile.with_authors_genres
+    )
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_get_book_by_id_does_not_exist():
@@ -310,6 +400,91 @@ async def test_get_book_by_id_does_not_exist():
     mock_book_repo.get_book_by_id.assert_awaited_once()
 
 
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_book_by_id_from_detail_cache(unit_test_book_in_db):
+    book_id = 1
+    cached_book = BookWithAuthorsGenresReadSchema(**unit_test_book_in_db)
+
+    mock_book_repo = AsyncMock()
+    mock_detail_cache_repo = AsyncMock()
+    mock_detail_cache_repo.get_detail.return_value = cached_book
+
+    book_use_case = BookUseCase(
+        book_repository=mock_book_repo,
+        author_usecase=AsyncMock(),
+        genre_usecase=AsyncMock(),
+        detail_cache_repository=mock_detail_cache_repo,
+    )
+
+    result = await book_use_case.get_book_by_id(
+        book_id=book_id, load_profile=BookLoadProfile.with_authors_genres
+    )
+
+    assert result is cached_book
+
+    mock_detail_cache_repo.get_detail.assert_awaited_once_with(
+        entity=DetailCacheEntity.book, entity_id=book_id, schema=BookWithAuthorsGenresReadSchema
+    )
+    mock_book_repo.get_book_by_id.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_book_by_id_fills_detail_cache(unit_test_book_in_db, unit_test_author_in_db):
+    book_id = 1
+
+    mock_book_repo = AsyncMock()
+    mock_book_repo.get_book_by_id.return_value = Book(
+        **unit_test_book_in_db,
+        authors=[Author(**unit_test_author_in_db)],
+        genres=[Genre(id=2, name="Роман")],
+    )
+    mock_detail_cache_repo = AsyncMock()
+    mock_detail_cache_repo.get_detail.return_value = None
+
+    book_use_case = BookUseCase(
+        book_repository=mock_book_repo,
+        author_usecase=AsyncMock(),
+        genre_usecase=AsyncMock(),
+        detail_cache_repository=mock_detail_cache_repo,
+    )
+
+    result = await book_use_case.get_book_by_id(
+        book_id=book_id, load_profile=BookLoadProfile.with_authors_genres
+    )
+
+    assert isinstance(result, BookWithAuthorsGenresReadSchema)
+    assert result.genres[0].name == "Роман"
+
+    mock_detail_cache_repo.set_detail.assert_awaited_once_with(
+        entity=DetailCacheEntity.book,
+        entity_id=book_id,
+        detail=result,
+        dependencies={DetailCacheEntity.author: [1], DetailCacheEntity.genre: [2]},
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_book_by_id_card_bypasses_detail_cache(unit_test_book_in_db):
+    mock_book_repo = AsyncMock()
+    mock_book_repo.get_book_by_id.return_value = Book(**unit_test_book_in_db)
+    mock_detail_cache_repo = AsyncMock()
+
+    book_use_case = BookUseCase(
+        book_repository=mock_book_repo,
+        author_usecase=AsyncMock(),
+        genre_usecase=AsyncMock(),
+        detail_cache_repository=mock_detail_cache_repo,
+    )
+
+    await book_use_case.get_book_by_id(book_id=1)
+
+    mock_detail_cache_repo.get_detail.assert_not_awaited()
+    mock_detail_cache_repo.set_detail.assert_not_awaited()
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_get_books_by_title(unit_test_book_in_db, unit_test_author_in_db):
@@ -0,0 +1,92 @@
+import io
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from repositories.detail_cache_repository import DetailCacheEntity
+from schemas.book_schemas import BookImportFormat
+from usecases import book_import_usecases
+from usecases.book_import_usecases import (
+    BookImportUseCase,
+    iter_csv_records,
+    iter_upload_lines,
+)
+
+HEADER = "title_rus,title_origin,quantity,available_for_loan,authors_name,authors_surname,authors_nationality,genre_name\n"
+
+
+async def iter_lines(lines):
+    for line in lines:
+        yield line
+
+
+async def collect(records):
+    return [record async for record in records]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 2, 64 * 1024])
+async def test_upload_lines_end_only_at_line_breaks(monkeypatch, chunk_size):
+    # Small chunks split the CRLF and the multibyte characters between reads
+    monkeypatch.setattr(book_import_usecases, "READ_CHUNK_SIZE", chunk_size)
+    content = '{"title": "a\u2028b\x0cc\x1ed"}\r\nЖук\rfoo\n\x85bar'
+    file = AsyncMock()
+    file.read.side_effect = io.BytesIO(("\ufeff" + content).encode()).read
+
+    lines = await collect(iter_upload_lines(file))
+
+    assert lines == ['{"title": "a\u2028b\x0cc\x1ed"}\r\n', "Жук\r", "foo\n", "\x85bar"]
+    assert lines == list(io.StringIO(content, newline=""))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_csv_record_with_a_line_break_in_a_quoted_field():
+    lines = ['a,"first\n', 'second ""quoted""",b\n', "\n", "c,d,e\n"]
+
+    records = await collect(iter_csv_records(iter_lines(lines)))
+
+    assert records == [(1, ["a", 'first\nsecond "quoted"', "b"]), (4, ["c", "d", "e"])]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_csv_record_with_an_unterminated_quoted_field():
+    records = await collect(iter_csv_records(iter_lines(["a,b\n", 'c,"never closed\n', "d\n"])))
+
+    assert records == [(1, ["a", "b"]), (2, "Quoted field is not terminated")]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_import_books_numbers_rows_by_their_first_line():
+    mock_book_import_repo = AsyncMock()
+    mock_book_import_repo.import_staged_books.return_value = dict(
+        imported_books=1,
+        created_authors=1,
+        created_genres=1,
+        rejected_rows={},
+        author_ids=[3],
+        genre_ids=[4],
+    )
+    mock_detail_cache_repo = MagicMock()
+    lines = [
+        HEADER,
+        '"Война\n',
+        'и мир",,1,1,Лев,Толстой,Россия,Роман\n',
+        "Шинель,,1\n",
+    ]
+
+    report = await BookImportUseCase(mock_book_import_repo, mock_detail_cache_repo).import_books(
+        lines=iter_lines(lines), file_format=BookImportFormat.csv, username="importer"
+    )
+
+    staged_rows = mock_book_import_repo.copy_rows_to_staging.await_args.kwargs["rows"]
+    assert [(row[0], row[1]) for row in staged_rows] == [(2, "Война\nи мир")]
+    assert report.total_rows == 2
+    assert [(error.row, error.errors) for error in report.errors] == [(4, ["Expected 8 columns, got 3"])]
+    assert [call.kwargs for call in mock_detail_cache_repo.invalidate.call_args_list] == [
+        dict(entity=DetailCacheEntity.author, entity_ids=[3]),
+        dict(entity=DetailCacheEntity.genre, entity_ids=[4]),
+    ]
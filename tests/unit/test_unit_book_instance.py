@@ -210,7 +210,6 @@ async def test_update_book_instance(
     mock_book_inst_repo.update_book_instance.return_value = BookInstance(**book_instance_to_update)
 
     book_use_case = AsyncMock()
-    book_use_case.get_book_by_id.return_value = Book(**unit_test_book_in_db)
 
     unit_mock_minio_usecase.ensure_bucket_exists.return_value = True
 
@@ -231,7 +230,7 @@ async def test_update_book_instance(
     assert result.pages == book_item_to_update.pages
 
     mock_book_inst_repo.get_book_instance_by_id.assert_awaited_once()
-    book_use_case.get_book_by_id.assert_awaited_once()
+    book_use_case.get_book_by_id.assert_not_awaited()
     mock_book_inst_repo.update_book_instance.assert_awaited_once()
 
 
@@ -252,7 +251,6 @@ async def test_update_book_instance_db_error(
     mock_book_inst_repo.update_book_instance.side_effect = SQLAlchemyError("DB Error")
 
     book_use_case = AsyncMock()
-    book_use_case.get_book_by_id.return_value = Book(**unit_test_book_in_db)
 
     unit_mock_minio_usecase.ensure_bucket_exists.return_value = True
 
@@ -271,7 +269,7 @@ async def test_update_book_instance_db_error(
         )
 
     mock_book_inst_repo.get_book_instance_by_id.assert_awaited_once()
-    book_use_case.get_book_by_id.assert_awaited_once()
+    book_use_case.get_book_by_id.assert_not_awaited()
     mock_book_inst_repo.update_book_instance.assert_awaited_once()
 
 
@@ -289,7 +287,6 @@ async def test_delete_book_instance(
     )
 
     book_use_case = AsyncMock()
-    book_use_case.get_book_by_id.return_value = Book(**unit_test_book_in_db)
 
     unit_mock_minio_usecase.ensure_bucket_exists.return_value = True
 
@@ -306,7 +303,7 @@ async def test_delete_book_instance(
     )
 
     mock_book_inst_repo.get_book_instance_by_id.assert_awaited_once()
-    book_use_case.get_book_by_id.assert_awaited_once()
+    book_use_case.get_book_by_id.assert_not_awaited()
     mock_book_inst_repo.delete_book_instance.assert_awaited_once()
 
 
@@ -322,7 +319,6 @@ async def test_delete_book_instance_db_error(
     mock_book_inst_repo.delete_book_instance.side_effect = SQLAlchemyError("DB Error")
 
     book_use_case = AsyncMock()
-    book_use_case.get_book_by_id.return_value = Book(**unit_test_book_in_db)
 
     unit_mock_minio_usecase.ensure_bucket_exists.return_value = True
 
@@ -336,5 +332,5 @@ async def test_delete_book_instance_db_error(
         await book_inst_use_case.delete_book_instance(book_instance_id=book_instance_id)
 
     mock_book_inst_repo.get_book_instance_by_id.assert_awaited_once()
-    book_use_case.get_book_by_id.assert_awaited_once()
+    book_use_case.get_book_by_id.assert_not_awaited()
     mock_book_inst_repo.delete_book_instance.assert_awaited_once()
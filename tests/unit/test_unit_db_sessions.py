@@ -0,0 +1,203 @@
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import NullPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from configs.settings import settings
+from dependencies import db_dependency, db_read_dependency
+from repositories.author_repository import AuthorRepository
+from repositories.detail_cache_repository import (
+    DETAIL_CACHE_INVALIDATIONS_KEY,
+    DetailCacheEntity,
+    DetailCacheRepository,
+)
+from repositories.entity_loader import ENTITY_LOADER_KEY, get_entity_loader
+from repositories.minio_s3_repository import RELEASED_IMAGES_KEY
+from schemas.user_schemas import UserReadSchema
+
+# Sessions below are never used for queries, so the engines never connect
+primary_engine = create_async_engine(settings.test_db_url, poolclass=NullPool)
+replica_engine = create_async_engine(settings.test_db_url, poolclass=NullPool)
+primary_session_factory = async_sessionmaker(bind=primary_engine)
+replica_session_factory = async_sessionmaker(bind=replica_engine)
+
+
+@pytest.fixture
+def with_replica(monkeypatch):
+    monkeypatch.setattr(db_dependency, "async_session_factory", primary_session_factory)
+    monkeypatch.setattr(db_read_dependency, "async_session_factory", primary_session_factory)
+    monkeypatch.setattr(db_read_dependency, "replica_session_factory", replica_session_factory)
+
+
+def make_request(method: str) -> Request:
+    app = FastAPI()
+    app.state.redis_pool = MagicMock()
+    return Request({"type": "http", "method": method, "headers": [], "app": app})
+
+
+async def open_read_session(username: str, redis) -> object:
+    current_user = UserReadSchema.model_construct(username=username)
+    sessions = db_read_dependency.db_read_session(current_user=current_user, redis=redis)
+    session = await anext(sessions)
+    await sessions.aclose()
+    return session.bind
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_db_read_session_uses_replica(with_replica):
+    mock_redis = AsyncMock()
+    mock_redis.exists.return_value = 0
+
+    assert await open_read_session(username="test_user", redis=mock_redis) is replica_engine
+
+    mock_redis.exists.assert_awaited_once_with("recent_write:test_user")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("read_only", [True, False])
+async def test_sessions_report_saved_queries(with_replica, monkeypatch, caplog, read_only):
+    caplog.set_level(logging.DEBUG, logger="library_app")
+    mock_redis = AsyncMock()
+    mock_redis.exists.return_value = 0
+
+    if read_only:
+        current_user = UserReadSchema.model_construct(username="test_user")
+        sessions = db_read_dependency.db_read_session(current_user=current_user, redis=mock_redis)
+    else:
+        sessions = db_dependency.db_session(make_request("GET"))
+        monkeypatch.setattr(db_dependency, "get_redis_client", MagicMock(return_value=mock_redis))
+
+    session = await anext(sessions)
+    get_entity_loader(session).saved_queries = 3
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+
+    assert ENTITY_LOADER_KEY not in session.info
+    assert "Entity loader saved 3 queries" in caplog.text
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_db_read_session_sticks_to_primary_after_write(with_replica):
+    mock_redis = AsyncMock()
+    mock_redis.exists.return_value = 1
+
+    assert await open_read_session(username="test_user", redis=mock_redis) is primary_engine
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_db_read_session_without_replica(monkeypatch):
+    monkeypatch.setattr(db_read_dependency, "async_session_factory", primary_session_factory)
+    monkeypatch.setattr(db_read_dependency, "replica_session_factory", primary_session_factory)
+    mock_redis = AsyncMock()
+
+    assert await open_read_session(username="test_user", redis=mock_redis) is primary_engine
+
+    mock_redis.exists.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, marked", [("POST", True), ("GET", False)])
+async def test_db_session_marks_recent_write(with_replica, monkeypatch, method, marked):
+    mock_redis = AsyncMock()
+    monkeypatch.setattr(db_dependency, "get_redis_client", MagicMock(return_value=mock_redis))
+
+    sessions = db_dependency.db_session(request=make_request(method=method))
+    session = await anext(sessions)
+    session.info[db_dependency.SESSION_USERNAME_KEY] = "test_user"
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+
+    if marked:
+        mock_redis.set.assert_awaited_once_with(
+            name="recent_write:test_user", value=1, ex=settings.DB_READ_YOUR_WRITES_SECONDS
+        )
+    else:
+        mock_redis.set.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_db_session_invalidates_detail_cache_after_commit(with_replica, monkeypatch):
+    mock_redis = AsyncMock()
+    apply_invalidations = AsyncMock()
+    monkeypatch.setattr(db_dependency, "get_redis_client", MagicMock(return_value=mock_redis))
+    monkeypatch.setattr(db_dependency, "apply_detail_cache_invalidations", apply_invalidations)
+
+    sessions = db_dependency.db_session(request=make_request(method="PATCH"))
+    session = await anext(sessions)
+    DetailCacheRepository(mock_redis, session).invalidate(entity=DetailCacheEntity.book, entity_ids=[1])
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+
+    apply_invalidations.assert_awaited_once_with(
+        redis=mock_redis, invalidations={DetailCacheEntity.book: {1}}
+    )
+    assert DETAIL_CACHE_INVALIDATIONS_KEY not in session.info
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_db_session_rollback_discards_detail_cache_invalidations(with_replica, monkeypatch):
+    apply_invalidations = AsyncMock()
+    monkeypatch.setattr(db_dependency, "apply_detail_cache_invalidations", apply_invalidations)
+
+    sessions = db_dependency.db_session(request=make_request(method="PATCH"))
+    session = await anext(sessions)
+    DetailCacheRepository(AsyncMock(), session).invalidate(entity=DetailCacheEntity.book, entity_ids=[1])
+
+    with pytest.raises(ValueError):
+        await sessions.athrow(ValueError("Endpoint failed"))
+
+    apply_invalidations.assert_not_awaited()
+    assert DETAIL_CACHE_INVALIDATIONS_KEY not in session.info
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_db_session_queues_released_images_after_commit(with_replica, monkeypatch):
+    mock_redis = AsyncMock()
+    pipeline = MagicMock(execute=AsyncMock(return_value=[]))
+    mock_redis.pipeline = MagicMock(return_value=pipeline)
+    monkeypatch.setattr(db_dependency, "get_redis_client", MagicMock(return_value=mock_redis))
+
+    sessions = db_dependency.db_session(request=make_request(method="DELETE"))
+    session = await anext(sessions)
+    AuthorRepository(session).release_photo(photo_s3_url="http://localhost:9000/authors/photo.jpg")
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+
+    # The photo is deleted later by the sweep, if nothing refers to it by then
+    key, released = pipeline.zadd.call_args.args
+    assert key == f"released_images:{settings.MINIO_BUCKET_NAME_2}"
+    assert list(released) == ["photo.jpg"]
+    assert RELEASED_IMAGES_KEY not in session.info
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_db_session_rollback_keeps_released_images(with_replica, monkeypatch):
+    mock_redis = AsyncMock()
+    monkeypatch.setattr(db_dependency, "get_redis_client", MagicMock(return_value=mock_redis))
+
+    sessions = db_dependency.db_session(request=make_request(method="DELETE"))
+    session = await anext(sessions)
+    AuthorRepository(session).release_photo(photo_s3_url="http://localhost:9000/authors/photo.jpg")
+
+    with pytest.raises(ValueError):
+        await sessions.athrow(ValueError("Endpoint failed"))
+
+    mock_redis.pipeline.assert_not_called()
+    assert RELEASED_IMAGES_KEY not in session.info
@@ -0,0 +1,141 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from configs.settings import settings
+from repositories.detail_cache_repository import (
+    DETAIL_CACHE_INVALIDATIONS_KEY,
+    DetailCacheEntity,
+    DetailCacheRepository,
+    apply_detail_cache_invalidations,
+    detail_cache_statistics,
+)
+from schemas.genre_schemas import GenreReadSchema
+
+
+def mock_pipeline(redis: AsyncMock, results: list) -> MagicMock:
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=results)
+    redis.pipeline = MagicMock(return_value=pipeline)
+    return pipeline
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_detail_counts_hits_and_misses():
+    mock_redis = AsyncMock()
+    mock_redis.get.side_effect = [GenreReadSchema(id=1, name="Роман").model_dump_json(), None]
+    detail_cache_repository = DetailCacheRepository(mock_redis, MagicMock())
+    hits, misses = detail_cache_statistics.hits, detail_cache_statistics.misses
+
+    genre = await detail_cache_repository.get_detail(
+        entity=DetailCacheEntity.genre, entity_id=1, schema=GenreReadSchema
+    )
+    missing_genre = await detail_cache_repository.get_detail(
+        entity=DetailCacheEntity.genre, entity_id=2, schema=GenreReadSchema
+    )
+
+    assert genre == GenreReadSchema(id=1, name="Роман")
+    assert missing_genre is None
+    assert detail_cache_statistics.hits == hits + 1
+    assert detail_cache_statistics.misses == misses + 1
+    mock_redis.get.assert_any_await("detail:genre:1")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_detail_redis_error_is_a_miss():
+    mock_redis = AsyncMock()
+    mock_redis.get.side_effect = RedisConnectionError("Connection refused")
+    detail_cache_repository = DetailCacheRepository(mock_redis, MagicMock())
+
+    result = await detail_cache_repository.get_detail(
+        entity=DetailCacheEntity.book, entity_id=1, schema=GenreReadSchema
+    )
+
+    assert result is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_set_detail_registers_dependencies():
+    mock_redis = AsyncMock()
+    mock_redis.exists.return_value = 0
+    pipeline = mock_pipeline(mock_redis, results=[])
+    detail_cache_repository = DetailCacheRepository(mock_redis, MagicMock())
+    genre = GenreReadSchema(id=1, name="Роман")
+
+    await detail_cache_repository.set_detail(
+        entity=DetailCacheEntity.genre,
+        entity_id=1,
+        detail=genre,
+        dependencies={DetailCacheEntity.book: [5, 6]},
+    )
+
+    pipeline.set.assert_called_once_with(
+        "detail:genre:1", genre.model_dump_json(), ex=detail_cache_repository.ttl
+    )
+    assert [args for args, _ in pipeline.sadd.call_args_list] == [
+        ("detail_dependents:book:5", "detail:genre:1"),
+        ("detail_dependents:book:6", "detail:genre:1"),
+    ]
+    pipeline.execute.assert_awaited_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_set_detail_skips_fenced_detail():
+    mock_redis = AsyncMock()
+    # The genre was invalidated a moment ago, the detail may have been read from a lagging replica
+    mock_redis.exists.return_value = 1
+    pipeline = mock_pipeline(mock_redis, results=[])
+    detail_cache_repository = DetailCacheRepository(mock_redis, MagicMock())
+
+    await detail_cache_repository.set_detail(
+        entity=DetailCacheEntity.genre,
+        entity_id=1,
+        detail=GenreReadSchema(id=1, name="Роман"),
+        dependencies={},
+    )
+
+    mock_redis.exists.assert_awaited_once_with("detail:genre:1:fence")
+    pipeline.set.assert_not_called()
+    pipeline.execute.assert_not_awaited()
+
+
+@pytest.mark.unit
+def test_invalidate_is_recorded_on_the_session():
+    session = MagicMock()
+    session.info = {}
+    detail_cache_repository = DetailCacheRepository(AsyncMock(), session)
+
+    detail_cache_repository.invalidate(entity=DetailCacheEntity.book, entity_ids=[1])
+    detail_cache_repository.invalidate(entity=DetailCacheEntity.book, entity_ids=[1, 2])
+
+    assert session.info[DETAIL_CACHE_INVALIDATIONS_KEY] == {DetailCacheEntity.book: {1, 2}}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_apply_invalidations_drops_dependent_details():
+    mock_redis = AsyncMock()
+    mock_redis.delete.return_value = 3
+    # The cached author 2 lists the book, so it is dropped together with the book itself
+    pipeline = mock_pipeline(mock_redis, results=[{"detail:author:2"}])
+
+    await apply_detail_cache_invalidations(redis=mock_redis, invalidations={DetailCacheEntity.book: {1}})
+
+    pipeline.smembers.assert_called_once_with("detail_dependents:book:1")
+    assert set(mock_redis.delete.await_args.args) == {
+        "detail:book:1",
+        "detail_dependents:book:1",
+        "detail:author:2",
+    }
+    assert {args for args, _ in pipeline.set.call_args_list} == {
+        ("detail:book:1:fence", 1),
+        ("detail:author:2:fence", 1),
+    }
+    assert {kwargs["ex"] for _, kwargs in pipeline.set.call_args_list} == {
+        settings.DETAIL_CACHE_FENCE_SECONDS
+    }
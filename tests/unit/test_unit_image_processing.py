@@ -0,0 +1,289 @@
+import hashlib
+from io import BytesIO
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from PIL import Image
+
+from configs.image_processing import (
+    ImageProcessingExecutor,
+    InvalidImageError,
+    render_image,
+    rendition_urls,
+)
+from configs.settings import settings
+from repositories.minio_s3_repository import MinioS3Repository
+
+RENDITIONS = {"list": (100, 150), "retina": (400, 600)}
+
+
+def make_image(size: tuple[int, int], image_format: str, mode: str = "RGB") -> bytes:
+    buffer = BytesIO()
+    Image.new(mode, size, color="red").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("image_format, mode", [("JPEG", "RGB"), ("PNG", "RGBA"), ("PNG", "P")])
+def test_render_image_fallback_and_renditions(image_format, mode):
+    fallback, renditions = render_image(
+        make_image((1600, 1200), image_format, mode),
+        renditions=RENDITIONS,
+        max_pixels=10_000_000,
+        webp_quality=80,
+    )
+
+    fallback_image = Image.open(BytesIO(fallback))
+    assert (fallback_image.format, fallback_image.size) == (image_format, (200, 150))
+
+    rendition_images = {rendition: Image.open(BytesIO(image)) for rendition, image in renditions.items()}
+    assert {rendition: image.format for rendition, image in rendition_images.items()} == {
+        "list": "WEBP",
+        "retina": "WEBP",
+    }
+    assert rendition_images["list"].size == (100, 75)
+    assert rendition_images["retina"].size == (400, 300)
+
+
+@pytest.mark.unit
+def test_render_image_rejects_too_many_pixels():
+    with pytest.raises(InvalidImageError, match="pixels"):
+        render_image(
+            make_image((1600, 1200), "JPEG"), renditions=RENDITIONS, max_pixels=1_000_000, webp_quality=80
+        )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("data", [make_image((100, 100), "GIF"), b"not an image"])
+def test_render_image_rejects_other_files(data):
+    with pytest.raises(InvalidImageError):
+        render_image(data, renditions=RENDITIONS, max_pixels=10_000_000, webp_quality=80)
+
+
+@pytest.mark.unit
+def test_rendition_urls():
+    digest = hashlib.sha256(b"cover").hexdigest()
+    urls = rendition_urls(f"{settings.MINIO_URL_TO_OPEN_FILE}/books/{digest}.png")
+
+    assert urls == {
+        "list": f"{settings.MINIO_URL_TO_OPEN_FILE}/books/{digest}-list.webp",
+        "detail": f"{settings.MINIO_URL_TO_OPEN_FILE}/books/{digest}-detail.webp",
+        "retina": f"{settings.MINIO_URL_TO_OPEN_FILE}/books/{digest}-retina.webp",
+    }
+    assert rendition_urls(None) is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "url",
+    [
+        "cover.jpg",
+        f"https://images.example.com/books/{hashlib.sha256(b'cover').hexdigest()}.png",
+        f"{settings.MINIO_URL_TO_OPEN_FILE}/books/cover.png",
+    ],
+)
+def test_rendition_urls_of_other_images(url):
+    # Bare filenames, external URLs and images stored before keys were content-addressed have no renditions
+    assert rendition_urls(url) is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_executor_renders_in_a_worker_process():
+    executor = ImageProcessingExecutor(
+        max_workers=1, max_pixels=10_000_000, renditions=RENDITIONS, webp_quality=80
+    )
+
+    try:
+        fallback, renditions = await executor.render(make_image((600, 600), "PNG"))
+        with pytest.raises(InvalidImageError):
+            await executor.render(b"not an image")
+    finally:
+        executor.shutdown()
+
+    assert Image.open(BytesIO(fallback)).size == (200, 200)
+    assert set(renditions) == set(RENDITIONS)
+    assert executor.executor is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_upload_file_stores_fallback_and_renditions_by_content(monkeypatch):
+    monkeypatch.setattr(
+        "repositories.minio_s3_repository.image_processing_executor",
+        MagicMock(render=AsyncMock(return_value=(b"fallback", {"list": b"list", "detail": b"detail"}))),
+    )
+    s3_client = AsyncMock()
+    s3_client.copy_object.side_effect = ClientError({"Error": {"Code": "NoSuchKey"}}, "CopyObject")
+    file = MagicMock(
+        filename="cover.jpg", content_type="image/jpeg", read=AsyncMock(return_value=b"original")
+    )
+
+    filename = await MinioS3Repository(s3_client).upload_file(bucket_name="Test_bucket", file=file)
+
+    digest = hashlib.sha256(b"fallback").hexdigest()
+    assert filename == f"{digest}.jpg"
+    uploads = [
+        (call.args[2], call.args[0].read(), call.kwargs["ExtraArgs"]["ContentType"])
+        for call in s3_client.upload_fileobj.await_args_list
+    ]
+    # The fallback goes last, its presence means the renditions are stored as well
+    assert uploads == [
+        (f"{digest}-list.webp", b"list", "image/webp"),
+        (f"{digest}-detail.webp", b"detail", "image/webp"),
+        (f"{digest}.jpg", b"fallback", "image/jpeg"),
+    ]
+    assert {
+        call.kwargs["ExtraArgs"]["CacheControl"] for call in s3_client.upload_fileobj.await_args_list
+    } == {settings.IMAGE_CACHE_CONTROL}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_upload_file_touches_stored_content(monkeypatch):
+    monkeypatch.setattr(
+        "repositories.minio_s3_repository.image_processing_executor",
+        MagicMock(render=AsyncMock(return_value=(b"fallback", {"list": b"list"}))),
+    )
+    s3_client = AsyncMock()
+    file = MagicMock(
+        filename="cover.png", content_type="image/png", read=AsyncMock(return_value=b"original")
+    )
+
+    filename = await MinioS3Repository(s3_client).upload_file(bucket_name="Test_bucket", file=file)
+
+    assert filename == f"{hashlib.sha256(b'fallback').hexdigest()}.png"
+    # Copied onto itself, so the sweep keeps it until the new reference to it has committed
+    s3_client.copy_object.assert_awaited_once_with(
+        Bucket="Test_bucket",
+        Key=filename,
+        CopySource={"Bucket": "Test_bucket", "Key": filename},
+        MetadataDirective="REPLACE",
+        ContentType="image/png",
+        CacheControl=settings.IMAGE_CACHE_CONTROL,
+    )
+    s3_client.upload_fileobj.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_upload_file_rejects_invalid_image(monkeypatch):
+    monkeypatch.setattr(
+        "repositories.minio_s3_repository.image_processing_executor",
+        MagicMock(render=AsyncMock(side_effect=InvalidImageError("Invalid image file"))),
+    )
+    s3_client = AsyncMock()
+    file = MagicMock(filename="test.png", content_type="image/png", read=AsyncMock(return_value=b"broken"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await MinioS3Repository(s3_client).upload_file(bucket_name="Test_bucket", file=file)
+
+    assert exc_info.value.status_code == 400
+    s3_client.upload_fileobj.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_delete_file_deletes_renditions():
+    s3_client = AsyncMock()
+
+    await MinioS3Repository(s3_client).delete_file(bucket_name="Test_bucket", filename="test.jpg")
+
+    objects = s3_client.delete_objects.await_args.kwargs["Delete"]["Objects"]
+    assert [entry["Key"] for entry in objects] == [
+        "test.jpg",
+        "test-list.webp",
+        "test-detail.webp",
+        "test-retina.webp",
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_create_upload_form_limits_size_and_type():
+    s3_client = AsyncMock()
+    s3_client.generate_presigned_post.return_value = {
+        "url": "http://minio:9000/Test_bucket",
+        "fields": {"key": "k"},
+    }
+
+    fields = await MinioS3Repository(s3_client).create_upload_form(
+        bucket_name="Test_bucket", key="staging/k", content_type="image/png"
+    )
+
+    assert fields == {"key": "k"}
+    conditions = s3_client.generate_presigned_post.await_args.kwargs["Conditions"]
+    assert ["content-length-range", 1, settings.IMAGE_MAX_UPLOAD_BYTES] in conditions
+    assert {"Content-Type": "image/png"} in conditions
+    # The form posting exactly the returned fields satisfies the policy
+    assert s3_client.generate_presigned_post.await_args.kwargs["Fields"] == {"Content-Type": "image/png"}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_upload_staged_file_stores_and_removes_the_staged_file(monkeypatch):
+    monkeypatch.setattr(
+        "repositories.minio_s3_repository.image_processing_executor",
+        MagicMock(render=AsyncMock(return_value=(b"fallback", {}))),
+    )
+    body = MagicMock(read=AsyncMock(return_value=b"original"))
+    body.__aenter__ = AsyncMock(return_value=body)
+    body.__aexit__ = AsyncMock(return_value=None)
+    s3_client = AsyncMock()
+    s3_client.get_object.return_value = {"Body": body, "ContentType": "image/png", "ContentLength": 8}
+    s3_client.copy_object.side_effect = ClientError({"Error": {"Code": "NoSuchKey"}}, "CopyObject")
+
+    filename = await MinioS3Repository(s3_client).upload_staged_file(
+        bucket_name="Test_bucket", key="staging/k", etag='"etag"'
+    )
+
+    assert filename == f"{hashlib.sha256(b'fallback').hexdigest()}.png"
+    s3_client.get_object.assert_awaited_once_with(Bucket="Test_bucket", Key="staging/k", IfMatch='"etag"')
+    assert s3_client.upload_fileobj.await_args.args[2] == filename
+    s3_client.delete_object.assert_awaited_once_with(Bucket="Test_bucket", Key="staging/k")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_check_staged_file_not_uploaded():
+    s3_client = AsyncMock()
+    s3_client.head_object.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await MinioS3Repository(s3_client).check_staged_file(bucket_name="Test_bucket", key="staging/k")
+
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_upload_staged_file_replaced_after_check():
+    s3_client = AsyncMock()
+    s3_client.get_object.side_effect = ClientError({"Error": {"Code": "PreconditionFailed"}}, "GetObject")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await MinioS3Repository(s3_client).upload_staged_file(
+            bucket_name="Test_bucket", key="staging/k", etag='"etag"'
+        )
+
+    assert exc_info.value.status_code == 409
+    s3_client.upload_fileobj.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_check_staged_file_too_large_is_not_downloaded():
+    s3_client = AsyncMock()
+    s3_client.head_object.return_value = {
+        "ContentType": "image/png",
+        "ContentLength": settings.IMAGE_MAX_UPLOAD_BYTES + 1,
+        "ETag": '"etag"',
+    }
+
+    with pytest.raises(HTTPException) as exc_info:
+        await MinioS3Repository(s3_client).check_staged_file(bucket_name="Test_bucket", key="staging/k")
+
+    assert exc_info.value.status_code == 400
+    s3_client.get_object.assert_not_awaited()
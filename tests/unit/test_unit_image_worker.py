@@ -0,0 +1,117 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from cli import image_worker
+from configs.settings import settings
+from exception_handlers.author_exc_handlers import AuthorDoesNotExist
+from schemas.upload_schemas import ImageEntity, ImageProcessingJobSchema
+
+JOB = ImageProcessingJobSchema(
+    entity=ImageEntity.author,
+    entity_id=1,
+    bucket_name=settings.MINIO_BUCKET_NAME_2,
+    key="staging/0123456789abcdef0123456789abcdef",
+    etag='"etag"',
+    username="test_user",
+)
+
+
+def make_message(body: bytes) -> MagicMock:
+    return MagicMock(body=body, ack=AsyncMock(), nack=AsyncMock(), reject=AsyncMock())
+
+
+@pytest.fixture
+def mock_session_factory(monkeypatch):
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=None)
+    monkeypatch.setattr(image_worker, "async_session_factory", MagicMock(return_value=session))
+    return session
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_handle_message_acks_processed_job(monkeypatch, mock_session_factory):
+    process_image_job = AsyncMock()
+    monkeypatch.setattr(image_worker, "process_image_job", process_image_job)
+    message = make_message(JOB.model_dump_json().encode())
+
+    await image_worker.handle_message(message=message, s3_client=AsyncMock(), redis=AsyncMock())
+
+    assert process_image_job.await_args.kwargs["job"] == JOB
+    message.ack.assert_awaited_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error",
+    [
+        HTTPException(status_code=400, detail="File is not a valid image"),
+        AuthorDoesNotExist(message="Author with id '1' does not exist"),
+    ],
+)
+async def test_handle_message_drops_job_that_cannot_succeed(monkeypatch, mock_session_factory, error):
+    monkeypatch.setattr(image_worker, "process_image_job", AsyncMock(side_effect=error))
+    message = make_message(JOB.model_dump_json().encode())
+
+    await image_worker.handle_message(message=message, s3_client=AsyncMock(), redis=AsyncMock())
+
+    message.reject.assert_awaited_once_with(requeue=False)
+    message.ack.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_handle_message_retries_failed_job(monkeypatch, mock_session_factory):
+    monkeypatch.setattr(
+        image_worker, "process_image_job", AsyncMock(side_effect=ConnectionError("S3 is down"))
+    )
+    message = make_message(JOB.model_dump_json().encode())
+
+    await image_worker.handle_message(message=message, s3_client=AsyncMock(), redis=AsyncMock())
+
+    message.nack.assert_awaited_once_with(requeue=True)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_handle_message_drops_malformed_job(mock_session_factory):
+    message = make_message(b"not a job")
+
+    await image_worker.handle_message(message=message, s3_client=AsyncMock(), redis=AsyncMock())
+
+    message.reject.assert_awaited_once_with(requeue=False)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_process_image_job_of_deleted_author_releases_the_image(monkeypatch):
+    file_url = f"{settings.MINIO_URL_TO_OPEN_FILE}/{settings.MINIO_BUCKET_NAME_2}/photo.jpg"
+    minio_s3_usecase = AsyncMock()
+    minio_s3_usecase.upload_staged_file_and_get_presigned_url.return_value = file_url
+    monkeypatch.setattr(image_worker, "MinioS3UseCase", MagicMock(return_value=minio_s3_usecase))
+    author_usecase = AsyncMock()
+    author_usecase.set_author_photo.side_effect = AuthorDoesNotExist(
+        message="Author with id '1' does not exist"
+    )
+    monkeypatch.setattr(image_worker, "AuthorUseCase", MagicMock(return_value=author_usecase))
+    queue_released_images = AsyncMock()
+    monkeypatch.setattr(image_worker, "queue_released_images", queue_released_images)
+    session = AsyncMock()
+    session.info = {}
+    mock_redis = AsyncMock()
+
+    with pytest.raises(AuthorDoesNotExist):
+        await image_worker.process_image_job(
+            job=JOB, session=session, s3_client=AsyncMock(), redis=mock_redis
+        )
+
+    minio_s3_usecase.upload_staged_file_and_get_presigned_url.assert_awaited_once_with(
+        bucket_name=JOB.bucket_name, key=JOB.key, etag=JOB.etag
+    )
+    queue_released_images.assert_awaited_once_with(
+        redis=mock_redis, released_images={settings.MINIO_BUCKET_NAME_2: {"photo.jpg"}}
+    )
@@ -1,10 +1,22 @@
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from botocore.exceptions import ClientError
-
-from exception_handlers.minio_s3_exc_handlers import S3OperationException
-from usecases.minio_s3_usecases import MinioS3UseCase
+from fastapi import HTTPException
+
+from configs.settings import settings
+from exception_handlers.minio_s3_exc_handlers import (
+    BucketS3DoesNotExist,
+    S3OperationException,
+)
+from schemas.upload_schemas import ImageContentType
+from usecases.image_sweep_usecases import ImageSweepUseCase
+from usecases.minio_s3_usecases import (
+    STAGING_KEY_PATTERN,
+    MinioS3UseCase,
+    provisioned_buckets,
+)
 
 
 @pytest.mark.unit
@@ -82,13 +94,13 @@ async def test_upload_file_and_get_presigned_url():
     file.filename = "test.jpg"
 
     mock_minio_repo = AsyncMock()
-    mock_minio_repo.upload_file.return_value = None
+    mock_minio_repo.upload_file.return_value = "5d41402abc4b2a76.jpg"
 
     minio_use_case = MinioS3UseCase(minio_s3_repository=mock_minio_repo)
 
     result = await minio_use_case.upload_file_and_get_presigned_url(bucket_name=bucket_name, file=file)
 
-    assert result == "http://localhost:9000/Test_bucket/test.jpg"
+    assert result == "http://localhost:9000/Test_bucket/5d41402abc4b2a76.jpg"
 
     mock_minio_repo.upload_file.assert_called_once_with(bucket_name=bucket_name, file=file)
 
@@ -144,3 +156,111 @@ async def test_delete_file_exception():
         await minio_use_case.delete_file(bucket_name=bucket_name, filename=filename)
 
     mock_minio_repo.delete_file.assert_called_once_with(bucket_name=bucket_name, filename=filename)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_provision_bucket_reaches_s3_once():
+    bucket_name = "Provisioned_bucket"
+    provisioned_buckets.discard(bucket_name)
+
+    mock_minio_repo = AsyncMock()
+    mock_minio_repo.ensure_bucket_exists.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadBucket")
+
+    minio_use_case = MinioS3UseCase(minio_s3_repository=mock_minio_repo)
+
+    await minio_use_case.provision_bucket(bucket_name=bucket_name)
+    await minio_use_case.provision_bucket(bucket_name=bucket_name)
+
+    mock_minio_repo.ensure_bucket_exists.assert_called_once_with(bucket_name=bucket_name)
+    mock_minio_repo.create_bucket.assert_called_once_with(bucket_name=bucket_name)
+    assert bucket_name in provisioned_buckets
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_delete_file_from_missing_bucket():
+    mock_minio_repo = AsyncMock()
+    mock_minio_repo.delete_file.side_effect = ClientError(
+        {"Error": {"Code": "NoSuchBucket"}}, "DeleteObject"
+    )
+
+    minio_use_case = MinioS3UseCase(minio_s3_repository=mock_minio_repo)
+
+    with pytest.raises(BucketS3DoesNotExist):
+        await minio_use_case.delete_file(bucket_name="Missing_bucket", filename="test.jpg")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_create_upload_form():
+    mock_minio_repo = AsyncMock()
+    mock_minio_repo.create_upload_form.return_value = {"key": "staging/x", "policy": "policy"}
+
+    minio_use_case = MinioS3UseCase(minio_s3_repository=mock_minio_repo)
+
+    result = await minio_use_case.create_upload_form(
+        bucket_name="Test_bucket", content_type=ImageContentType.png
+    )
+
+    assert result.url == "http://localhost:9000/Test_bucket"
+    assert result.fields == {"key": "staging/x", "policy": "policy"}
+    assert STAGING_KEY_PATTERN.fullmatch(result.key)
+    mock_minio_repo.create_upload_form.assert_called_once_with(
+        bucket_name="Test_bucket", key=result.key, content_type="image/png"
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key", ["staging/../books/cover.jpg", "cover.jpg", "staging/"])
+async def test_check_staged_file_rejects_other_keys(key):
+    mock_minio_repo = AsyncMock()
+
+    minio_use_case = MinioS3UseCase(minio_s3_repository=mock_minio_repo)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await minio_use_case.check_staged_file(bucket_name="Test_bucket", key=key)
+
+    assert exc_info.value.status_code == 400
+    mock_minio_repo.check_staged_file.assert_not_called()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sweep_deletes_only_unreferenced_stale_images():
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.IMAGE_RELEASE_GRACE_SECONDS + 60)
+    fresh = datetime.now(timezone.utc)
+    mock_author_repo = AsyncMock()
+    # Another author refers to referenced.jpg, reused.jpg was stored again by a concurrent upload
+    mock_author_repo.count_photo_references.side_effect = lambda filename: int(filename == "referenced.jpg")
+    mock_minio_repo = AsyncMock()
+    mock_minio_repo.get_file_last_modified.side_effect = lambda bucket_name, filename: {
+        "reused.jpg": fresh,
+        "released.jpg": stale,
+    }.get(filename)
+    mock_redis = AsyncMock()
+    mock_redis.zrangebyscore.side_effect = lambda key, *args: (
+        ["referenced.jpg", "reused.jpg", "released.jpg", "missing.jpg"]
+        if key == f"released_images:{settings.MINIO_BUCKET_NAME_2}"
+        else []
+    )
+    usecase = ImageSweepUseCase(
+        author_repository=mock_author_repo,
+        book_instance_repository=AsyncMock(),
+        minio_s3_repository=mock_minio_repo,
+        redis=mock_redis,
+    )
+
+    deleted = await usecase.sweep()
+
+    assert deleted == 1
+    mock_minio_repo.delete_file.assert_awaited_once_with(
+        bucket_name=settings.MINIO_BUCKET_NAME_2, filename="released.jpg"
+    )
+    # The reused image stays queued for the next sweep
+    assert {call.args[1] for call in mock_redis.zrem.await_args_list} == {
+        "referenced.jpg",
+        "released.jpg",
+        "missing.jpg",
+    }
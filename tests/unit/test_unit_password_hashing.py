@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+import pytest
+
+from configs.password_hashing import PasswordHashingExecutor
+from dependencies.auth_dependencies import get_password_hash, verify_password
+from exception_handlers.auth_exc_handlers import PasswordHashingOverloaded
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_password_hash_round_trip():
+    hashed_password = await get_password_hash(password="test_password")
+
+    assert await verify_password(plain_password="test_password", hashed_password=hashed_password)
+    assert not await verify_password(plain_password="wrong_password", hashed_password=hashed_password)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_executor_runs_off_the_event_loop():
+    executor = PasswordHashingExecutor(max_workers=1, queue_size=0)
+
+    thread_name = await executor.run(lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("password-hashing")
+    assert executor.pending == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_saturated_executor_rejects_new_hashes():
+    executor = PasswordHashingExecutor(max_workers=1, queue_size=1)
+    release = threading.Event()
+
+    running = [asyncio.create_task(executor.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHashingOverloaded):
+        await executor.run(release.wait)
+
+    release.set()
+    await asyncio.gather(*running)
+
+    assert executor.rejected == 1
+    assert executor.pending == 0
@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aio_pika.pool import Pool
+from fastapi import HTTPException
+
+from brokers.rabbitmq import RabbitMQPublisher, send_message_to_rabbitmq
+
+
+def make_publisher(channel: MagicMock) -> RabbitMQPublisher:
+    publisher = RabbitMQPublisher()
+    publisher.connection = MagicMock(is_closed=False)
+    publisher.open_channel = AsyncMock(return_value=channel)
+    publisher.channel_pool = Pool(publisher.open_channel, max_size=2)
+    return publisher
+
+
+def make_channel() -> MagicMock:
+    channel = MagicMock(is_closed=False)
+    channel.default_exchange.publish = AsyncMock()
+    return channel
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_publish_batch_reuses_one_channel():
+    channel = make_channel()
+    publisher = make_publisher(channel)
+
+    await publisher.publish_batch(messages=["first", "second"], queue_name="reset-password")
+    await publisher.publish(message="third", queue_name="reset-password")
+
+    assert channel.default_exchange.publish.await_count == 3
+    publisher.open_channel.assert_awaited_once()
+    assert publisher.statistics()["published"] == 3
+    assert publisher.statistics()["in_flight"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_publish_counts_in_flight_messages():
+    channel = make_channel()
+    confirmed = asyncio.Event()
+
+    async def wait_for_confirm(*args, **kwargs):
+        await confirmed.wait()
+
+    channel.default_exchange.publish.side_effect = wait_for_confirm
+    publisher = make_publisher(channel)
+
+    publishing = asyncio.create_task(
+        publisher.publish_batch(messages=["first", "second"], queue_name="reset-password")
+    )
+    await asyncio.sleep(0)
+
+    assert publisher.statistics()["in_flight"] == 2
+
+    confirmed.set()
+    await publishing
+
+    assert publisher.statistics()["in_flight"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_send_message_failure_is_counted():
+    channel = make_channel()
+    channel.default_exchange.publish.side_effect = TimeoutError("No confirm from the broker")
+    publisher = make_publisher(channel)
+
+    with pytest.raises(HTTPException):
+        await send_message_to_rabbitmq(message="message", queue_name="reset-password", publisher=publisher)
+
+    assert publisher.statistics()["failed"] == 1
+    assert publisher.statistics()["published"] == 0
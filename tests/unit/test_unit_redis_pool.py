@@ -0,0 +1,50 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from starlette.requests import Request
+
+import main
+from configs.settings import settings
+from dependencies.minio_s3_dependency import get_minio_s3_client
+from dependencies.redis_dependency import get_redis_connection
+from main import app, lifespan
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_lifespan_shares_one_redis_pool(monkeypatch):
+    monkeypatch.setattr(main, "RabbitMQPublisher", MagicMock(return_value=AsyncMock()))
+    monkeypatch.setattr(main, "provision_minio_s3_buckets", AsyncMock())
+
+    # Nothing below sends a command, so the pool never connects
+    async with lifespan(app):
+        pool = app.state.redis_pool
+        request = Request({"type": "http", "method": "GET", "headers": [], "app": app})
+
+        first_client = await get_redis_connection(request)
+        second_client = await get_redis_connection(request)
+
+        assert first_client.connection_pool is pool
+        assert second_client.connection_pool is pool
+        assert pool.max_connections == settings.REDIS_MAX_CONNECTIONS
+        assert pool.connection_kwargs["health_check_interval"] == settings.REDIS_HEALTH_CHECK_INTERVAL
+
+    assert pool._in_use_connections == set()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_lifespan_shares_one_minio_s3_client(monkeypatch):
+    provision_minio_s3_buckets = AsyncMock()
+    monkeypatch.setattr(main, "RabbitMQPublisher", MagicMock(return_value=AsyncMock()))
+    monkeypatch.setattr(main, "provision_minio_s3_buckets", provision_minio_s3_buckets)
+
+    # Creating the client does not reach MinIO
+    async with lifespan(app):
+        request = Request({"type": "http", "method": "GET", "headers": [], "app": app})
+
+        first_client = await get_minio_s3_client(request)
+        second_client = await get_minio_s3_client(request)
+
+        assert first_client is second_client
+        provision_minio_s3_buckets.assert_awaited_once_with(first_client)
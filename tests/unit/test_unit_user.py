@@ -1,5 +1,5 @@
 from datetime import datetime
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from sqlalchemy.exc import SQLAlchemyError
@@ -234,6 +234,26 @@ async def test_update_user_by_admin(unit_test_user_2_in_db):
     mock_user_repo.update_user_by_admin.assert_awaited_once()
 
 
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_update_user_by_admin_invalidates_user_cache(unit_test_user_2_in_db):
+    updated_data = UserAdminUpdateSchema(is_blocked=True)
+    current_user = AsyncMock()
+    current_user.role = "admin"
+
+    mock_user_repo = AsyncMock()
+    mock_user_repo.get_user_by_id.return_value = User(**unit_test_user_2_in_db)
+    mock_user_cache_repo = MagicMock()
+
+    user_use_case = UserUseCase(user_repository=mock_user_repo, user_cache_repository=mock_user_cache_repo)
+
+    await user_use_case.update_user_by_admin(
+        user_id=unit_test_user_2_in_db["id"], updated_data=updated_data, current_user=current_user
+    )
+
+    mock_user_cache_repo.invalidate.assert_called_once_with(user_ids=[unit_test_user_2_in_db["id"]])
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_update_user_by_admin_no_permission(unit_test_user_in_db):
@@ -0,0 +1,152 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from configs.settings import settings
+from dependencies import auth_dependencies
+from dependencies.auth_dependencies import create_access_token, get_current_user
+from models import User
+from repositories.user_cache_repository import (
+    SET_USER_UNLESS_FENCED_SCRIPT,
+    LocalUserCache,
+    UserCacheRepository,
+    apply_user_cache_invalidations,
+    local_user_cache,
+)
+from schemas.user_schemas import UserReadSchema
+
+
+@pytest.fixture(autouse=True)
+def clear_local_user_cache():
+    local_user_cache.clear()
+    yield
+    local_user_cache.clear()
+
+
+def make_user(user_in_db: dict) -> User:
+    return User(**user_in_db, created_at=datetime.now(), updated_at=datetime.now())
+
+
+def make_session() -> MagicMock:
+    session = MagicMock()
+    session.info = {}
+    return session
+
+
+def make_redis() -> AsyncMock:
+    """Redis mock whose user cache writes are refused while the user is fenced."""
+    redis = AsyncMock()
+    redis.get.return_value = None
+    fences = set()
+    pipeline = MagicMock(execute=AsyncMock(return_value=[]))
+    pipeline.set.side_effect = lambda key, *args, **kwargs: fences.add(key)
+    redis.pipeline = MagicMock(return_value=pipeline)
+
+    async def set_user_unless_fenced(script, numkeys, key, fence, payload, ttl):
+        return 0 if fence in fences else 1
+
+    redis.eval.side_effect = set_user_unless_fenced
+    return redis
+
+
+@pytest.mark.unit
+def test_local_user_cache_evicts_least_recently_used(unit_test_user_in_db, unit_test_user_2_in_db):
+    cache = LocalUserCache(max_size=1, ttl=60)
+    user = UserReadSchema(**unit_test_user_in_db)
+    user_2 = UserReadSchema(**unit_test_user_2_in_db)
+
+    cache.set(user)
+    cache.set(user_2)
+
+    assert cache.get(user.id) is None
+    assert cache.get(user_2.id) is user_2
+
+
+@pytest.mark.unit
+def test_local_user_cache_expires_entries(unit_test_user_in_db):
+    cache = LocalUserCache(max_size=10, ttl=0)
+    user = UserReadSchema(**unit_test_user_in_db)
+
+    cache.set(user)
+
+    assert cache.get(user.id) is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_current_user_from_cache(monkeypatch, unit_test_user_in_db):
+    mock_get_user = AsyncMock(return_value=make_user(unit_test_user_in_db))
+    monkeypatch.setattr(auth_dependencies, "get_user", mock_get_user)
+    mock_redis = make_redis()
+    token = create_access_token(data={"sub": unit_test_user_in_db["username"], "id": "1", "role": "admin"})
+
+    first_user = await get_current_user(token=token, db=make_session(), redis=mock_redis)
+    second_user = await get_current_user(token=token, db=make_session(), redis=mock_redis)
+
+    assert second_user == first_user
+    mock_get_user.assert_awaited_once()
+    mock_redis.eval.assert_awaited_once_with(
+        SET_USER_UNLESS_FENCED_SCRIPT,
+        2,
+        "user:1",
+        "user:1:fence",
+        first_user.model_dump_json(),
+        settings.USER_CACHE_TTL_SECONDS,
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_current_user_after_invalidation(monkeypatch, unit_test_user_in_db):
+    mock_get_user = AsyncMock(return_value=make_user(unit_test_user_in_db))
+    monkeypatch.setattr(auth_dependencies, "get_user", mock_get_user)
+    mock_redis = make_redis()
+    token = create_access_token(data={"sub": unit_test_user_in_db["username"], "id": "1", "role": "admin"})
+
+    await get_current_user(token=token, db=make_session(), redis=mock_redis)
+    await apply_user_cache_invalidations(redis=mock_redis, user_ids={1})
+    await get_current_user(token=token, db=make_session(), redis=mock_redis)
+
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.set.assert_called_once_with("user:1:fence", 1, ex=settings.USER_CACHE_FENCE_SECONDS)
+    pipeline.delete.assert_called_once_with("user:1")
+    assert mock_get_user.await_count == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_current_user_loaded_before_invalidation_is_not_cached(monkeypatch, unit_test_user_in_db):
+    mock_redis = make_redis()
+    stale_user = make_user(unit_test_user_in_db)
+
+    async def get_user_blocked_meanwhile(username, db):
+        # The user is blocked and the cache invalidated while this request loads the old row
+        await apply_user_cache_invalidations(redis=mock_redis, user_ids={1})
+        return stale_user
+
+    monkeypatch.setattr(auth_dependencies, "get_user", get_user_blocked_meanwhile)
+    token = create_access_token(data={"sub": unit_test_user_in_db["username"], "id": "1", "role": "admin"})
+
+    user = await get_current_user(token=token, db=make_session(), redis=mock_redis)
+
+    assert user.id == 1
+    mock_redis.eval.assert_awaited_once()
+    assert local_user_cache.get(1) is None
+    assert await UserCacheRepository(mock_redis, make_session()).get_user(user_id=1) is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_current_user_token_of_renamed_user(monkeypatch, unit_test_user_in_db):
+    # The cached user was renamed after the token had been issued
+    renamed_user = UserReadSchema(**unit_test_user_in_db).model_copy(update={"username": "renamed_user"})
+    local_user_cache.set(renamed_user)
+    mock_get_user = AsyncMock(return_value=None)
+    monkeypatch.setattr(auth_dependencies, "get_user", mock_get_user)
+    token = create_access_token(data={"sub": unit_test_user_in_db["username"], "id": "1", "role": "admin"})
+
+    with pytest.raises(auth_dependencies.HTTPException):
+        await get_current_user(token=token, db=make_session(), redis=AsyncMock())
+
+    mock_get_user.assert_awaited_once()
@@ -13,7 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from starlette.responses import HTMLResponse
 
-from brokers.rabbitmq import send_message_to_rabbitmq
+from brokers.rabbitmq import RabbitMQPublisher, send_message_to_rabbitmq
 from brokers.redis import add_refresh_token_to_blacklist, is_refresh_token_blacklisted
 from configs.logger import logger
 from configs.settings import settings
@@ -43,8 +43,9 @@ from schemas.user_schemas import UserCreateSchema
 
 
 class AuthUseCase:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository, rabbitmq_publisher: RabbitMQPublisher | None = None):
         self.user_repository = user_repository
+        self.rabbitmq_publisher = rabbitmq_publisher
 
     async def create_user(self, user_data: UserCreateSchema):
         try:
@@ -56,7 +57,7 @@ class AuthUseCase:
             if existing_email:
                 raise UserAlreadyExists(message=f"User with email '{user_data.email}' already exists")
 
-            hashed_password = get_password_hash(password=user_data.password)
+            hashed_password = await get_password_hash(password=user_data.password)
             user_data.password = hashed_password
 
             new_user = User(**user_data.model_dump())
@@ -161,7 +162,9 @@ class AuthUseCase:
 
             message = json.dumps(message_payload)
             await send_message_to_rabbitmq(
-                message=message, queue_name=settings.RABBITMQ_RESET_PASSWORD_QUEUE
+                message=message,
+                queue_name=settings.RABBITMQ_RESET_PASSWORD_QUEUE,
+                publisher=self.rabbitmq_publisher,
             )
 
             return {"reset_token": reset_token, "message": "Request for password reset link has been sent"}
@@ -221,7 +224,7 @@ class AuthUseCase:
             if not user_to_update:
                 raise UserDoesNotExist(message=f"User with email '{email}' does not exist")
 
-            new_hashed_password = get_password_hash(new_credentials.new_password)
+            new_hashed_password = await get_password_hash(new_credentials.new_password)
 
             user_to_update.password = new_hashed_password
             user_to_update.updated_at = func.now()
@@ -1,41 +1,71 @@
+from typing import List
+
 from fastapi import UploadFile
 from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 
+from brokers.rabbitmq import RabbitMQPublisher, send_message_to_rabbitmq
 from configs.logger import logger
 from configs.settings import settings
 from exception_handlers.author_exc_handlers import (
     AuthorAlreadyExists,
     AuthorDoesNotExist,
 )
-from exception_handlers.minio_s3_exc_handlers import BucketS3DoesNotExist
 from models import Author
 from repositories.author_repository import AuthorRepository
+from repositories.detail_cache_repository import (
+    DetailCacheEntity,
+    DetailCacheRepository,
+)
 from schemas.author_schemas import (
     AuthorCreateSchema,
     AuthorListQueryParams,
+    AuthorLoadProfile,
+    AuthorSuggestQueryParams,
     AuthorUpdateSchema,
 )
+from schemas.common_circular_schemas import AuthorWithBooksReadSchema
+from schemas.upload_schemas import (
+    ImageContentType,
+    ImageEntity,
+    ImageProcessingJobSchema,
+    ImageUploadAcceptedSchema,
+    ImageUploadFinalizeSchema,
+)
 from usecases.minio_s3_usecases import MinioS3UseCase
 
 
 class AuthorUseCase:
-    def __init__(self, author_repository: AuthorRepository, minio_s3_usecase: MinioS3UseCase):
+    def __init__(
+        self,
+        author_repository: AuthorRepository,
+        minio_s3_usecase: MinioS3UseCase,
+        detail_cache_repository: DetailCacheRepository | None = None,
+        rabbitmq_publisher: RabbitMQPublisher | None = None,
+    ):
         self.author_repository = author_repository
         self.minio_s3_usecase = minio_s3_usecase
+        self.detail_cache_repository = detail_cache_repository
+        self.rabbitmq_publisher = rabbitmq_publisher
 
     async def create_new_author(
         self,
         new_author: AuthorCreateSchema,
         file: UploadFile | None,
         username: str,
+        check_existing: bool = True,
     ):
         try:
             new_authors_surname = new_author.surname.capitalize()
             new_authors_name = new_author.name.capitalize()
-            existing_author = await self.author_repository.get_author_by_surname_and_name(
-                surname=new_authors_surname, name=new_authors_name
-            )
+
+            # Callers that have just looked the author up skip the second lookup
+            if check_existing:
+                existing_author = await self.author_repository.get_author_by_surname_and_name(
+                    surname=new_authors_surname, name=new_authors_name
+                )
+            else:
+                existing_author = None
 
             if existing_author:
                 raise AuthorAlreadyExists(
@@ -44,10 +74,7 @@ class AuthorUseCase:
 
             if file and file.filename != "":
                 authors_bucket = settings.MINIO_BUCKET_NAME_2
-                bucket = await self.minio_s3_usecase.ensure_bucket_exists(bucket_name=authors_bucket)
-
-                if not bucket:
-                    await self.minio_s3_usecase.create_bucket(bucket_name=authors_bucket)
+                await self.minio_s3_usecase.provision_bucket(bucket_name=authors_bucket)
 
                 file_url = await self.minio_s3_usecase.upload_file_and_get_presigned_url(
                     bucket_name=authors_bucket, file=file
@@ -68,13 +95,36 @@ class AuthorUseCase:
             logger.error(str(exc))
             raise
 
-    async def get_author_by_id(self, author_id: int):
+    async def get_author_by_id(
+        self, author_id: int, load_profile: AuthorLoadProfile = AuthorLoadProfile.card
+    ):
         try:
-            author = await self.author_repository.get_author_by_id(author_id=author_id)
+            use_cache = self.detail_cache_repository and load_profile == AuthorLoadProfile.with_books
+
+            if use_cache:
+                cached_author = await self.detail_cache_repository.get_detail(
+                    entity=DetailCacheEntity.author, entity_id=author_id, schema=AuthorWithBooksReadSchema
+                )
+
+                if cached_author:
+                    return cached_author
+
+            author = await self.author_repository.get_author_by_id(
+                author_id=author_id, load_profile=load_profile
+            )
 
             if not author:
                 raise AuthorDoesNotExist(message=f"Author with id '{author_id}' does not exist")
 
+            if use_cache:
+                author = AuthorWithBooksReadSchema.model_validate(author)
+                await self.detail_cache_repository.set_detail(
+                    entity=DetailCacheEntity.author,
+                    entity_id=author_id,
+                    detail=author,
+                    dependencies={DetailCacheEntity.book: [book.id for book in author.books]},
+                )
+
             return author
 
         except SQLAlchemyError as exc:
@@ -84,6 +134,21 @@ class AuthorUseCase:
             logger.error(str(exc))
             raise
 
+    async def check_authors_exist(self, author_ids: List[int]):
+        try:
+            existing_ids = await self.author_repository.get_existing_author_ids(author_ids=author_ids)
+            missing_ids = sorted(set(author_ids) - existing_ids)
+
+            if missing_ids:
+                raise AuthorDoesNotExist(message=f"Authors with ids {missing_ids} do not exist")
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to check authors by ids: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
     async def get_author_by_surname_and_name(self, surname: str, name: str | None):
         try:
             author = await self.author_repository.get_author_by_surname_and_name(surname=surname, name=name)
@@ -100,6 +165,28 @@ class AuthorUseCase:
             logger.error(str(exc))
             raise
 
+    async def get_similar_author(self, surname: str, name: str):
+        try:
+            return await self.author_repository.get_similar_author(surname=surname, name=name)
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to fetch similar author: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
+    async def suggest_authors(self, request_payload: AuthorSuggestQueryParams):
+        try:
+            return await self.author_repository.suggest_authors(request_payload=request_payload)
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to suggest authors: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
     async def get_all_authors(self, request_payload: AuthorListQueryParams):
         try:
             return await self.author_repository.get_all_authors(request_payload=request_payload)
@@ -132,32 +219,26 @@ class AuthorUseCase:
 
             if file and file.filename != "":
                 authors_bucket = settings.MINIO_BUCKET_NAME_2
-
-                if author_to_update.photo_s3_url:
-                    bucket = await self.minio_s3_usecase.ensure_bucket_exists(bucket_name=authors_bucket)
-
-                    if not bucket:
-                        raise BucketS3DoesNotExist()
-
-                    await self.minio_s3_usecase.delete_file(
-                        bucket_name=authors_bucket, filename=author_to_update.photo_s3_url.split("/")[-1]
-                    )
-
-                bucket = await self.minio_s3_usecase.ensure_bucket_exists(bucket_name=authors_bucket)
-
-                if not bucket:
-                    await self.minio_s3_usecase.create_bucket(bucket_name=authors_bucket)
+                await self.minio_s3_usecase.provision_bucket(bucket_name=authors_bucket)
 
                 file_url = await self.minio_s3_usecase.upload_file_and_get_presigned_url(
                     bucket_name=authors_bucket, file=file
                 )
                 update_data_dict["photo_s3_url"] = file_url
 
+                if author_to_update.photo_s3_url and author_to_update.photo_s3_url != file_url:
+                    self.author_repository.release_photo(photo_s3_url=author_to_update.photo_s3_url)
+
             for key, value in update_data_dict.items():
                 setattr(author_to_update, key, value)
 
             author_to_update.updated_at = func.now()
 
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.author, entity_ids=[author_id]
+                )
+
             return await self.author_repository.update_author(author_to_update=author_to_update)
 
         except SQLAlchemyError as exc:
@@ -167,6 +248,81 @@ class AuthorUseCase:
             logger.error(str(exc))
             raise
 
+    async def create_photo_upload_form(self, content_type: ImageContentType):
+        try:
+            authors_bucket = settings.MINIO_BUCKET_NAME_2
+            await self.minio_s3_usecase.provision_bucket(bucket_name=authors_bucket)
+
+            return await self.minio_s3_usecase.create_upload_form(
+                bucket_name=authors_bucket, content_type=content_type
+            )
+
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
+    async def finalize_author_photo(self, author_id: int, upload: ImageUploadFinalizeSchema, username: str):
+        try:
+            author = await self.author_repository.get_author_by_id(author_id=author_id)
+
+            if not author:
+                raise AuthorDoesNotExist(message=f"Author with id '{author_id}' does not exist")
+
+            # Only the metadata of the photo is checked here, the image worker downloads and processes it
+            etag = await self.minio_s3_usecase.check_staged_file(
+                bucket_name=settings.MINIO_BUCKET_NAME_2, key=upload.key
+            )
+            job = ImageProcessingJobSchema(
+                entity=ImageEntity.author,
+                entity_id=author_id,
+                bucket_name=settings.MINIO_BUCKET_NAME_2,
+                key=upload.key,
+                etag=etag,
+                username=username,
+            )
+            await send_message_to_rabbitmq(
+                message=job.model_dump_json(),
+                queue_name=settings.RABBITMQ_IMAGE_PROCESSING_QUEUE,
+                publisher=self.rabbitmq_publisher,
+            )
+
+            return ImageUploadAcceptedSchema(key=upload.key, message="Author's photo is being processed")
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to finalize author's photo: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
+    async def set_author_photo(self, author_id: int, file_url: str, username: str):
+        try:
+            author_to_update = await self.author_repository.get_author_by_id(author_id=author_id)
+
+            if not author_to_update:
+                raise AuthorDoesNotExist(message=f"Author with id '{author_id}' does not exist")
+
+            if author_to_update.photo_s3_url and author_to_update.photo_s3_url != file_url:
+                self.author_repository.release_photo(photo_s3_url=author_to_update.photo_s3_url)
+
+            author_to_update.photo_s3_url = file_url
+            author_to_update.updated_by = username
+            author_to_update.updated_at = func.now()
+
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.author, entity_ids=[author_id]
+                )
+
+            return await self.author_repository.update_author(author_to_update=author_to_update)
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to update author's photo: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
     async def delete_author(self, author_id: int):
         try:
             author_to_delete = await self.author_repository.get_author_by_id(author_id=author_id)
@@ -175,14 +331,11 @@ class AuthorUseCase:
                 raise AuthorDoesNotExist(message=f"Author with id '{author_id}' does not exist")
 
             if author_to_delete.photo_s3_url:
-                authors_bucket = settings.MINIO_BUCKET_NAME_2
-                bucket = await self.minio_s3_usecase.ensure_bucket_exists(bucket_name=authors_bucket)
-
-                if not bucket:
-                    raise BucketS3DoesNotExist()
+                self.author_repository.release_photo(photo_s3_url=author_to_delete.photo_s3_url)
 
-                await self.minio_s3_usecase.delete_file(
-                    bucket_name=authors_bucket, filename=author_to_delete.photo_s3_url.split("/")[-1]
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.author, entity_ids=[author_id]
                 )
 
             return await self.author_repository.delete_author(author_to_delete=author_to_delete)
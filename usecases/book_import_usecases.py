@@ -0,0 +1,241 @@
+import codecs
+import csv
+import json
+import re
+from typing import AsyncIterator
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+
+from configs.logger import logger
+from repositories.book_import_repository import BookImportRepository
+from repositories.detail_cache_repository import (
+    DetailCacheEntity,
+    DetailCacheRepository,
+)
+from schemas.book_schemas import (
+    BookImportFormat,
+    BookImportReportSchema,
+    BookImportRowErrorSchema,
+    BookWithAuthorsGenresCreateSchema,
+)
+
+COPY_BATCH_SIZE = 5000
+READ_CHUNK_SIZE = 64 * 1024
+# A record with a quoted field never closed would otherwise collect the rest of the file
+MAX_CSV_RECORD_SIZE = 1024 * 1024
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+async def iter_upload_lines(file: UploadFile) -> AsyncIterator[str]:
+    """
+    Yields the lines of an uploaded file without reading it into memory at once.
+
+    Lines end only at LF, CRLF or CR, as in a file opened with newline="" (cli.import_books),
+    so e.g. U+2028 or a form feed inside a field does not split a record.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+
+    while chunk := await file.read(READ_CHUNK_SIZE):
+        text = tail + decoder.decode(chunk)
+        start = 0
+
+        for line_break in LINE_BREAK.finditer(text):
+            # A "\r" ending the chunk may be the first half of a "\r\n"
+            if line_break.group() == "\r" and line_break.end() == len(text):
+                break
+
+            yield text[start : line_break.end()]
+            start = line_break.end()
+
+        tail = text[start:]
+
+    tail += decoder.decode(b"", final=True)
+    start = 0
+
+    for line_break in LINE_BREAK.finditer(tail):
+        yield tail[start : line_break.end()]
+        start = line_break.end()
+
+    if tail[start:]:
+        yield tail[start:]
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, list[str] | str]]:
+    """
+    Yields the records of a CSV stream with the number of the line each one starts on.
+
+    A quoted field may contain line breaks (RFC 4180), so the lines are collected until
+    the record they start is complete and only then parsed together.
+    """
+    record_lines = []
+    record_size = 0
+    line_number = 0
+    start_line_number = 0
+
+    async for line in lines:
+        line_number += 1
+
+        if not record_lines:
+            if not line.strip():
+                continue
+
+            start_line_number = line_number
+
+        record_lines.append(line)
+        record_size += len(line)
+
+        try:
+            # The strict reader tells an unterminated quoted field apart from a complete record
+            next(csv.reader(record_lines, strict=True))
+        except csv.Error as exc:
+            if str(exc) == "unexpected end of data":
+                if record_size <= MAX_CSV_RECORD_SIZE:
+                    continue
+
+                yield start_line_number, "Quoted field is not terminated"
+                record_lines, record_size = [], 0
+                continue
+
+        # Parsed leniently as before, e.g. a stray quote inside an unquoted field is kept as is
+        yield start_line_number, next(csv.reader(record_lines))
+        record_lines, record_size = [], 0
+
+    if record_lines:
+        yield start_line_number, "Quoted field is not terminated"
+
+
+async def _iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | str]]:
+    header = None
+
+    async for line_number, values in iter_csv_records(lines):
+        if header is None:
+            header = values
+            continue
+
+        if isinstance(values, str):
+            yield line_number, values
+        elif len(values) != len(header):
+            yield line_number, f"Expected {len(header)} columns, got {len(values)}"
+        else:
+            yield line_number, {key: value for key, value in zip(header, values) if value != ""}
+
+
+async def _iter_jsonl_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | str]]:
+    line_number = 0
+
+    async for line in lines:
+        line_number += 1
+
+        if line.strip():
+            yield line_number, _parse_jsonl_line(line=line)
+
+
+def _parse_jsonl_line(line: str) -> dict | str:
+    try:
+        row = json.loads(line)
+    except json.JSONDecodeError:
+        return "Invalid JSON"
+
+    return row if isinstance(row, dict) else "Row must be a JSON object"
+
+
+def _to_staging_record(row_number: int, row: BookWithAuthorsGenresCreateSchema) -> tuple:
+    return (
+        row_number,
+        row.title_rus.capitalize(),
+        row.title_origin.title() if row.title_origin else None,
+        row.quantity,
+        row.available_for_loan,
+        row.authors_name.capitalize(),
+        row.authors_surname.capitalize(),
+        row.authors_nationality,
+        row.genre_name.capitalize(),
+    )
+
+
+class BookImportUseCase:
+    def __init__(
+        self, book_import_repository: BookImportRepository, detail_cache_repository: DetailCacheRepository
+    ):
+        self.book_import_repository = book_import_repository
+        self.detail_cache_repository = detail_cache_repository
+
+    async def import_books(
+        self, lines: AsyncIterator[str], file_format: BookImportFormat, username: str
+    ) -> BookImportReportSchema:
+        """
+        Imports books with their authors and genres from CSV (with a header row) or JSON Lines.
+
+        Rows are validated one by one and copied to a staging table in batches, then merged
+        into the catalog in a single transaction. Invalid, duplicate and already existing
+        books are skipped and listed in the report by their line number in the file.
+        """
+        try:
+            report = BookImportReportSchema()
+            errors = {}
+            batch = []
+
+            await self.book_import_repository.create_staging_table()
+
+            if file_format == BookImportFormat.csv:
+                rows = _iter_csv_rows(lines)
+            else:
+                rows = _iter_jsonl_rows(lines)
+
+            async for line_number, parsed_row in rows:
+                report.total_rows += 1
+
+                if isinstance(parsed_row, str):
+                    errors[line_number] = [parsed_row]
+                    continue
+
+                try:
+                    row = BookWithAuthorsGenresCreateSchema.model_validate(parsed_row)
+                except ValidationError as exc:
+                    errors[line_number] = [
+                        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                        for error in exc.errors()
+                    ]
+                    continue
+
+                batch.append(_to_staging_record(row_number=line_number, row=row))
+
+                if len(batch) >= COPY_BATCH_SIZE:
+                    await self.book_import_repository.copy_rows_to_staging(rows=batch)
+                    batch = []
+
+            if batch:
+                await self.book_import_repository.copy_rows_to_staging(rows=batch)
+
+            result = await self.book_import_repository.import_staged_books(username=username)
+
+            # The cached details of the authors and genres list their books
+            self.detail_cache_repository.invalidate(
+                entity=DetailCacheEntity.author, entity_ids=result["author_ids"]
+            )
+            self.detail_cache_repository.invalidate(
+                entity=DetailCacheEntity.genre, entity_ids=result["genre_ids"]
+            )
+
+            for row_number, message in result["rejected_rows"].items():
+                errors[row_number] = [message]
+
+            report.imported_books = result["imported_books"]
+            report.created_authors = result["created_authors"]
+            report.created_genres = result["created_genres"]
+            report.errors = [
+                BookImportRowErrorSchema(row=row_number, errors=errors[row_number])
+                for row_number in sorted(errors)
+            ]
+
+            return report
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to import books: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
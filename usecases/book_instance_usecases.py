@@ -2,13 +2,28 @@ from fastapi import UploadFile
 from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 
+from brokers.rabbitmq import RabbitMQPublisher, send_message_to_rabbitmq
 from configs.logger import logger
 from configs.settings import settings
 from exception_handlers.book_exc_handlers import BookDoesNotExist
-from exception_handlers.minio_s3_exc_handlers import BucketS3DoesNotExist
 from models import BookInstance
 from repositories.book_instance_repository import BookInstanceRepository
-from schemas.book_schemas import BookInstanceCreateSchema, BookInstanceUpdateSchema
+from repositories.detail_cache_repository import (
+    DetailCacheEntity,
+    DetailCacheRepository,
+)
+from schemas.book_schemas import (
+    BookInstanceCreateSchema,
+    BookInstanceLoadProfile,
+    BookInstanceUpdateSchema,
+)
+from schemas.upload_schemas import (
+    ImageContentType,
+    ImageEntity,
+    ImageProcessingJobSchema,
+    ImageUploadAcceptedSchema,
+    ImageUploadFinalizeSchema,
+)
 from usecases.book_usecases import BookUseCase
 from usecases.minio_s3_usecases import MinioS3UseCase
 
@@ -19,10 +34,14 @@ class BookInstanceUseCase:
         book_instance_repository: BookInstanceRepository,
         book_usecase: BookUseCase,
         minio_s3_usecase: MinioS3UseCase,
+        detail_cache_repository: DetailCacheRepository | None = None,
+        rabbitmq_publisher: RabbitMQPublisher | None = None,
     ):
         self.book_instance_repository = book_instance_repository
         self.book_usecase = book_usecase
         self.minio_s3_usecase = minio_s3_usecase
+        self.detail_cache_repository = detail_cache_repository
+        self.rabbitmq_publisher = rabbitmq_publisher
 
     async def create_new_book_instance(
         self,
@@ -36,10 +55,7 @@ class BookInstanceUseCase:
 
             if file and file.filename != "":
                 books_bucket = settings.MINIO_BUCKET_NAME_1
-                bucket = await self.minio_s3_usecase.ensure_bucket_exists(bucket_name=books_bucket)
-
-                if not bucket:
-                    await self.minio_s3_usecase.create_bucket(bucket_name=books_bucket)
+                await self.minio_s3_usecase.provision_bucket(bucket_name=books_bucket)
 
                 file_url = await self.minio_s3_usecase.upload_file_and_get_presigned_url(
                     bucket_name=books_bucket, file=file
@@ -51,8 +67,13 @@ class BookInstanceUseCase:
             new_book_instance.created_by = username
             new_book_instance = BookInstance(**new_book_instance.model_dump())
 
+            # The instance counters of the book change with its instances
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(entity=DetailCacheEntity.book, entity_ids=[book.id])
+
             return await self.book_instance_repository.create_new_book_instance(
-                book=book, new_book_instance=new_book_instance
+                new_book_instance=new_book_instance,
+                load_profile=BookInstanceLoadProfile.with_book,
             )
 
         except SQLAlchemyError as exc:
@@ -62,10 +83,12 @@ class BookInstanceUseCase:
             logger.error(str(exc))
             raise
 
-    async def get_book_instance_by_id(self, book_instance_id: int):
+    async def get_book_instance_by_id(
+        self, book_instance_id: int, load_profile: BookInstanceLoadProfile = BookInstanceLoadProfile.card
+    ):
         try:
             book_instance = await self.book_instance_repository.get_book_instance_by_id(
-                book_instance_id=book_instance_id
+                book_instance_id=book_instance_id, load_profile=load_profile
             )
 
             if not book_instance:
@@ -115,6 +138,7 @@ class BookInstanceUseCase:
 
             update_data_dict = book_item_to_update.model_dump(exclude_unset=True, exclude_none=True)
 
+            new_status = update_data_dict.pop("status", None)
             update_data_dict["updated_by"] = username
 
             if book_item_to_update.value:
@@ -122,37 +146,32 @@ class BookInstanceUseCase:
 
             if file and file.filename != "":
                 books_bucket = settings.MINIO_BUCKET_NAME_1
-
-                if book_instance_to_update.cover_s3_url:
-                    bucket = await self.minio_s3_usecase.ensure_bucket_exists(bucket_name=books_bucket)
-
-                    if not bucket:
-                        raise BucketS3DoesNotExist()
-
-                    await self.minio_s3_usecase.delete_file(
-                        bucket_name=books_bucket,
-                        filename=book_instance_to_update.cover_s3_url.split("/")[-1],
-                    )
-
-                bucket = await self.minio_s3_usecase.ensure_bucket_exists(bucket_name=books_bucket)
-
-                if not bucket:
-                    await self.minio_s3_usecase.create_bucket(bucket_name=books_bucket)
+                await self.minio_s3_usecase.provision_bucket(bucket_name=books_bucket)
 
                 file_url = await self.minio_s3_usecase.upload_file_and_get_presigned_url(
                     bucket_name=books_bucket, file=file
                 )
                 update_data_dict["cover_s3_url"] = file_url
 
+                if book_instance_to_update.cover_s3_url and book_instance_to_update.cover_s3_url != file_url:
+                    self.book_instance_repository.release_cover(
+                        cover_s3_url=book_instance_to_update.cover_s3_url
+                    )
+
             for key, value in update_data_dict.items():
                 setattr(book_instance_to_update, key, value)
 
             book_instance_to_update.updated_at = func.now()
 
-            book = await self.book_usecase.get_book_by_id(book_id=book_instance_to_update.book_id)
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.book, entity_ids=[book_instance_to_update.book_id]
+                )
 
             return await self.book_instance_repository.update_book_instance(
-                book=book, book_item_to_update=book_instance_to_update
+                book_item_to_update=book_instance_to_update,
+                new_status=new_status,
+                load_profile=BookInstanceLoadProfile.with_book,
             )
 
         except SQLAlchemyError as exc:
@@ -162,6 +181,93 @@ class BookInstanceUseCase:
             logger.error(str(exc))
             raise
 
+    async def create_cover_upload_form(self, content_type: ImageContentType):
+        try:
+            books_bucket = settings.MINIO_BUCKET_NAME_1
+            await self.minio_s3_usecase.provision_bucket(bucket_name=books_bucket)
+
+            return await self.minio_s3_usecase.create_upload_form(
+                bucket_name=books_bucket, content_type=content_type
+            )
+
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
+    async def finalize_book_instance_cover(
+        self, book_instance_id: int, upload: ImageUploadFinalizeSchema, username: str
+    ):
+        try:
+            book_instance = await self.book_instance_repository.get_book_instance_by_id(
+                book_instance_id=book_instance_id
+            )
+
+            if not book_instance:
+                raise BookDoesNotExist(message=f"Book item with id '{book_instance_id}' does not exist")
+
+            # Only the metadata of the cover is checked here, the image worker downloads and processes it
+            etag = await self.minio_s3_usecase.check_staged_file(
+                bucket_name=settings.MINIO_BUCKET_NAME_1, key=upload.key
+            )
+            job = ImageProcessingJobSchema(
+                entity=ImageEntity.book_instance,
+                entity_id=book_instance_id,
+                bucket_name=settings.MINIO_BUCKET_NAME_1,
+                key=upload.key,
+                etag=etag,
+                username=username,
+            )
+            await send_message_to_rabbitmq(
+                message=job.model_dump_json(),
+                queue_name=settings.RABBITMQ_IMAGE_PROCESSING_QUEUE,
+                publisher=self.rabbitmq_publisher,
+            )
+
+            return ImageUploadAcceptedSchema(key=upload.key, message="Book item's cover is being processed")
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to finalize book item's cover: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
+    async def set_book_instance_cover(self, book_instance_id: int, file_url: str, username: str):
+        try:
+            book_instance_to_update = await self.book_instance_repository.get_book_instance_by_id(
+                book_instance_id=book_instance_id
+            )
+
+            if not book_instance_to_update:
+                raise BookDoesNotExist(message=f"Book item with id '{book_instance_id}' does not exist")
+
+            if book_instance_to_update.cover_s3_url and book_instance_to_update.cover_s3_url != file_url:
+                self.book_instance_repository.release_cover(
+                    cover_s3_url=book_instance_to_update.cover_s3_url
+                )
+
+            book_instance_to_update.cover_s3_url = file_url
+            book_instance_to_update.updated_by = username
+            book_instance_to_update.updated_at = func.now()
+
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.book, entity_ids=[book_instance_to_update.book_id]
+                )
+
+            return await self.book_instance_repository.update_book_instance(
+                book_item_to_update=book_instance_to_update,
+                new_status=None,
+                load_profile=BookInstanceLoadProfile.with_book,
+            )
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to update book item's cover: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
     async def delete_book_instance(self, book_instance_id: int):
         try:
             book_instance_to_delete = await self.book_instance_repository.get_book_instance_by_id(
@@ -172,20 +278,17 @@ class BookInstanceUseCase:
                 raise BookDoesNotExist(message=f"Book item with id '{book_instance_id}' does not exist")
 
             if book_instance_to_delete.cover_s3_url:
-                books_bucket = settings.MINIO_BUCKET_NAME_1
-                bucket = await self.minio_s3_usecase.ensure_bucket_exists(bucket_name=books_bucket)
-
-                if not bucket:
-                    raise BucketS3DoesNotExist()
-
-                await self.minio_s3_usecase.delete_file(
-                    bucket_name=books_bucket, filename=book_instance_to_delete.cover_s3_url.split("/")[-1]
+                self.book_instance_repository.release_cover(
+                    cover_s3_url=book_instance_to_delete.cover_s3_url
                 )
 
-            book = await self.book_usecase.get_book_by_id(book_id=book_instance_to_delete.book_id)
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.book, entity_ids=[book_instance_to_delete.book_id]
+                )
 
             return await self.book_instance_repository.delete_book_instance(
-                book=book, book_item_to_delete=book_instance_to_delete
+                book_item_to_delete=book_instance_to_delete
             )
 
         except SQLAlchemyError as exc:
@@ -8,13 +8,20 @@ from configs.logger import logger
 from exception_handlers.book_exc_handlers import BookAlreadyExists, BookDoesNotExist
 from models import Book
 from repositories.book_repository import BookRepository
+from repositories.detail_cache_repository import (
+    DetailCacheEntity,
+    DetailCacheRepository,
+)
 from schemas.author_schemas import AuthorCreateSchema
 from schemas.book_schemas import (
     BookCreateSchema,
     BookListQueryParams,
+    BookLoadProfile,
+    BookSearchQueryParams,
     BookUpdateSchema,
     BookWithAuthorsGenresCreateSchema,
 )
+from schemas.common_circular_schemas import BookWithAuthorsGenresReadSchema
 from schemas.genre_schemas import GenreCreateSchema
 from usecases.author_usecases import AuthorUseCase
 from usecases.genre_usecases import GenreUseCase
@@ -22,11 +29,16 @@ from usecases.genre_usecases import GenreUseCase
 
 class BookUseCase:
     def __init__(
-        self, book_repository: BookRepository, author_usecase: AuthorUseCase, genre_usecase: GenreUseCase
+        self,
+        book_repository: BookRepository,
+        author_usecase: AuthorUseCase,
+        genre_usecase: GenreUseCase,
+        detail_cache_repository: DetailCacheRepository | None = None,
     ):
         self.book_repository = book_repository
         self.author_usecase = author_usecase
         self.genre_usecase = genre_usecase
+        self.detail_cache_repository = detail_cache_repository
 
     async def create_new_book(self, new_book: BookCreateSchema, username: str):
         try:
@@ -52,15 +64,22 @@ class BookUseCase:
 
     async def map_book_to_existing_authors(self, book_id: int, author_ids: List[int], username: str):
         try:
-            book = await self.book_repository.get_book_by_id(book_id=book_id)
+            author_ids = list(dict.fromkeys(author_ids))
+            book = await self.get_book_by_id(book_id=book_id)
 
-            for author_id in author_ids:
-                author = await self.author_usecase.get_author_by_id(author_id=author_id)
-                book.authors.append(author)
+            await self.author_usecase.check_authors_exist(author_ids=author_ids)
 
             book.updated_by = username
 
-            return await self.book_repository.update_book(book_to_update=book)
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(entity=DetailCacheEntity.book, entity_ids=[book_id])
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.author, entity_ids=author_ids
+                )
+
+            return await self.book_repository.map_book_to_authors(
+                book_to_update=book, author_ids=author_ids, load_profile=BookLoadProfile.with_authors
+            )
 
         except SQLAlchemyError as exc:
             logger.error(f"Failed to map a book with authors: {str(exc)}")
@@ -71,15 +90,20 @@ class BookUseCase:
 
     async def map_book_to_existing_genres(self, book_id: int, genre_ids: List[int], username: str):
         try:
-            book = await self.book_repository.get_book_by_id(book_id=book_id)
+            genre_ids = list(dict.fromkeys(genre_ids))
+            book = await self.get_book_by_id(book_id=book_id)
 
-            for genre_id in genre_ids:
-                genre = await self.genre_usecase.get_genre_by_id(genre_id=genre_id)
-                book.genres.append(genre)
+            await self.genre_usecase.check_genres_exist(genre_ids=genre_ids)
 
             book.updated_by = username
 
-            return await self.book_repository.update_book(book_to_update=book)
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(entity=DetailCacheEntity.book, entity_ids=[book_id])
+                self.detail_cache_repository.invalidate(entity=DetailCacheEntity.genre, entity_ids=genre_ids)
+
+            return await self.book_repository.map_book_to_genres(
+                book_to_update=book, genre_ids=genre_ids, load_profile=BookLoadProfile.with_authors_genres
+            )
 
         except SQLAlchemyError as exc:
             logger.error(f"Failed to map a book with genres: {str(exc)}")
@@ -93,11 +117,18 @@ class BookUseCase:
         new_book: BookWithAuthorsGenresCreateSchema,
         file: UploadFile | None,
         username: str,
+        match_fuzzily: bool = False,
     ):
         try:
-            author = await self.author_usecase.get_author_by_surname_and_name(
-                surname=new_book.authors_surname, name=new_book.authors_name
-            )
+            if match_fuzzily:
+                author = await self.author_usecase.get_similar_author(
+                    surname=new_book.authors_surname, name=new_book.authors_name
+                )
+            else:
+                # Authors are stored capitalized, as create_new_author below saves them
+                author = await self.author_usecase.get_author_by_surname_and_name(
+                    surname=new_book.authors_surname.capitalize(), name=new_book.authors_name.capitalize()
+                )
 
             if not author:
                 new_author = AuthorCreateSchema(
@@ -107,10 +138,13 @@ class BookUseCase:
                 )
 
                 author = await self.author_usecase.create_new_author(
-                    new_author=new_author, file=file, username=username
+                    new_author=new_author, file=file, username=username, check_existing=False
                 )
 
-            genre = await self.genre_usecase.get_genre_by_name(name=new_book.genre_name)
+            if match_fuzzily:
+                genre = await self.genre_usecase.get_similar_genre(name=new_book.genre_name)
+            else:
+                genre = await self.genre_usecase.get_genre_by_name(name=new_book.genre_name)
 
             if not genre:
                 new_genre = GenreCreateSchema(name=new_book.genre_name)
@@ -118,7 +152,7 @@ class BookUseCase:
                 genre = await self.genre_usecase.create_new_genre(new_genre=new_genre)
 
             book = await self.book_repository.get_book_by_title_and_author(
-                title=new_book.title_rus, author=new_book.authors_surname
+                title=new_book.title_rus, author=author.surname
             )
 
             if book:
@@ -137,7 +171,18 @@ class BookUseCase:
             new_book.authors.append(author)
             new_book.genres.append(genre)
 
-            return await self.book_repository.create_new_book(new_book=new_book)
+            # The new book joins the book lists of the author and the genre
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.author, entity_ids=[author.id]
+                )
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.genre, entity_ids=[genre.id]
+                )
+
+            return await self.book_repository.create_new_book(
+                new_book=new_book, load_profile=BookLoadProfile.with_authors_genres
+            )
 
         except SQLAlchemyError as exc:
             logger.error(f"Failed to create a new book: {str(exc)}")
@@ -146,13 +191,36 @@ class BookUseCase:
             logger.error(str(exc))
             raise
 
-    async def get_book_by_id(self, book_id: int):
+    async def get_book_by_id(self, book_id: int, load_profile: BookLoadProfile = BookLoadProfile.card):
         try:
-            book = await self.book_repository.get_book_by_id(book_id=book_id)
+            # Only the detail response is cached, the other profiles serve internal lookups
+            use_cache = self.detail_cache_repository and load_profile == BookLoadProfile.with_authors_genres
+
+            if use_cache:
+                cached_book = await self.detail_cache_repository.get_detail(
+                    entity=DetailCacheEntity.book, entity_id=book_id, schema=BookWithAuthorsGenresReadSchema
+                )
+
+                if cached_book:
+                    return cached_book
+
+            book = await self.book_repository.get_book_by_id(book_id=book_id, load_profile=load_profile)
 
             if not book:
                 raise BookDoesNotExist(message=f"Book with id '{book_id}' does not exist")
 
+            if use_cache:
+                book = BookWithAuthorsGenresReadSchema.model_validate(book)
+                await self.detail_cache_repository.set_detail(
+                    entity=DetailCacheEntity.book,
+                    entity_id=book_id,
+                    detail=book,
+                    dependencies={
+                        DetailCacheEntity.author: [author.id for author in book.authors],
+                        DetailCacheEntity.genre: [genre.id for genre in book.genres],
+                    },
+                )
+
             return book
 
         except SQLAlchemyError as exc:
@@ -202,6 +270,17 @@ class BookUseCase:
             logger.error(str(exc))
             raise
 
+    async def search_books(self, request_payload: BookSearchQueryParams):
+        try:
+            return await self.book_repository.search_books(request_payload=request_payload)
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to search books: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
     async def update_book(self, book_id: int, updated_data: BookUpdateSchema, username: str):
         try:
             book_to_update = await self.book_repository.get_book_by_id(book_id=book_id)
@@ -224,6 +303,9 @@ class BookUseCase:
 
             book_to_update.updated_at = func.now()
 
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(entity=DetailCacheEntity.book, entity_ids=[book_id])
+
             return await self.book_repository.update_book(book_to_update=book_to_update)
 
         except SQLAlchemyError as exc:
@@ -240,6 +322,9 @@ class BookUseCase:
             if not book_to_delete:
                 raise BookDoesNotExist(message=f"Book with id '{book_id}' does not exist")
 
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(entity=DetailCacheEntity.book, entity_ids=[book_id])
+
             return await self.book_repository.delete_book(book_to_delete=book_to_delete)
 
         except SQLAlchemyError as exc:
@@ -1,19 +1,31 @@
+from typing import List
+
 from sqlalchemy.exc import SQLAlchemyError
 
 from configs.logger import logger
 from exception_handlers.genre_exc_handlers import GenreAlreadyExists, GenreDoesNotExist
 from models import Genre
+from repositories.detail_cache_repository import (
+    DetailCacheEntity,
+    DetailCacheRepository,
+)
 from repositories.genre_repository import GenreRepository
+from schemas.common_circular_schemas import GenreWithBooksReadSchema
 from schemas.genre_schemas import (
     GenreCreateSchema,
     GenreListQueryParams,
+    GenreLoadProfile,
+    GenreSuggestQueryParams,
     GenreUpdateSchema,
 )
 
 
 class GenreUseCase:
-    def __init__(self, genre_repository: GenreRepository):
+    def __init__(
+        self, genre_repository: GenreRepository, detail_cache_repository: DetailCacheRepository | None = None
+    ):
         self.genre_repository = genre_repository
+        self.detail_cache_repository = detail_cache_repository
 
     async def create_new_genre(self, new_genre: GenreCreateSchema):
         try:
@@ -34,13 +46,37 @@ class GenreUseCase:
             logger.error(str(exc))
             raise
 
-    async def get_genre_by_id(self, genre_id: int):
+    async def get_genre_by_id(self, genre_id: int, load_profile: GenreLoadProfile = GenreLoadProfile.card):
         try:
-            genre = await self.genre_repository.get_genre_by_id(genre_id=genre_id)
+            use_cache = self.detail_cache_repository and load_profile == GenreLoadProfile.with_books
+
+            if use_cache:
+                cached_genre = await self.detail_cache_repository.get_detail(
+                    entity=DetailCacheEntity.genre, entity_id=genre_id, schema=GenreWithBooksReadSchema
+                )
+
+                if cached_genre:
+                    return cached_genre
+
+            genre = await self.genre_repository.get_genre_by_id(genre_id=genre_id, load_profile=load_profile)
 
             if not genre:
                 raise GenreDoesNotExist(message=f"Genre with id '{genre_id}' does not exist")
 
+            if use_cache:
+                genre = GenreWithBooksReadSchema.model_validate(genre)
+                await self.detail_cache_repository.set_detail(
+                    entity=DetailCacheEntity.genre,
+                    entity_id=genre_id,
+                    detail=genre,
+                    dependencies={
+                        DetailCacheEntity.book: [book.id for book in genre.books],
+                        DetailCacheEntity.author: {
+                            author.id for book in genre.books for author in book.authors
+                        },
+                    },
+                )
+
             return genre
 
         except SQLAlchemyError as exc:
@@ -50,6 +86,21 @@ class GenreUseCase:
             logger.error(str(exc))
             raise
 
+    async def check_genres_exist(self, genre_ids: List[int]):
+        try:
+            existing_ids = await self.genre_repository.get_existing_genre_ids(genre_ids=genre_ids)
+            missing_ids = sorted(set(genre_ids) - existing_ids)
+
+            if missing_ids:
+                raise GenreDoesNotExist(message=f"Genres with ids {missing_ids} do not exist")
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to check genres by ids: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
     async def get_genre_by_name(self, name: str):
         try:
             genre = await self.genre_repository.get_genre_by_name(name=name)
@@ -66,6 +117,28 @@ class GenreUseCase:
             logger.error(str(exc))
             raise
 
+    async def get_similar_genre(self, name: str):
+        try:
+            return await self.genre_repository.get_similar_genre(name=name)
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to fetch similar genre: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
+    async def suggest_genres(self, request_payload: GenreSuggestQueryParams):
+        try:
+            return await self.genre_repository.suggest_genres(request_payload=request_payload)
+
+        except SQLAlchemyError as exc:
+            logger.error(f"Failed to suggest genres: {str(exc)}")
+            raise SQLAlchemyError
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
     async def get_all_genres(self, request_payload: GenreListQueryParams):
         try:
             return await self.genre_repository.get_all_genres(request_payload=request_payload)
@@ -90,6 +163,11 @@ class GenreUseCase:
             for key, value in update_data_dict.items():
                 setattr(genre_to_update, key, value)
 
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.genre, entity_ids=[genre_id]
+                )
+
             return await self.genre_repository.update_genre(genre_to_update=genre_to_update)
 
         except SQLAlchemyError as exc:
@@ -106,6 +184,11 @@ class GenreUseCase:
             if not genre_to_delete:
                 raise GenreDoesNotExist(message=f"Genre with id '{genre_id}' does not exist")
 
+            if self.detail_cache_repository:
+                self.detail_cache_repository.invalidate(
+                    entity=DetailCacheEntity.genre, entity_ids=[genre_id]
+                )
+
             return await self.genre_repository.delete_genre(genre_to_delete=genre_to_delete)
 
         except SQLAlchemyError as exc:
@@ -0,0 +1,74 @@
+import time
+from datetime import datetime, timezone
+
+import redis.asyncio as aioredis
+
+from configs.logger import logger
+from configs.settings import settings
+from repositories.author_repository import AuthorRepository
+from repositories.book_instance_repository import BookInstanceRepository
+from repositories.minio_s3_repository import MinioS3Repository, released_images_key
+
+
+class ImageSweepUseCase:
+    """
+    Deletes the released covers and photos nothing refers to anymore, out of the request path.
+
+    An image is deleted only once IMAGE_RELEASE_GRACE_SECONDS have passed both since it was
+    released and since it was last stored. An upload that finds the image already stored touches it,
+    so a request committing a new reference to the image meanwhile keeps it.
+    """
+
+    def __init__(
+        self,
+        author_repository: AuthorRepository,
+        book_instance_repository: BookInstanceRepository,
+        minio_s3_repository: MinioS3Repository,
+        redis: aioredis.Redis,
+    ):
+        self.count_references = {
+            settings.MINIO_BUCKET_NAME_1: book_instance_repository.count_cover_references,
+            settings.MINIO_BUCKET_NAME_2: author_repository.count_photo_references,
+        }
+        self.minio_s3_repository = minio_s3_repository
+        self.redis = redis
+
+    async def sweep(self) -> int:
+        deleted = 0
+
+        for bucket_name in self.count_references:
+            deleted += await self.sweep_bucket(bucket_name=bucket_name)
+
+        return deleted
+
+    async def sweep_bucket(self, bucket_name: str) -> int:
+        grace_started_at = time.time() - settings.IMAGE_RELEASE_GRACE_SECONDS
+        key = released_images_key(bucket_name)
+        filenames = await self.redis.zrangebyscore(key, "-inf", grace_started_at)
+        deleted = 0
+
+        for filename in filenames:
+            try:
+                if await self.count_references[bucket_name](filename):
+                    await self.redis.zrem(key, filename)
+                    continue
+
+                last_modified = await self.minio_s3_repository.get_file_last_modified(
+                    bucket_name=bucket_name, filename=filename
+                )
+
+                # Stored again recently, the image stays queued until the next sweep
+                if last_modified and last_modified > datetime.fromtimestamp(grace_started_at, timezone.utc):
+                    continue
+
+                if last_modified:
+                    await self.minio_s3_repository.delete_file(bucket_name=bucket_name, filename=filename)
+                    deleted += 1
+
+                await self.redis.zrem(key, filename)
+
+            except Exception as exc:
+                # The image stays queued, the next sweep tries again
+                logger.error(f"Failed to sweep a released image '{filename}': {str(exc)}")
+
+        return deleted
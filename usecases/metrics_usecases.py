@@ -0,0 +1,56 @@
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from brokers.rabbitmq import RabbitMQPublisher
+from configs.database import get_pool_statistics
+from configs.logger import logger
+from exception_handlers.auth_exc_handlers import PermissionDeniedError
+from models.user_role_enum import UserRoleEnum
+from repositories.detail_cache_repository import detail_cache_statistics
+from schemas.metrics_schemas import (
+    DatabasePoolStatsSchema,
+    DetailCacheStatsSchema,
+    RabbitMQPublisherStatsSchema,
+)
+from schemas.user_schemas import UserReadSchema
+
+
+class MetricsUseCase:
+    def __init__(self, engines: dict[str, AsyncEngine], rabbitmq_publisher: RabbitMQPublisher):
+        self.engines = engines
+        self.rabbitmq_publisher = rabbitmq_publisher
+
+    async def get_db_pool_stats(self, current_user: UserReadSchema):
+        try:
+            if current_user.role != UserRoleEnum.ADMIN:
+                raise PermissionDeniedError(message="You have no permission to get the service metrics")
+
+            return [
+                DatabasePoolStatsSchema(engine=label, **get_pool_statistics(engine))
+                for label, engine in self.engines.items()
+            ]
+
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
+    async def get_detail_cache_stats(self, current_user: UserReadSchema):
+        try:
+            if current_user.role != UserRoleEnum.ADMIN:
+                raise PermissionDeniedError(message="You have no permission to get the service metrics")
+
+            return DetailCacheStatsSchema(**detail_cache_statistics.as_dict())
+
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
+
+    async def get_rabbitmq_publisher_stats(self, current_user: UserReadSchema):
+        try:
+            if current_user.role != UserRoleEnum.ADMIN:
+                raise PermissionDeniedError(message="You have no permission to get the service metrics")
+
+            return RabbitMQPublisherStatsSchema(**self.rabbitmq_publisher.statistics())
+
+        except Exception as exc:
+            logger.error(str(exc))
+            raise
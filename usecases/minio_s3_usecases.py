@@ -1,10 +1,23 @@
+import re
+from uuid import uuid4
+
 from botocore.exceptions import ClientError
 from fastapi import HTTPException, UploadFile
+from starlette import status
 
 from configs.logger import logger
 from configs.settings import settings
-from exception_handlers.minio_s3_exc_handlers import S3OperationException
-from repositories.minio_s3_repository import MinioS3Repository
+from exception_handlers.minio_s3_exc_handlers import (
+    BucketS3DoesNotExist,
+    S3OperationException,
+)
+from repositories.minio_s3_repository import STAGING_PREFIX, MinioS3Repository
+from schemas.upload_schemas import ImageContentType, ImageUploadFormSchema
+
+# Buckets known to exist, provisioned at startup or on the first upload of this process
+provisioned_buckets: set[str] = set()
+
+STAGING_KEY_PATTERN = re.compile(rf"{re.escape(STAGING_PREFIX)}[0-9a-f]{{32}}")
 
 
 class MinioS3UseCase:
@@ -54,6 +67,28 @@ class MinioS3UseCase:
             logger.error(f"Failed to create a bucket: {str(exc)}")
             raise S3OperationException(f"Failed to create a bucket: {str(exc)}")
 
+    async def provision_bucket(self, bucket_name: str) -> None:
+        """
+        Creates the bucket if it does not exist yet. Only the first call of the process
+        reaches S3, the next ones return at once.
+
+            Params:
+                bucket_name (str): The name of the bucket.
+        """
+        if bucket_name in provisioned_buckets:
+            return
+
+        if not await self.ensure_bucket_exists(bucket_name=bucket_name):
+            await self.create_bucket(bucket_name=bucket_name)
+
+        try:
+            await self.minio_s3_repository.expire_staged_files(bucket_name=bucket_name)
+        except Exception as exc:
+            # Uploads still work, only the abandoned direct uploads are kept
+            logger.error(f"Failed to set the lifecycle of a bucket '{bucket_name}': {str(exc)}")
+
+        provisioned_buckets.add(bucket_name)
+
     async def upload_file_and_get_presigned_url(self, bucket_name: str, file: UploadFile) -> str:
         """
         Uploads a file to the specified bucket and generates a URL to access the file.
@@ -66,8 +101,95 @@ class MinioS3UseCase:
                 str: The URL to access the uploaded file.
         """
         try:
-            await self.minio_s3_repository.upload_file(bucket_name=bucket_name, file=file)
-            file_url = f"{settings.MINIO_URL_TO_OPEN_FILE}/{bucket_name}/{file.filename}"
+            filename = await self.minio_s3_repository.upload_file(bucket_name=bucket_name, file=file)
+            file_url = f"{settings.MINIO_URL_TO_OPEN_FILE}/{bucket_name}/{filename}"
+
+            return file_url
+
+        except HTTPException as exc:
+            logger.error(str(exc))
+            raise exc
+        except Exception as exc:
+            logger.error(f"Failed to upload a file: {str(exc)}")
+            raise S3OperationException(f"Failed to upload a file: {str(exc)}")
+
+    async def create_upload_form(
+        self, bucket_name: str, content_type: ImageContentType
+    ) -> ImageUploadFormSchema:
+        """
+        Issues a presigned POST form uploading an image directly to a new staging key,
+        so the image never passes through the application.
+
+            Params:
+                bucket_name (str): The name of the bucket.
+                content_type (ImageContentType): The type of the image to upload.
+
+            Returns:
+                ImageUploadFormSchema: The URL and the fields of the form and the staging key.
+        """
+        try:
+            key = f"{STAGING_PREFIX}{uuid4().hex}"
+            fields = await self.minio_s3_repository.create_upload_form(
+                bucket_name=bucket_name, key=key, content_type=content_type.value
+            )
+
+            # The signature of a POST policy does not cover the host, the public address of MinIO is used
+            return ImageUploadFormSchema(
+                url=f"{settings.MINIO_URL_TO_OPEN_FILE}/{bucket_name}",
+                fields=fields,
+                key=key,
+                expires_in=settings.IMAGE_UPLOAD_EXPIRE_SECONDS,
+                max_size=settings.IMAGE_MAX_UPLOAD_BYTES,
+            )
+
+        except Exception as exc:
+            logger.error(f"Failed to create an upload form: {str(exc)}")
+            raise S3OperationException(f"Failed to create an upload form: {str(exc)}")
+
+    async def check_staged_file(self, bucket_name: str, key: str) -> str:
+        """
+        Checks the image uploaded directly to the staging key without downloading it.
+
+            Params:
+                bucket_name (str): The name of the bucket.
+                key (str): The staging key returned by create_upload_form.
+
+            Returns:
+                str: The ETag of the checked image.
+        """
+        if not STAGING_KEY_PATTERN.fullmatch(key):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid upload key")
+
+        try:
+            return await self.minio_s3_repository.check_staged_file(bucket_name=bucket_name, key=key)
+
+        except HTTPException as exc:
+            logger.error(str(exc))
+            raise exc
+        except Exception as exc:
+            logger.error(f"Failed to check an uploaded file: {str(exc)}")
+            raise S3OperationException(f"Failed to check an uploaded file: {str(exc)}")
+
+    async def upload_staged_file_and_get_presigned_url(self, bucket_name: str, key: str, etag: str) -> str:
+        """
+        Processes the image uploaded directly to the staging key and generates a URL to access it.
+
+            Params:
+                bucket_name (str): The name of the bucket.
+                key (str): The staging key returned by create_upload_form.
+                etag (str): The ETag returned by check_staged_file.
+
+            Returns:
+                str: The URL to access the uploaded file.
+        """
+        if not STAGING_KEY_PATTERN.fullmatch(key):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid upload key")
+
+        try:
+            filename = await self.minio_s3_repository.upload_staged_file(
+                bucket_name=bucket_name, key=key, etag=etag
+            )
+            file_url = f"{settings.MINIO_URL_TO_OPEN_FILE}/{bucket_name}/{filename}"
 
             return file_url
 
@@ -93,6 +215,12 @@ class MinioS3UseCase:
             await self.minio_s3_repository.delete_file(bucket_name=bucket_name, filename=filename)
             return True
 
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] == "NoSuchBucket":
+                raise BucketS3DoesNotExist()
+
+            logger.error(f"Failed to delete file: {str(exc)}")
+            raise S3OperationException(f"Failed to delete file: {str(exc)}")
         except Exception as exc:
             logger.error(f"Failed to delete file: {str(exc)}")
             raise S3OperationException(f"Failed to delete file: {str(exc)}")
@@ -6,6 +6,7 @@ from configs.logger import logger
 from exception_handlers.auth_exc_handlers import PermissionDeniedError
 from exception_handlers.user_exc_handlers import UserDoesNotExist
 from models.user_role_enum import UserRoleEnum
+from repositories.user_cache_repository import UserCacheRepository
 from repositories.user_repository import UserRepository
 from schemas.user_schemas import (
     UserAdminUpdateSchema,
@@ -16,8 +17,11 @@ from schemas.user_schemas import (
 
 
 class UserUseCase:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(
+        self, user_repository: UserRepository, user_cache_repository: UserCacheRepository | None = None
+    ):
         self.user_repository = user_repository
+        self.user_cache_repository = user_cache_repository
 
     async def get_user_by_id(self, user_id: int, current_user: UserReadSchema):
         try:
@@ -98,6 +102,9 @@ class UserUseCase:
 
             user_to_update.updated_at = func.now()
 
+            if self.user_cache_repository:
+                self.user_cache_repository.invalidate(user_ids=[current_user.id])
+
             return await self.user_repository.update_user(user_to_update=user_to_update)
 
         except SQLAlchemyError as exc:
@@ -126,6 +133,10 @@ class UserUseCase:
 
             user_to_update.updated_at = func.now()
 
+            # Blocking, unblocking and role changes have to reach get_current_user quickly
+            if self.user_cache_repository:
+                self.user_cache_repository.invalidate(user_ids=[user_id])
+
             return await self.user_repository.update_user_by_admin(user_to_update=user_to_update)
 
         except SQLAlchemyError as exc:
@@ -145,6 +156,9 @@ class UserUseCase:
             if not user_to_delete:
                 raise UserDoesNotExist(message=f"User with id '{user_id}' does not exist")
 
+            if self.user_cache_repository:
+                self.user_cache_repository.invalidate(user_ids=[user_id])
+
             return await self.user_repository.delete_user(user_to_delete=user_to_delete)
 
         except SQLAlchemyError as exc: